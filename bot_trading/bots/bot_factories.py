@@ -0,0 +1,28 @@
+from bot_trading.bots.complex_baseline_bot import ComplexBaselineBot
+from bot_trading.bots.predictor_bot import PredictorBot
+from bot_trading.bots.predictors.linear_predictor import LinearPredictor
+
+"""
+Bots that can be created by name and parameters from the command line (parameter sweeps, feed replays).
+"""
+
+
+def create_complex_baseline_bot(**parameters):
+    bot = ComplexBaselineBot()
+    for name, value in parameters.items():
+        if not hasattr(bot, name):
+            raise ValueError(f"Unknown parameter {name} of ComplexBaselineBot")
+
+        setattr(bot, name, value)
+
+    return bot
+
+
+def create_linear_predictor_bot(delta_scale=0.5, prediction_lookahead=10):
+    return PredictorBot(LinearPredictor(delta_scale=delta_scale), prediction_lookahead=prediction_lookahead)
+
+
+BOT_FACTORIES = {
+    "complex_baseline": create_complex_baseline_bot,
+    "linear_predictor": create_linear_predictor_bot,
+}
@@ -1,6 +1,7 @@
+import numpy as np
+
 from bot_trading.bots.bot_base import BotBase
 from bot_trading.trading.portfolio_controller import PortfolioController
-from bot_trading.trading.utils import future_value
 
 
 class OraculumBot(BotBase):
@@ -12,6 +13,8 @@ class OraculumBot(BotBase):
         future = portfolio.get_history(seconds_back=-self.update_interval)
 
         for fund in portfolio.funds:
-            best_currency = max(portfolio.currencies, key=lambda currency: future_value(fund, currency, now, future))
+            # future values of the fund converted to every currency now
+            future_values = future.get_currency_values(now.get_conversions(fund))
+            best_currency = portfolio.currencies[int(np.argmax(future_values))]
             if best_currency != fund.currency:
                 portfolio.request_transfer(fund, best_currency)
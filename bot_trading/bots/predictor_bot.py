@@ -1,7 +1,8 @@
+import numpy as np
+
 from bot_trading.bots.bot_base import BotBase
 from bot_trading.bots.predictors.predictor_base import PredictorBase
 from bot_trading.trading.portfolio_controller import PortfolioController
-from bot_trading.trading.utils import future_value
 
 
 class PredictorBot(BotBase):
@@ -19,9 +20,10 @@ class PredictorBot(BotBase):
         self._predictor.recalculate_to(present)
         # todo retraining from time to time could be here (e.g. based on last training time)
 
+        future_unit_values = self._predictor.get_unit_values(portfolio.currencies)
         for fund in portfolio.funds:
-            best_currency = max(portfolio.currencies,
-                                key=lambda currency: future_value(fund, currency, present, self._predictor))
+            future_values = present.get_conversions(fund) * future_unit_values
+            best_currency = portfolio.currencies[int(np.argmax(future_values))]
 
             if best_currency != fund.currency:
                 if fund.currency == portfolio.target_currency:
@@ -1,4 +1,6 @@
-from typing import Dict
+from typing import Dict, List
+
+import numpy as np
 
 from bot_trading.trading.fund import Fund
 from bot_trading.trading.price_snapshot import PriceSnapshot
@@ -40,3 +42,10 @@ class PredictorBase(object):
 
         predicted_value = self._actual_unit_values[fund.currency] * fund.amount
         return Fund(predicted_value, self.target_currency)
+
+    def get_unit_values(self, currencies: List[str]) -> np.ndarray:
+        """
+        Predicted unit values of the currencies (vectorized get_value).
+        """
+        return np.array([1.0 if currency == self.target_currency else self._actual_unit_values[currency]
+                         for currency in currencies])
@@ -16,6 +16,9 @@ LOG_LEVELS = {
 
 LOCAL_DISK_CACHE_SIZE = 100_000_000 # maximum size of a cache file that saves network traffic (set to 0 for disabling)
 
+# directory of a dataset exported by bot_trading.run_dataset_export - backtests read it without any network
+LOCAL_DATASET_PATH = os.getenv("DATASET", None)
+
 USERNAME = "!!!YOUR EMAIL BELONGS HERE!!!"  # FILL IN YOUR EMAIL ADDRESS email@is.username
 
 try:
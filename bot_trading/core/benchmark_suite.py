@@ -0,0 +1,275 @@
+import base64
+import os
+import platform
+import random
+import socket
+import subprocess
+import time
+from threading import Thread
+from typing import List, Callable, Optional, Dict
+
+from bot_trading.configuration import LOG_LEVELS
+from bot_trading.core.configuration import FULLPASS_PREFETCH_THREAD_COUNT
+from bot_trading.core.data.disk_cache import DiskCache, CacheEntry
+from bot_trading.core.data.storage_reader import StorageReader
+from bot_trading.core.data.storage_writer import StorageWriter
+from bot_trading.core.data.synthetic_book_generator import SyntheticBookGenerator
+from bot_trading.core.data.trade_entry import TradeEntry
+from bot_trading.core.networking.socket_client import SocketClient
+from bot_trading.core.processors.pricebook_processor import PricebookProcessor
+from bot_trading.core.runtime.fullpass_connector import FullpassConnector
+from bot_trading.core.runtime.pricebook_view_provider import PricebookViewProvider
+
+
+class BenchmarkSuite(object):
+    """
+    Offline benchmarks of the data path on synthetic storage.
+    Every benchmark is repeated and the best time is reported (as operations per second).
+    """
+
+    def __init__(self, root_path: str, pair_count: int = 4, entries_per_pair: int = 200_000, repeat: int = 3,
+                 seed: int = 0):
+        self._root_path = root_path
+        self._storage = StorageWriter.at_root(root_path)
+        self._pairs = [f"S{i:02d}/EUR" for i in range(pair_count)]
+        self._entries_per_pair = entries_per_pair
+        self._repeat = repeat
+        self._seed = seed
+
+        self._benchmarks: Dict[str, Callable[[], dict]] = {
+            "trade_entry_decode": self.benchmark_trade_entry_decode,
+            "trade_entry_batch_iteration": self.benchmark_trade_entry_batch_iteration,
+            "pricebook_processor_accept": self.benchmark_pricebook_processor_accept,
+            "find_pricebook_start": self.benchmark_find_pricebook_start,
+            "pricebook_view_sequential": self.benchmark_pricebook_view_sequential,
+            "pricebook_view_random": self.benchmark_pricebook_view_random,
+            "fullpass_merge": self.benchmark_fullpass_merge,
+            "fullpass_merge_prefetch": self.benchmark_fullpass_merge_prefetch,
+            "disk_cache_cold_load": self.benchmark_disk_cache_cold_load,
+            "socket_client_framing": self.benchmark_socket_client_framing,
+        }
+
+    @property
+    def benchmark_names(self) -> List[str]:
+        return list(self._benchmarks.keys())
+
+    def prepare_storage(self):
+        """
+        Generates storage of the pairs that are missing in the root path.
+        """
+        for i, pair in enumerate(self._pairs):
+            if self._storage.storage_file_exists(pair, 0):
+                continue  # storage of a previous run is reused
+
+            start = time.time()
+            generator = SyntheticBookGenerator(pair, seed=self._seed + i, root_path=self._root_path)
+            generator.generate(self._entries_per_pair)
+            print(f"\t generated {pair} in {time.time() - start:.1f}s")
+
+    def run(self, names: Optional[List[str]] = None) -> dict:
+        names = names or self.benchmark_names
+        for name in names:
+            if name not in self._benchmarks:
+                raise ValueError(f"Unknown benchmark {name}")
+
+        self.prepare_storage()
+
+        # logging would be measured otherwise
+        log_levels = set(LOG_LEVELS)
+        LOG_LEVELS.clear()
+        try:
+            results = {}
+            for name in names:
+                results[name] = self._benchmarks[name]()
+                print(f"\t {name}: {results[name]['operations_per_second']:,.0f} {results[name]['unit']}/s")
+        finally:
+            LOG_LEVELS.update(log_levels)
+
+        return {
+            "timestamp": time.time(),
+            "commit": get_commit(),
+            "python": platform.python_version(),
+            "parameters": {
+                "pair_count": len(self._pairs),
+                "entries_per_pair": self._entries_per_pair,
+                "repeat": self._repeat,
+                "seed": self._seed,
+            },
+            "results": results,
+        }
+
+    def benchmark_trade_entry_decode(self) -> dict:
+        chunk = bytes(self._get_reader().get_entries(0, self._entries_per_pair).chunk)
+        pair = self._pairs[0]
+        return self._measure("entries", int(len(chunk) / TradeEntry.chunk_size),
+                             lambda: TradeEntry.from_chunk(pair, chunk))
+
+    def benchmark_trade_entry_batch_iteration(self) -> dict:
+        batch = self._get_reader().get_entries(0, self._entries_per_pair)
+
+        def iterate():
+            for _ in batch:
+                pass
+
+        return self._measure("entries", len(batch), iterate)
+
+    def benchmark_pricebook_processor_accept(self) -> dict:
+        entries = self._get_reader().get_entries(0, self._entries_per_pair).to_entries()
+        pair = self._pairs[0]
+
+        def accept():
+            processor = PricebookProcessor(pair)
+            for entry in entries:
+                processor.accept(entry)
+
+        return self._measure("entries", len(entries), accept)
+
+    def benchmark_find_pricebook_start(self) -> dict:
+        reader = self._get_reader()
+        timestamps = self._get_random_timestamps(reader, 10_000)
+
+        def find():
+            for timestamp in timestamps:
+                reader.find_pricebook_start(timestamp)
+
+        return self._measure("lookups", len(timestamps), find)
+
+    def benchmark_pricebook_view_sequential(self) -> dict:
+        # backtest like access - the time moves forward by a second
+        first_timestamp, last_timestamp = self._get_reader().get_date_range()
+        view_count = int(min(5_000, last_timestamp - first_timestamp))
+        timestamps = [first_timestamp + i for i in range(view_count)]
+        return self._measure_views(timestamps)
+
+    def benchmark_pricebook_view_random(self) -> dict:
+        return self._measure_views(self._get_random_timestamps(self._get_reader(), 1_000))
+
+    def benchmark_fullpass_merge(self) -> dict:
+        return self._measure_merge(0)
+
+    def benchmark_fullpass_merge_prefetch(self) -> dict:
+        return self._measure_merge(FULLPASS_PREFETCH_THREAD_COUNT)
+
+    def benchmark_disk_cache_cold_load(self) -> dict:
+        reader = self._get_reader()
+        pair = self._pairs[0]
+        bucket_count = int(reader.get_entry_count() / StorageWriter.bucket_entry_count)
+
+        # the cache file lives in the working directory
+        cache_directory = os.path.join(self._root_path, "disk_cache")
+        os.makedirs(cache_directory, exist_ok=True)
+        original_directory = os.getcwd()
+        os.chdir(cache_directory)
+        try:
+            with open(DiskCache.get_cache_path(), "wb") as f:
+                for bucket_index in range(bucket_count):
+                    start_index = bucket_index * StorageWriter.bucket_entry_count
+                    end_index = start_index + StorageWriter.bucket_entry_count
+                    payload = bytes(reader.get_entries(start_index, end_index).chunk)
+                    f.write(CacheEntry.from_raw(bucket_index, pair, bucket_index, payload).to_chunk())
+
+            cache_size = (bucket_count + 1) * CacheEntry.chunk_size
+            return self._measure("buckets", bucket_count, lambda: DiskCache(cache_size))
+        finally:
+            os.chdir(original_directory)
+
+    def benchmark_socket_client_framing(self) -> dict:
+        reader = self._get_reader()
+        message_count = 2_000
+        messages = []
+        for i in range(message_count):
+            start_index = (i * StorageWriter.bucket_entry_count) % max(1, reader.get_entry_count())
+            chunk = reader.get_entries(start_index, start_index + StorageWriter.bucket_entry_count).chunk
+            messages.append({"pair": self._pairs[0], "bucket_index": i,
+                             "bucket": base64.b64encode(bytes(chunk)).decode("ascii")})
+
+        def transfer():
+            sender_socket, receiver_socket = socket.socketpair()
+            sender, receiver = SocketClient(sender_socket), SocketClient(receiver_socket)
+
+            def send():
+                for message in messages:
+                    sender.send_json(message)
+
+            sender_thread = Thread(target=send, daemon=True)
+            sender_thread.start()
+            for _ in range(message_count):
+                receiver.read_json()
+
+            sender_thread.join()
+            sender_socket.close()
+            receiver_socket.close()
+
+        result = self._measure("messages", message_count, transfer)
+        message_bytes = sum(len(message["bucket"]) for message in messages)
+        result["megabytes_per_second"] = message_bytes / result["best_seconds"] / 1e6
+        return result
+
+    def _measure_views(self, timestamps: List[float]) -> dict:
+        def get_views():
+            provider = PricebookViewProvider(self._get_reader())
+            for timestamp in timestamps:
+                provider.get_pricebook_view(timestamp)
+
+        return self._measure("views", len(timestamps), get_views)
+
+    def _measure_merge(self, prefetch_thread_count: int) -> dict:
+        entry_count = sum(self._get_reader(pair).get_entry_count() for pair in self._pairs)
+
+        def merge():
+            connector = FullpassConnector([self._get_reader(pair) for pair in self._pairs], prefetch_thread_count)
+            try:
+                while True:
+                    connector.blocking_get_next_entry()
+            except StopIteration:
+                pass
+            finally:
+                connector.close()
+
+        return self._measure("entries", entry_count, merge)
+
+    def _measure(self, unit: str, operation_count: int, function: Callable) -> dict:
+        times = []
+        for _ in range(self._repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+
+        best_seconds = min(times)
+        return {
+            "unit": unit,
+            "operations": operation_count,
+            "best_seconds": best_seconds,
+            "mean_seconds": sum(times) / len(times),
+            "operations_per_second": operation_count / best_seconds if best_seconds > 0 else float("inf"),
+        }
+
+    def _get_reader(self, pair: Optional[str] = None) -> StorageReader:
+        return StorageReader(pair or self._pairs[0], self._root_path)
+
+    def _get_random_timestamps(self, reader: StorageReader, count: int) -> List[float]:
+        first_timestamp, last_timestamp = reader.get_date_range()
+        generator = random.Random(self._seed)
+        return [generator.uniform(first_timestamp, last_timestamp) for _ in range(count)]
+
+
+def get_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode("ascii").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_comparison(results: dict, baseline: dict) -> str:
+    lines = []
+    for name, result in results["results"].items():
+        baseline_result = baseline["results"].get(name)
+        if baseline_result is None:
+            lines.append(f"{name:30} {result['operations_per_second']:>14,.0f} {result['unit']}/s")
+            continue
+
+        ratio = result["operations_per_second"] / baseline_result["operations_per_second"]
+        lines.append(f"{name:30} {result['operations_per_second']:>14,.0f} {result['unit']}/s ({ratio:.2f}x)")
+
+    return "\n".join(lines)
@@ -0,0 +1,31 @@
+import sys
+from typing import List
+
+"""
+Option parsing shared by the run_* scripts (options are given as "--name value").
+"""
+
+
+def get_option(name, default):
+    if name not in sys.argv:
+        return default
+
+    return sys.argv[sys.argv.index(name) + 1]
+
+
+def get_arguments(option_names: List[str]) -> List[str]:
+    """
+    Returns arguments that are neither options nor values of the given options.
+    """
+    option_values = [get_option(name, None) for name in option_names]
+    return [arg for arg in sys.argv[1:] if not arg.startswith("--") and arg not in option_values]
+
+
+def parse_value(value: str):
+    for parse in [int, float]:
+        try:
+            return parse(value)
+        except ValueError:
+            pass
+
+    return value
@@ -1,3 +1,5 @@
+import os
+
 # SERVER SIDE CONFIGURATION THAT HAS TO BE ALIGNED WITH CLIENTS
 
 WS_URL_SANDBOX = "wss://ws-sandbox.kraken.com"
@@ -21,6 +23,12 @@ SERVER_SUPPORTED_PAIRS = ["XRP/EUR", "XMR/EUR", "ETH/EUR", "REP/EUR", "XBT/EUR",
 # limit the tracked pairs only to those supported by server
 TRACKED_PAIRS = SERVER_SUPPORTED_PAIRS
 
+STORAGE_FLUSH_INTERVAL = 0.1  # how often (in seconds) the recorded feed is committed to the storage files
+STORAGE_FLUSH_SIZE = 64 * 1024  # commit is forced when this many bytes are pending
+
+FULLPASS_PREFETCH_THREAD_COUNT = 4  # how many threads read next buckets ahead during backtests (0 disables it)
+READ_AHEAD_BUCKET_COUNT = 16  # how many buckets of a sequentially read remote pair can be in flight (0 disables it)
+
 DUST_LEVEL = 1e-9  # amounts below this will be considered dust and converted to zero
 MIN_POSITION_BUCKET_VALUE = 1.0  # if the position bucket value is lower, it will get merged to other bucket
 
@@ -29,3 +37,14 @@ TARGET_CURRENCY = "EUR"
 
 COMMAND_BURST_LIMIT = 20  # how many commands can be bursted before limit kicks in
 COMMAND_RATE_LIMIT = 0.2  # how many commands per second is allowed
+MAX_READ_CONNECTIONS = 3  # how many read only connections a user can have (the oldest one is closed)
+MAX_BUCKET_RANGE = 16  # how many buckets can be requested by a single command
+
+# access modes of connections to the trading server
+WRITE_MODE = "write"
+READ_MODE = "read"
+
+# timings of the hot paths (bot, pricebook replays, network waits) are collected and dumped as JSON
+METRICS_ENABLED = os.getenv("METRICS", "") not in ["", "0"]
+METRICS_PATH = os.getenv("METRICS_PATH", "metrics.json")
+METRICS_DUMP_INTERVAL = 60.0  # how often (in seconds) the metrics are dumped during live runs
@@ -0,0 +1,148 @@
+import lzma
+import struct
+import zlib
+
+import numpy as np
+
+from bot_trading.core.data.trade_entry import TradeEntry
+from bot_trading.core.data.trade_entry_batch import TradeEntryBatch
+
+
+class BucketCodec(object):
+    """
+    Lossless compression of a bucket of serialized trade entries.
+    Every column is stored separately - prices, volumes and timestamps are quantized to decimal ticks
+    and delta encoded when that can be reverted exactly, otherwise raw floats are kept.
+    """
+    ZLIB = 0
+    LZMA = 1
+
+    # compression method + entry count
+    header_format = "<BI"
+    header_size = struct.calcsize(header_format)
+
+    _raw_column = 0
+    _quantized_column = 1  # deltas of all the ticks from zero (written by older versions)
+    _first_tick_column = 2  # the first tick followed by deltas of the other ticks
+
+    # how many decimal places are tried for the quantization
+    _max_decimals = 12
+
+    _delta_types = [np.int8, np.int16, np.int32, np.int64]
+
+    @classmethod
+    def encode(cls, chunk, method: int = ZLIB) -> bytes:
+        batch = TradeEntryBatch(None, chunk)
+
+        body = bytearray()
+        body.extend(batch.info.tobytes())
+        for column in [batch.price, batch.volume, batch.timestamp]:
+            body.extend(cls._encode_column(np.ascontiguousarray(column)))
+
+        if method == cls.ZLIB:
+            compressed_body = zlib.compress(bytes(body), 9)
+        elif method == cls.LZMA:
+            compressed_body = lzma.compress(bytes(body))
+        else:
+            raise ValueError(f"Unknown compression method {method}")
+
+        return struct.pack(cls.header_format, method, len(batch)) + compressed_body
+
+    @classmethod
+    def decode(cls, payload) -> bytes:
+        """
+        Returns the raw chunk of entries in the same layout as stored in book files.
+        """
+        method, entry_count = struct.unpack_from(cls.header_format, payload)
+        compressed_body = bytes(payload[cls.header_size:])
+        if method == cls.ZLIB:
+            body = zlib.decompress(compressed_body)
+        elif method == cls.LZMA:
+            body = lzma.decompress(compressed_body)
+        else:
+            raise ValueError(f"Unknown compression method {method}")
+
+        records = np.empty(entry_count, dtype=TradeEntryBatch.dtype)
+        records["info"] = np.frombuffer(body, dtype=np.uint8, count=entry_count)
+
+        offset = entry_count
+        for column_name in ["price", "volume", "timestamp"]:
+            records[column_name], offset = cls._decode_column(body, offset, entry_count)
+
+        if offset != len(body):
+            raise AssertionError("Bucket payload was not decoded completely")
+
+        result = records.tobytes()
+        if len(result) != entry_count * TradeEntry.chunk_size:
+            raise AssertionError("Invalid bucket decoding")
+
+        return result
+
+    @classmethod
+    def _encode_column(cls, values: np.ndarray) -> bytes:
+        decimals = cls._find_decimals(values)
+        if decimals is None:
+            return struct.pack("<B", cls._raw_column) + values.astype("<f8").tobytes()
+
+        ticks = np.round(values * 10.0 ** decimals).astype(np.int64)
+        # the first tick is absolute, so it doesn't widen type of the deltas
+        deltas = np.diff(ticks)
+
+        type_index = 0
+        while not cls._fits(deltas, cls._delta_types[type_index]):
+            type_index += 1
+
+        delta_type = np.dtype(cls._delta_types[type_index]).newbyteorder("<")
+        header = struct.pack("<BbBq", cls._first_tick_column, decimals, type_index, int(ticks[0]))
+        return header + deltas.astype(delta_type).tobytes()
+
+    @classmethod
+    def _decode_column(cls, body: bytes, offset: int, entry_count: int):
+        column_type = body[offset]
+        if column_type == cls._raw_column:
+            offset += 1
+            values = np.frombuffer(body, dtype="<f8", count=entry_count, offset=offset)
+            return values, offset + entry_count * 8
+
+        if column_type == cls._quantized_column:
+            _, decimals, type_index = struct.unpack_from("<BbB", body, offset)
+            offset += 3
+            first_tick = 0
+            delta_count = entry_count
+        elif column_type == cls._first_tick_column:
+            _, decimals, type_index, first_tick = struct.unpack_from("<BbBq", body, offset)
+            offset += 11
+            delta_count = entry_count - 1
+        else:
+            raise AssertionError(f"Unknown column type {column_type}")
+
+        delta_type = np.dtype(cls._delta_types[type_index]).newbyteorder("<")
+        deltas = np.frombuffer(body, dtype=delta_type, count=delta_count, offset=offset)
+        ticks = np.cumsum(deltas.astype(np.int64)) + first_tick
+        if column_type == cls._first_tick_column:
+            ticks = np.concatenate([np.array([first_tick], dtype=np.int64), ticks])
+
+        values = ticks.astype(np.float64) / 10.0 ** decimals
+        return values, offset + delta_count * delta_type.itemsize
+
+    @classmethod
+    def _find_decimals(cls, values: np.ndarray):
+        if not len(values) or not np.all(np.isfinite(values)):
+            return None
+
+        for decimals in range(cls._max_decimals + 1):
+            scale = 10.0 ** decimals
+            ticks = np.round(values * scale)
+            if np.max(np.abs(ticks)) >= 2 ** 53:
+                return None  # ticks can't be represented exactly anymore
+
+            restored = ticks.astype(np.int64).astype(np.float64) / scale
+            if np.array_equal(restored.view(np.int64), values.view(np.int64)):
+                return decimals
+
+        return None
+
+    @classmethod
+    def _fits(cls, values: np.ndarray, value_type) -> bool:
+        info = np.iinfo(value_type)
+        return not len(values) or (values.min() >= info.min and values.max() <= info.max)
@@ -0,0 +1,83 @@
+import os
+import struct
+import sys
+from array import array
+from typing import Iterable
+
+from bot_trading.core.data.trade_entry import TradeEntry
+
+
+class BucketIndex(object):
+    """
+    Sidecar file of a book file that holds timestamp of the first (service) entry of every bucket in the file.
+    """
+    record_format = "<d"
+    record_size = struct.calcsize(record_format)
+
+    @classmethod
+    def read(cls, index_path: str, start_bucket: int = 0) -> array:
+        result = array("d")
+        try:
+            with open(index_path, "rb") as f:
+                f.seek(start_bucket * cls.record_size, os.SEEK_SET)
+                data = f.read()
+        except FileNotFoundError:
+            return result
+
+        # partially written trailing record is ignored
+        data = data[:len(data) - len(data) % cls.record_size]
+        result.frombytes(data)
+        if sys.byteorder != "little":
+            result.byteswap()  # the index is always stored as little endian
+
+        return result
+
+    @classmethod
+    def append(cls, index_file, timestamp: float):
+        index_file.write(struct.pack(cls.record_format, timestamp))
+
+    @classmethod
+    def get_record_count(cls, index_path: str) -> int:
+        if not os.path.exists(index_path):
+            return 0
+
+        return int(os.path.getsize(index_path) / cls.record_size)
+
+    @classmethod
+    def rebuild(cls, book_path: str, index_path: str, bucket_entry_count: int) -> int:
+        """
+        Recreates the index from the book file. Returns number of indexed buckets.
+        """
+        bucket_size = bucket_entry_count * TradeEntry.chunk_size
+        temporary_path = index_path + ".tmp"
+
+        bucket_count = 0
+        with open(book_path, "rb") as book, open(temporary_path, "wb") as index:
+            while True:
+                book.seek(bucket_count * bucket_size, os.SEEK_SET)
+                chunk = book.read(TradeEntry.chunk_size)
+                if len(chunk) != TradeEntry.chunk_size:
+                    break
+
+                cls.append(index, TradeEntry(None, chunk).timestamp)
+                bucket_count += 1
+
+        os.replace(temporary_path, index_path)
+        return bucket_count
+
+    @classmethod
+    def rebuild_from_buckets(cls, index_path: str, bucket_chunks: Iterable[bytes]) -> int:
+        """
+        Recreates the index from chunks of the buckets (e.g. of a compressed segment).
+        Returns number of indexed buckets.
+        """
+        temporary_path = index_path + ".tmp"
+
+        bucket_count = 0
+        with open(temporary_path, "wb") as index:
+            for chunk in bucket_chunks:
+                cls.append(index, TradeEntry(None, chunk[:TradeEntry.chunk_size]).timestamp)
+                bucket_count += 1
+
+        os.replace(temporary_path, index_path)
+        return bucket_count
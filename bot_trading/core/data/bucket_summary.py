@@ -0,0 +1,127 @@
+import os
+import struct
+from typing import List, Iterable
+
+from bot_trading.core.data.trade_entry_batch import TradeEntryBatch
+from bot_trading.core.processors.pricebook_processor import PricebookProcessor
+
+
+class BucketSummary(object):
+    """
+    Top of book overview of a storage bucket. Bid/ask values are sampled after every flush entry
+    of the bucket replay (NaN when the book was never available).
+    Summaries of a book file are stored in a sidecar file (one fixed size record per bucket).
+    """
+    fields = ["entry_count", "start_timestamp", "end_timestamp",
+              "first_bid", "last_bid", "min_bid", "max_bid",
+              "first_ask", "last_ask", "min_ask", "max_ask"]
+
+    record_format = "<I10d"
+    record_size = struct.calcsize(record_format)
+
+    __slots__ = fields
+
+    def __init__(self, entry_count: int, start_timestamp: float, end_timestamp: float,
+                 first_bid: float, last_bid: float, min_bid: float, max_bid: float,
+                 first_ask: float, last_ask: float, min_ask: float, max_ask: float):
+        self.entry_count = entry_count
+        self.start_timestamp = start_timestamp
+        self.end_timestamp = end_timestamp
+        self.first_bid = first_bid
+        self.last_bid = last_bid
+        self.min_bid = min_bid
+        self.max_bid = max_bid
+        self.first_ask = first_ask
+        self.last_ask = last_ask
+        self.min_ask = min_ask
+        self.max_ask = max_ask
+
+    @classmethod
+    def from_batch(cls, batch: TradeEntryBatch) -> 'BucketSummary':
+        processor = PricebookProcessor(batch.pair)
+        bids = []
+        asks = []
+        is_started = False
+        for entry in batch:
+            if not is_started and not entry.is_reset:
+                continue  # the book can be replayed from a reset entry only
+
+            is_started = True
+            processor.accept(entry)
+            if entry.is_flush_entry and processor.is_book_available:
+                bid, ask = processor.bid_ask
+                bids.append(bid)
+                asks.append(ask)
+
+        nan = float("nan")
+        start_timestamp = float(batch.timestamp[0]) if len(batch) else nan
+        end_timestamp = float(batch.timestamp.max()) if len(batch) else nan
+        return BucketSummary(
+            len(batch), start_timestamp, end_timestamp,
+            *cls._get_statistics(bids), *cls._get_statistics(asks)
+        )
+
+    @classmethod
+    def from_chunk(cls, chunk) -> 'BucketSummary':
+        return BucketSummary(*struct.unpack(cls.record_format, chunk))
+
+    @classmethod
+    def from_chunks(cls, chunk) -> List['BucketSummary']:
+        chunk = memoryview(chunk)
+        return [cls.from_chunk(chunk[i:i + cls.record_size])
+                for i in range(0, len(chunk) - cls.record_size + 1, cls.record_size)]
+
+    def to_chunk(self) -> bytes:
+        return struct.pack(self.record_format, *[getattr(self, field) for field in self.fields])
+
+    @classmethod
+    def read(cls, summary_path: str, start_bucket: int = 0) -> List['BucketSummary']:
+        try:
+            with open(summary_path, "rb") as f:
+                f.seek(start_bucket * cls.record_size, os.SEEK_SET)
+                data = f.read()
+        except FileNotFoundError:
+            return []
+
+        # partially written trailing record is ignored
+        return cls.from_chunks(data)
+
+    @classmethod
+    def append(cls, summary_file, summary: 'BucketSummary'):
+        summary_file.write(summary.to_chunk())
+
+    @classmethod
+    def get_record_count(cls, summary_path: str) -> int:
+        if not os.path.exists(summary_path):
+            return 0
+
+        return int(os.path.getsize(summary_path) / cls.record_size)
+
+    @classmethod
+    def rebuild(cls, summary_path: str, pair: str, bucket_chunks: Iterable[bytes]) -> int:
+        """
+        Recreates the summary file from chunks of the buckets. Returns number of summarized buckets.
+        """
+        temporary_path = summary_path + ".tmp"
+
+        bucket_count = 0
+        with open(temporary_path, "wb") as f:
+            for chunk in bucket_chunks:
+                cls.append(f, cls.from_batch(TradeEntryBatch(pair, chunk)))
+                bucket_count += 1
+
+        os.replace(temporary_path, summary_path)
+        return bucket_count
+
+    @classmethod
+    def _get_statistics(cls, values: List[float]):
+        if not values:
+            nan = float("nan")
+            return nan, nan, nan, nan
+
+        return values[0], values[-1], min(values), max(values)
+
+    def __repr__(self):
+        return f"BucketSummary {self.start_timestamp}-{self.end_timestamp} ({self.entry_count} entries): " \
+               f"bid {self.first_bid}/{self.last_bid} [{self.min_bid}, {self.max_bid}], " \
+               f"ask {self.first_ask}/{self.last_ask} [{self.min_ask}, {self.max_ask}]"
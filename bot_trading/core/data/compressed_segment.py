@@ -0,0 +1,120 @@
+import mmap
+import os
+import struct
+from threading import Lock
+from typing import Iterable, Dict
+
+from bot_trading.core.data.bucket_codec import BucketCodec
+from bot_trading.core.data.trade_entry import TradeEntry
+
+
+class CompressedSegment(object):
+    """
+    Read-only sealed storage file made of independently compressed buckets.
+    Layout: magic + bucket count + entry count + offset table (bucket count + 1) + bucket payloads
+    """
+    magic = b"BTSEG001"
+    header_format = "<II"
+    offset_format = "<Q"
+
+    # how many decoded buckets are kept in memory
+    decoded_bucket_cache_size = 8
+
+    def __init__(self, path: str, bucket_entry_count: int):
+        self._path = path
+        self._bucket_entry_count = bucket_entry_count
+        self._L_cache = Lock()
+        self._decoded_buckets: Dict[int, bytes] = {}
+
+        with open(path, "rb") as f:
+            self._mapping = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+        if bytes(self._mapping[:len(self.magic)]) != self.magic:
+            raise AssertionError(f"Invalid compressed segment {path}")
+
+        header_offset = len(self.magic)
+        self._bucket_count, self._entry_count = struct.unpack_from(self.header_format, self._mapping, header_offset)
+
+        offsets_start = header_offset + struct.calcsize(self.header_format)
+        offset_size = struct.calcsize(self.offset_format)
+        self._offsets = [
+            struct.unpack_from(self.offset_format, self._mapping, offsets_start + i * offset_size)[0]
+            for i in range(self._bucket_count + 1)
+        ]
+
+    @property
+    def entry_count(self) -> int:
+        return self._entry_count
+
+    @property
+    def bucket_count(self) -> int:
+        return self._bucket_count
+
+    def read_bucket_payload(self, bucket_index: int) -> memoryview:
+        """
+        Returns the compressed bucket as stored in the file (see BucketCodec.decode).
+        """
+        return self._mapping[self._offsets[bucket_index]:self._offsets[bucket_index + 1]]
+
+    def read_bucket(self, bucket_index: int) -> bytes:
+        chunk = self._decoded_buckets.get(bucket_index)
+        if chunk is not None:
+            return chunk
+
+        chunk = BucketCodec.decode(self.read_bucket_payload(bucket_index))
+        with self._L_cache:
+            while len(self._decoded_buckets) >= self.decoded_bucket_cache_size:
+                del self._decoded_buckets[next(iter(self._decoded_buckets))]
+
+            self._decoded_buckets[bucket_index] = chunk
+
+        return chunk
+
+    def read_chunk(self, first_entry_index: int, entry_count: int) -> bytes:
+        end_entry_index = min(first_entry_index + entry_count, self._entry_count)
+
+        result = bytearray()
+        current_index = first_entry_index
+        while current_index < end_entry_index:
+            bucket_index = int(current_index / self._bucket_entry_count)
+            bucket_start = bucket_index * self._bucket_entry_count
+            bucket_end = min(bucket_start + self._bucket_entry_count, end_entry_index)
+
+            bucket = self.read_bucket(bucket_index)
+            result.extend(bucket[(current_index - bucket_start) * TradeEntry.chunk_size:
+                                 (bucket_end - bucket_start) * TradeEntry.chunk_size])
+            current_index = bucket_end
+
+        return bytes(result)
+
+    @classmethod
+    def write(cls, path: str, bucket_chunks: Iterable[bytes], method: int = BucketCodec.ZLIB):
+        payloads = []
+        entry_count = 0
+        for chunk in bucket_chunks:
+            payloads.append(BucketCodec.encode(chunk, method))
+            entry_count += int(len(chunk) / TradeEntry.chunk_size)
+
+        offset_size = struct.calcsize(cls.offset_format)
+        current_offset = len(cls.magic) + struct.calcsize(cls.header_format) + (len(payloads) + 1) * offset_size
+
+        offsets = []
+        for payload in payloads:
+            offsets.append(current_offset)
+            current_offset += len(payload)
+        offsets.append(current_offset)
+
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as f:
+            f.write(cls.magic)
+            f.write(struct.pack(cls.header_format, len(payloads), entry_count))
+            for offset in offsets:
+                f.write(struct.pack(cls.offset_format, offset))
+
+            for payload in payloads:
+                f.write(payload)
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temporary_path, path)
@@ -0,0 +1,28 @@
+import json
+import os
+from typing import Optional
+
+
+class DatasetManifest(object):
+    """
+    Description of an exported dataset (source endpoint, exported time range and pairs with their entry counts).
+    The manifest is written last by the export, so its presence marks a complete dataset.
+    """
+    file_name = "dataset.json"
+
+    @classmethod
+    def get_path(cls, dataset_path: str) -> str:
+        return os.path.join(dataset_path, cls.file_name)
+
+    @classmethod
+    def load(cls, dataset_path: str) -> Optional[dict]:
+        try:
+            with open(cls.get_path(dataset_path)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    @classmethod
+    def save(cls, dataset_path: str, manifest: dict):
+        with open(cls.get_path(dataset_path), "w") as f:
+            json.dump(manifest, f, indent=2)
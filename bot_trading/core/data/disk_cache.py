@@ -11,6 +11,7 @@ from typing import Dict, Tuple, List, Callable
 from bot_trading.configuration import LOCAL_DISK_CACHE_SIZE
 from bot_trading.core.data.storage_writer import StorageWriter
 from bot_trading.core.data.trade_entry import TradeEntry
+from bot_trading.core.metrics import count, record_duration
 
 
 class DiskCache(object):
@@ -27,6 +28,7 @@ class DiskCache(object):
         self._has_change_update = False
 
         print("LOADING DISK CACHE...")
+        load_start = time.time()
         try:
             with open(DiskCache.get_cache_path(), "rb") as f:
                 while True:  # reading cache entry behind the file size will raise an exception
@@ -45,6 +47,7 @@ class DiskCache(object):
         except:
             print("\t complete")
 
+        record_duration("disk_cache.load", time.time() - load_start)
         Thread(target=self._journal_writer, daemon=True).start()
 
     def get_bucket(self, pair: str, bucket_index: int):
@@ -52,8 +55,10 @@ class DiskCache(object):
         entry = self._cache.get(key)
 
         if entry is None:
+            count("disk_cache.misses")
             return None
 
+        count("disk_cache.hits")
         return entry.payload
 
     def set_bucket(self, pair: str, bucket_index: int, payload: bytes):
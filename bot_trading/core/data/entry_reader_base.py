@@ -1,6 +1,10 @@
+import sys
 from typing import Callable, List
 
+from bot_trading.core.data.bucket_summary import BucketSummary
+from bot_trading.core.data.storage_writer import StorageWriter
 from bot_trading.core.data.trade_entry import TradeEntry
+from bot_trading.core.data.trade_entry_batch import TradeEntryBatch
 
 
 class EntryReaderBase(object):
@@ -10,6 +14,37 @@ class EntryReaderBase(object):
     def get_entry(self, entry_index: int) -> TradeEntry:
         raise NotImplementedError("must be overridden")
 
+    def get_entries(self, start_index: int, end_index: int) -> TradeEntryBatch:
+        """
+        Reads entries from start_index (inclusive) to end_index (exclusive).
+        The batch ends early when an entry is not available.
+        """
+        entries = []
+        for entry_index in range(start_index, end_index):
+            entry = self.get_entry(entry_index)
+            if entry is None:
+                break
+
+            entries.append(entry)
+
+        return TradeEntryBatch.from_entries(self.pair, entries)
+
+    def get_bucket_summaries(self, start_bucket: int, end_bucket: int) -> List[BucketSummary]:
+        """
+        Summaries of buckets from start_bucket (inclusive) to end_bucket (exclusive).
+        Buckets which are not available are not included.
+        """
+        result = []
+        for bucket_index in range(start_bucket, end_bucket):
+            start_index = bucket_index * StorageWriter.bucket_entry_count
+            batch = self.get_entries(start_index, start_index + StorageWriter.bucket_entry_count)
+            if not len(batch):
+                break
+
+            result.append(BucketSummary.from_batch(batch))
+
+        return result
+
     def find_pricebook_start(self, start_time: float) -> int:
         raise NotImplementedError("must be overridden")
 
@@ -21,4 +56,5 @@ class EntryReaderBase(object):
         return self._pair
 
     def __init__(self, pair: str):
-        self._pair = pair
+        # all entries of the reader share the same pair string
+        self._pair = sys.intern(pair)
@@ -0,0 +1,60 @@
+import mmap
+from typing import Dict, List
+
+from bot_trading.core.data.storage_reader import StorageReader
+
+
+class MappedStorageReader(StorageReader):
+    """
+    Storage reader that serves entries from memory mapped book files.
+    Reads don't take any lock and return zero-copy memoryview slices of the mappings.
+    The growing last file is remapped once a read reaches behind its current mapping and the file size changed.
+    """
+
+    def __init__(self, pair):
+        self._mappings: Dict[object, memoryview] = {}
+        self._maps: Dict[object, mmap.mmap] = {}
+
+        # replaced maps that still have slices in use
+        self._retired_maps: List[mmap.mmap] = []
+
+        super().__init__(pair)
+
+    def _read_chunk(self, file, offset: int, size: int):
+        mapping = self._mappings.get(file)
+        if mapping is None or len(mapping) < offset + size:
+            mapping = self._remap(file, mapping)
+
+        return mapping[offset:offset + size]
+
+    def _remap(self, file, old_mapping):
+        length = self._get_file_length(file)
+        if old_mapping is not None and len(old_mapping) >= length:
+            return old_mapping  # file did not grow since last mapping
+
+        if length == 0:
+            mapping = memoryview(b"")  # empty files can't be mapped
+        else:
+            # read only maps can't reach behind the end of the file, so they can't be grown ahead
+            new_map = mmap.mmap(file.fileno(), length, access=mmap.ACCESS_READ)
+            mapping = memoryview(new_map)
+            self._retire_map(self._maps.get(file))
+            self._maps[file] = new_map
+
+        self._mappings[file] = mapping
+        return mapping
+
+    def _retire_map(self, old_map):
+        # the old view is not released explicitly - a concurrent read may still be slicing it,
+        # the map gets closed by a later remap once the view and all its slices are gone
+        if old_map is not None:
+            self._retired_maps.append(old_map)
+
+        still_used_maps = []
+        for retired_map in self._retired_maps:
+            try:
+                retired_map.close()
+            except BufferError:
+                still_used_maps.append(retired_map)  # slices of the map are still alive
+
+        self._retired_maps = still_used_maps
@@ -0,0 +1,77 @@
+from bisect import bisect_right
+from typing import Optional
+
+from bot_trading.core.data.entry_reader_base import EntryReaderBase
+from bot_trading.core.data.storage_writer import StorageWriter
+from bot_trading.core.data.trade_entry import TradeEntry
+from bot_trading.core.data.trade_entry_batch import TradeEntryBatch
+
+
+class MemoryEntryReader(EntryReaderBase):
+    """
+    Keeps a bucket aligned range of entries of another reader in memory.
+    Entry indexes are the same as in the original reader, entries outside of the range are not available.
+    """
+
+    def __init__(self, pair: str, first_entry_index: int, chunk):
+        super().__init__(pair)
+
+        if first_entry_index % StorageWriter.bucket_entry_count:
+            raise ValueError(f"Entries have to start on a bucket boundary, got {first_entry_index}")
+
+        self._first_entry_index = first_entry_index
+        self._batch = TradeEntryBatch(self.pair, chunk)
+
+        # first timestamps of the buckets in the range
+        self._bucket_timestamps = list(self._batch.timestamp[::StorageWriter.bucket_entry_count])
+
+    @classmethod
+    def load(cls, reader: EntryReaderBase, start_timestamp: Optional[float] = None,
+             end_timestamp: Optional[float] = None) -> 'MemoryEntryReader':
+        """
+        Reads entries of the reader needed for replaying books between the timestamps.
+        """
+        bucket_size = StorageWriter.bucket_entry_count
+        entry_count = reader.get_entry_count()
+
+        start_index = 0 if start_timestamp is None else reader.find_pricebook_start(start_timestamp)
+        if end_timestamp is None:
+            end_index = entry_count
+        else:
+            # bucket after the one containing the end timestamp - entries are not strictly ordered
+            end_index = min(entry_count, reader.find_pricebook_start(end_timestamp) + 2 * bucket_size)
+
+        return MemoryEntryReader(reader.pair, start_index, reader.get_entries(start_index, end_index).chunk)
+
+    @property
+    def first_entry_index(self) -> int:
+        return self._first_entry_index
+
+    @property
+    def chunk(self) -> memoryview:
+        return self._batch.chunk
+
+    def get_entry_count(self) -> int:
+        return self._first_entry_index + len(self._batch)
+
+    def get_entry(self, entry_index: int) -> Optional[TradeEntry]:
+        offset = entry_index - self._first_entry_index
+        if not 0 <= offset < len(self._batch):
+            return None
+
+        return self._batch.get_entry(offset)
+
+    def get_entries(self, start_index: int, end_index: int) -> TradeEntryBatch:
+        start_offset = start_index - self._first_entry_index
+        end_offset = min(end_index - self._first_entry_index, len(self._batch))
+        if start_offset < 0 or start_offset >= end_offset:
+            return TradeEntryBatch.empty(self.pair)
+
+        return self._batch[start_offset:end_offset]
+
+    def find_pricebook_start(self, start_time: float) -> int:
+        bucket_index = max(0, bisect_right(self._bucket_timestamps, start_time) - 1)
+        return self._first_entry_index + bucket_index * StorageWriter.bucket_entry_count
+
+    def subscribe(self, follower):
+        raise AssertionError("Entries of memory reader don't change")
@@ -1,4 +1,9 @@
 class PricebookProcessorState(object):
+    """
+    Immutable snapshot of a pricebook processor. The data is shared with processors
+    which copy it on their first change (so creating a state or a view from it is cheap).
+    """
+
     def __init__(self, current_index, timestamp):
         self.current_index = current_index
         self.current_time = timestamp
@@ -7,28 +12,24 @@ class PricebookProcessorState(object):
         self._sell_container = None
         self._buffer = []
 
-    def create_pricebook_processor_data(self):
-        buy_container = self._replicate_container(self._buy_container)
-        sell_container = self._replicate_container(self._sell_container)
-        buffer = list(self._buffer)
-
-        return buy_container, sell_container, buffer
+        # sorted prices of the containers
+        self._buy_prices = None
+        self._sell_prices = None
 
     def inject_to(self, processor):
-        data = self.create_pricebook_processor_data()
-        processor.inject(*data)
+        processor.inject_shared(self._buy_container, self._sell_container, self._buffer,
+                                self._buy_prices, self._sell_prices)
 
     def load_from(self, processor):
-        data = processor.get_dump()
-        self._buy_container = self._replicate_container(data[0])
-        self._sell_container = self._replicate_container(data[1])
-        self._buffer = list(data[2])
-
-    def _replicate_container(self, container):
-        if container is None:
-            return None
-
-        return dict(container)
+        self._buy_container, self._sell_container, self._buffer, self._buy_prices, self._sell_prices = \
+            processor.share_dump()
+
+    def get_size_estimate(self) -> int:
+        """
+        Rough number of bytes held by the state (shared data is counted as if it was owned).
+        """
+        level_count = len(self._buy_container or ()) + len(self._sell_container or ())
+        return 500 + 250 * level_count + 100 * len(self._buffer)
 
     def __repr__(self):
         return f"PricebookViewState {self.current_time}: {self.current_index}"
@@ -0,0 +1,92 @@
+import json
+import os
+from typing import List, Optional
+
+
+class StorageCatalog(object):
+    """
+    Manifest of storage files of a single pair - entry counts, first/last timestamps and sealed/compressed status.
+    Entry count and last timestamp of the open (last) file are saved on file roll and writer checkpoints only,
+    readers have to take the real count of the open file from the file itself.
+    """
+    version = 1
+
+    def __init__(self, files: List[dict] = None):
+        self._files: List[dict] = files or []
+
+    @classmethod
+    def load(cls, path: str) -> Optional['StorageCatalog']:
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None  # missing or partially written catalog
+
+        if data.get("version") != cls.version:
+            return None
+
+        files = data["files"]
+        for file_index, info in enumerate(files):
+            if info["index"] != file_index:
+                return None  # files are expected to be consecutive
+
+        return StorageCatalog(files)
+
+    def save(self, path: str):
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w") as f:
+            json.dump({"version": self.version, "files": self._files}, f, indent=1)
+
+        os.replace(temporary_path, path)
+
+    @property
+    def files(self) -> List[dict]:
+        return self._files
+
+    @property
+    def file_count(self) -> int:
+        return len(self._files)
+
+    @property
+    def last_file_index(self) -> int:
+        return len(self._files) - 1
+
+    def get_file(self, file_index: int) -> Optional[dict]:
+        if 0 <= file_index < len(self._files):
+            return self._files[file_index]
+
+        return None
+
+    def set_file(self, file_index: int, entry_count: int, first_timestamp: Optional[float],
+                 last_timestamp: Optional[float], sealed: bool, compressed: bool):
+        if file_index > len(self._files):
+            raise AssertionError(f"File {file_index} can't be cataloged before file {len(self._files)}")
+
+        info = {
+            "index": file_index,
+            "entry_count": entry_count,
+            "first_timestamp": first_timestamp,
+            "last_timestamp": last_timestamp,
+            "sealed": sealed,
+            "compressed": compressed,
+        }
+
+        if file_index == len(self._files):
+            self._files.append(info)
+        else:
+            self._files[file_index] = info
+
+    def update_file(self, file_index: int, **changes):
+        info = self._files[file_index]
+        for key, value in changes.items():
+            if key not in info:
+                raise AssertionError(f"Unknown catalog field {key}")
+
+            info[key] = value
+
+    def merge_compressed(self, other: 'StorageCatalog'):
+        """
+        Takes compressed flags set by another process (compaction runs next to the writer).
+        """
+        for info, other_info in zip(self._files, other.files):
+            info["compressed"] = info["compressed"] or other_info["compressed"]
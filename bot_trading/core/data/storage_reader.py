@@ -1,19 +1,38 @@
 import os
-from io import SEEK_SET, SEEK_END
-from math import floor
+from array import array
+from bisect import bisect_right
+from io import SEEK_SET
+from math import floor, ceil
 from threading import Lock
 from typing import Tuple, Optional, List, Callable
 
+from bot_trading.core.data.bucket_index import BucketIndex
+from bot_trading.core.data.bucket_summary import BucketSummary
+from bot_trading.core.data.compressed_segment import CompressedSegment
 from bot_trading.core.data.entry_reader_base import EntryReaderBase
+from bot_trading.core.data.storage_catalog import StorageCatalog
 from bot_trading.core.data.storage_writer import StorageWriter
 from bot_trading.core.data.trade_entry import TradeEntry
+from bot_trading.core.data.trade_entry_batch import TradeEntryBatch
 
 
 class StorageReader(EntryReaderBase):
-    def __init__(self, pair):
+    def __init__(self, pair, root_path: Optional[str] = None):
+        """
+        root_path: storage directory to read (StorageWriter.root_path by default)
+        """
+        self._storage = StorageWriter.at_root(root_path)
         self._L_seek = Lock()
+        self._L_index = Lock()
         self._files = {}
-        self._known_last_file_index = 0
+        self._catalog: StorageCatalog = None
+        self._catalog_version = None
+
+        # first timestamps of buckets loaded from the index files
+        self._bucket_timestamps = array("d")
+
+        # summaries of sealed files (they don't change anymore)
+        self._sealed_summaries = {}
 
         self._subscribers: List = None
 
@@ -29,17 +48,92 @@ class StorageReader(EntryReaderBase):
         if entry_count == 0:
             return None
 
-        first_entry = self._parse_entry(0)
-        last_entry = self._parse_entry(entry_count - 1)
-        return (first_entry.timestamp, last_entry.timestamp)
+        catalog = self._get_catalog()
+        first_timestamp = catalog.get_file(0)["first_timestamp"]
+        if first_timestamp is None:
+            first_timestamp = self._parse_entry(0).timestamp
+
+        last_info = catalog.get_file(StorageWriter.get_file_index(entry_count - 1)[0])
+        if last_info is not None and last_info["sealed"] and last_info["last_timestamp"] is not None:
+            last_timestamp = last_info["last_timestamp"]
+        else:
+            # the open file grows behind the catalog
+            last_timestamp = self._parse_entry(entry_count - 1).timestamp
+
+        return (first_timestamp, last_timestamp)
 
     def get_entry(self, index):
         return self._parse_entry(index)
 
+    def get_entries(self, start_index, end_index) -> TradeEntryBatch:
+        chunk_size = TradeEntry.chunk_size
+
+        chunks = []
+        current_index = start_index
+        while current_index < end_index:
+            file, in_file_index = self._get_file(current_index)
+            if file is None:
+                break
+
+            entry_count = min(end_index - current_index, StorageWriter.file_entry_count - in_file_index)
+            chunk = self._read_entries(file, in_file_index, entry_count)
+            read_count = int(len(chunk) / chunk_size)
+
+            # partially written trailing entry is not returned
+            chunks.append(chunk[:read_count * chunk_size])
+            current_index += read_count
+
+            if read_count < entry_count:
+                break  # end of the storage was reached
+
+        if len(chunks) == 1:
+            return TradeEntryBatch(self.pair, chunks[0])
+
+        return TradeEntryBatch(self.pair, b"".join(chunks))
+
     def get_bucket_count(self):
         return int(self.get_entry_count() / StorageWriter.bucket_entry_count)
 
     def find_pricebook_start(self, target):
+        bucket_count = int(ceil(self.get_entry_count() / StorageWriter.bucket_entry_count))
+        bucket_timestamps = self._get_bucket_timestamps(bucket_count)
+        if bucket_timestamps is None:
+            # index is not available - search directly in the storage
+            return self._search_pricebook_start(target)
+
+        bucket_index = max(0, bisect_right(bucket_timestamps, target, 0, bucket_count) - 1)
+        return bucket_index * StorageWriter.bucket_entry_count
+
+    def _get_bucket_timestamps(self, bucket_count) -> Optional[array]:
+        if len(self._bucket_timestamps) < bucket_count:
+            self._load_bucket_index(bucket_count)
+
+        bucket_timestamps = self._bucket_timestamps
+        if len(bucket_timestamps) < bucket_count:
+            return None
+
+        return bucket_timestamps
+
+    def _load_bucket_index(self, bucket_count):
+        buckets_per_file = int(StorageWriter.file_entry_count / StorageWriter.bucket_entry_count)
+
+        with self._L_index:
+            bucket_timestamps = array("d", self._bucket_timestamps)
+            while len(bucket_timestamps) < bucket_count:
+                file_index = int(len(bucket_timestamps) / buckets_per_file)
+                in_file_bucket = len(bucket_timestamps) % buckets_per_file
+
+                index_path = self._storage.get_index_path(self.pair, file_index)
+                file_timestamps = BucketIndex.read(index_path, start_bucket=in_file_bucket)
+                if not file_timestamps:
+                    break  # the index is not complete
+
+                bucket_timestamps.extend(file_timestamps[:buckets_per_file - in_file_bucket])
+
+            # readers without lock always see a consistent array
+            self._bucket_timestamps = bucket_timestamps
+
+    def _search_pricebook_start(self, target):
         interval_start = 0
         interval_end = self.get_bucket_count() - 1
         current_entry = None
@@ -66,13 +160,59 @@ class StorageReader(EntryReaderBase):
         start_entry_index = bucket_index * bucket_size
         end_entry_index = min(start_entry_index + bucket_size, self.get_entry_count())
 
-        chunk_size = int((end_entry_index - start_entry_index) * TradeEntry.chunk_size)
         file, in_file_index = self._get_file(start_entry_index)
-        start_offset = int(in_file_index * TradeEntry.chunk_size)
+        return self._read_entries(file, in_file_index, end_entry_index - start_entry_index)
+
+    def get_bucket_summaries(self, start_bucket: int, end_bucket: int) -> List[BucketSummary]:
+        buckets_per_file = int(StorageWriter.file_entry_count / StorageWriter.bucket_entry_count)
+        end_bucket = min(end_bucket, int(ceil(self.get_entry_count() / StorageWriter.bucket_entry_count)))
+
+        result = []
+        current_bucket = start_bucket
+        while current_bucket < end_bucket:
+            file_index = int(current_bucket / buckets_per_file)
+            in_file_bucket = current_bucket % buckets_per_file
+            file_end_bucket = min(end_bucket, (file_index + 1) * buckets_per_file)
+
+            summaries = self._get_file_summaries(file_index, in_file_bucket)
+            for bucket_index in range(current_bucket, file_end_bucket):
+                offset = bucket_index - current_bucket
+                if offset < len(summaries):
+                    result.append(summaries[offset])
+                else:
+                    # the summary was not written yet (e.g. the bucket is not complete)
+                    result.append(self._create_bucket_summary(bucket_index))
+
+            current_bucket = file_end_bucket
+
+        return result
+
+    def _get_file_summaries(self, file_index: int, start_bucket: int) -> List[BucketSummary]:
+        summaries = self._sealed_summaries.get(file_index)
+        if summaries is not None:
+            return summaries[start_bucket:]
+
+        summaries = BucketSummary.read(self._storage.get_summary_path(self.pair, file_index))
+        info = self._get_catalog().get_file(file_index)
+        buckets_per_file = int(StorageWriter.file_entry_count / StorageWriter.bucket_entry_count)
+        if info is not None and info["sealed"] and len(summaries) == buckets_per_file:
+            self._sealed_summaries[file_index] = summaries
+
+        return summaries[start_bucket:]
+
+    def _create_bucket_summary(self, bucket_index: int) -> BucketSummary:
+        start_index = bucket_index * StorageWriter.bucket_entry_count
+        return BucketSummary.from_batch(self.get_entries(start_index, start_index + StorageWriter.bucket_entry_count))
+
+    def get_compressed_bucket(self, bucket_index) -> Optional[memoryview]:
+        """
+        Returns the bucket payload as it is stored in a compressed segment (None for uncompressed files).
+        """
+        file, in_file_index = self._get_file(bucket_index * StorageWriter.bucket_entry_count)
+        if not isinstance(file, CompressedSegment):
+            return None
 
-        with self._L_seek:
-            file.seek(start_offset, SEEK_SET)
-            return file.read(chunk_size)
+        return file.read_bucket_payload(int(in_file_index / StorageWriter.bucket_entry_count))
 
     def subscribe(self, feed_handler: Callable[[int, List[TradeEntry]], None]):
         if self._subscribers:
@@ -98,27 +238,24 @@ class StorageReader(EntryReaderBase):
                 with self._L_event:
                     file_index = storage._get_last_file_index()
                     file = storage._get_file_by_index(file_index)
-                    with storage._L_seek:
-                        file_end = file.seek(0, SEEK_END)
+                    file_entry_count = storage._get_file_entry_count(file)
 
-                    entry_index = int(file_end / TradeEntry.chunk_size) + file_index * StorageWriter.file_entry_count
+                    entry_index = file_entry_count + file_index * StorageWriter.file_entry_count
 
                     if self._next_entry_index is None:
                         # first event - just initialize
                         self._next_entry_index = entry_index
                         return
 
-                    result = []
-                    for i in range(self._next_entry_index, entry_index):
-                        result.append(storage.get_entry(i))
+                    result = storage.get_entries(self._next_entry_index, entry_index).to_entries()
 
                     if result:
                         for subscriber in storage._subscribers:
                             subscriber(self._next_entry_index, result)
 
-                    self._next_entry_index = entry_index
+                    self._next_entry_index += len(result)
 
-        directory = os.path.dirname(StorageWriter.get_storage_path(self.pair, 0))
+        directory = os.path.dirname(self._storage.get_storage_path(self.pair, 0))
         event_handler = Handler()
         observer = Observer(timeout=100)
         observer.schedule(event_handler, directory, recursive=False)
@@ -130,9 +267,7 @@ class StorageReader(EntryReaderBase):
             return None
 
         chunk_size = TradeEntry.chunk_size
-        with self._L_seek:
-            file.seek(in_file_entry_index * chunk_size, SEEK_SET)
-            chunk = file.read(chunk_size)
+        chunk = self._read_entries(file, in_file_entry_index, 1)
 
         if len(chunk) == 0:
             return None
@@ -150,36 +285,43 @@ class StorageReader(EntryReaderBase):
 
     def _get_file_by_index(self, file_index):
         if file_index not in self._files:
-            path = StorageWriter.get_storage_path(self.pair, file_index)
-            if not os.path.exists(path):
+            file = self._open_file(file_index)
+            if file is None:
                 return None
 
-            self._files[file_index] = open(path, "rb")
-            self._known_last_file_index = max(self._known_last_file_index, file_index)
+            self._files[file_index] = file
 
         return self._files[file_index]
 
-    def _get_last_file_index(self):
-        if self._known_last_file_index in self._files:
-            entry_count = self._get_file_entry_count(self._files[self._known_last_file_index])
-
-            if entry_count < StorageWriter.file_entry_count:
-                # then known last file is not filled yet -> its really the last file
-                return self._known_last_file_index
-
-        # otherwise search for the really last file
-        i = 0
-        while True:
-            path = StorageWriter.get_storage_path(self.pair, i)
-            if not os.path.exists(path):
-                break
+    def _get_catalog(self) -> StorageCatalog:
+        if self._catalog is None:
+            self._catalog = self._storage.load_catalog(self.pair)
 
-            i += 1
+        return self._catalog
+
+    def _get_last_file_index(self):
+        catalog = self._get_catalog()
+        last_index = catalog.last_file_index
+        if last_index < 0 or self._get_file_entry_count(self._get_file_by_index(last_index)) >= \
+                StorageWriter.file_entry_count:
+            # the last known file is full (or nothing was written yet) - writer may continue in a next file,
+            # which is announced by a catalog save
+            catalog_version = self._get_catalog_version()
+            if catalog_version is None or catalog_version != self._catalog_version:
+                catalog = self._catalog = self._storage.load_catalog(self.pair)
+                self._catalog_version = catalog_version
+                last_index = catalog.last_file_index
 
-        last_index = i - 1
-        self._known_last_file_index = last_index
         return last_index
 
+    def _get_catalog_version(self):
+        try:
+            stat = os.stat(self._storage.get_catalog_path(self.pair))
+        except FileNotFoundError:
+            return None  # storage without catalog has to be probed every time
+
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
     def _get_last_file(self):
         index = self._get_last_file_index()
         return self._get_file_by_index(index)
@@ -188,8 +330,39 @@ class StorageReader(EntryReaderBase):
         if file is None:
             return 0
 
-        with self._L_seek:
-            file.seek(0, SEEK_END)
-            length = file.tell()
+        if isinstance(file, CompressedSegment):
+            return file.entry_count
 
+        length = self._get_file_length(file)
         return int(floor(length / TradeEntry.chunk_size))
+
+    def _get_file_length(self, file) -> int:
+        # fstat does not touch the shared file position - no locking is needed
+        return os.fstat(file.fileno()).st_size
+
+    def _open_file(self, file_index):
+        info = self._get_catalog().get_file(file_index)
+        if info is None or not info["compressed"]:
+            path = self._storage.get_storage_path(self.pair, file_index)
+            try:
+                return open(path, "rb")
+            except FileNotFoundError:
+                pass  # the file does not exist or it was compressed already
+
+        compressed_path = self._storage.get_compressed_storage_path(self.pair, file_index)
+        if not os.path.exists(compressed_path):
+            return None
+
+        return CompressedSegment(compressed_path, StorageWriter.bucket_entry_count)
+
+    def _read_entries(self, file, in_file_index: int, entry_count: int):
+        if isinstance(file, CompressedSegment):
+            return file.read_chunk(in_file_index, entry_count)
+
+        chunk_size = TradeEntry.chunk_size
+        return self._read_chunk(file, in_file_index * chunk_size, entry_count * chunk_size)
+
+    def _read_chunk(self, file, offset: int, size: int):
+        with self._L_seek:
+            file.seek(offset, SEEK_SET)
+            return file.read(size)
@@ -0,0 +1,225 @@
+import os
+import time
+from collections import Counter
+from multiprocessing import Pool
+from typing import List
+
+import numpy as np
+
+from bot_trading.core.data.storage_reader import StorageReader
+from bot_trading.core.data.storage_writer import StorageWriter
+from bot_trading.core.data.trade_entry import TradeEntry
+from bot_trading.core.processors.pricebook_processor import PricebookProcessor
+
+
+class StorageVerifier(object):
+    """
+    Offline integrity check of the storage. Every bucket starts with a full pricebook dump,
+    so bucket ranges of all the pairs are verified independently in worker processes.
+    """
+
+    # issues that don't make the storage invalid (exchange feed is not strictly ordered)
+    warning_kinds = {"timestamp_regression", "unflushed_tail"}
+
+    # how many buckets are verified by a single task
+    task_bucket_count = 1000
+
+    # how many issue samples are kept per task
+    sample_limit = 20
+
+    def __init__(self, pairs: List[str], worker_count: int = None, check_books: bool = True):
+        self._pairs = pairs
+        self._worker_count = worker_count or os.cpu_count()
+        self._check_books = check_books
+
+    def run(self) -> dict:
+        start = time.time()
+
+        pair_reports = {}
+        tasks = []
+        for pair in self._pairs:
+            reader = StorageReader(pair)
+            entry_count = reader.get_entry_count()
+            bucket_count = int((entry_count + StorageWriter.bucket_entry_count - 1) / StorageWriter.bucket_entry_count)
+
+            pair_reports[pair] = {
+                "entry_count": entry_count,
+                "bucket_count": bucket_count,
+                "issues": Counter(self._check_alignment(pair)),
+                "samples": [],
+                "cpu_seconds": 0.0,
+            }
+
+            for start_bucket in range(0, bucket_count, self.task_bucket_count):
+                end_bucket = min(start_bucket + self.task_bucket_count, bucket_count)
+                tasks.append((StorageWriter.root_path, pair, entry_count, start_bucket, end_bucket, self._check_books))
+
+        task_results = []
+        with Pool(self._worker_count) as pool:
+            for result in pool.imap_unordered(_verify_task, tasks):
+                pair_report = pair_reports[result["pair"]]
+                pair_report["issues"].update(result["issues"])
+                pair_report["samples"].extend(result["samples"])
+                pair_report["cpu_seconds"] += result["seconds"]
+                task_results.append(result)
+
+        # bucket start ordering between neighbouring tasks
+        task_results.sort(key=lambda r: (r["pair"], r["start_bucket"]))
+        for previous, current in zip(task_results, task_results[1:]):
+            if previous["pair"] != current["pair"] or previous["last_bucket_timestamp"] is None:
+                continue
+
+            if current["first_bucket_timestamp"] is not None and \
+                    current["first_bucket_timestamp"] < previous["last_bucket_timestamp"]:
+                pair_report = pair_reports[current["pair"]]
+                pair_report["issues"]["bucket_start_regression"] += 1
+                pair_report["samples"].append(
+                    {"kind": "bucket_start_regression", "bucket": current["start_bucket"]})
+
+        walltime = time.time() - start
+        total_entries = 0
+        error_count = 0
+        for pair, pair_report in pair_reports.items():
+            issues = pair_report["issues"]
+            pair_report["issues"] = dict(issues)
+            pair_report["samples"] = sorted(pair_report["samples"], key=lambda s: s.get("entry", 0))[:self.sample_limit]
+            pair_report["error_count"] = sum(c for kind, c in issues.items() if kind not in self.warning_kinds)
+            pair_report["warning_count"] = sum(c for kind, c in issues.items() if kind in self.warning_kinds)
+
+            total_entries += pair_report["entry_count"]
+            error_count += pair_report["error_count"]
+
+        return {
+            "ok": error_count == 0,
+            "error_count": error_count,
+            "worker_count": self._worker_count,
+            "task_count": len(tasks),
+            "total_entries": total_entries,
+            "walltime": walltime,
+            "entries_per_second": total_entries / walltime if walltime > 0 else None,
+            "pairs": pair_reports,
+        }
+
+    def _check_alignment(self, pair: str):
+        issues = Counter()
+        catalog = StorageWriter.load_catalog(pair)
+        for file_info in catalog.files:
+            path = StorageWriter.get_storage_path(pair, file_info["index"])
+            if not os.path.exists(path):
+                continue  # compressed segments are aligned by construction
+
+            size = os.path.getsize(path)
+            if size % TradeEntry.chunk_size:
+                issues["misaligned_file"] += 1
+
+            if size > StorageWriter.file_entry_count * TradeEntry.chunk_size:
+                issues["oversized_file"] += 1
+
+            if file_info["index"] < catalog.last_file_index and \
+                    size < StorageWriter.file_entry_count * TradeEntry.chunk_size:
+                issues["unsealed_inner_file"] += 1
+
+        return issues
+
+    @classmethod
+    def verify_buckets(cls, pair: str, entry_count: int, start_bucket: int, end_bucket: int,
+                       check_books: bool) -> dict:
+        start = time.time()
+        reader = StorageReader(pair)
+        bucket_size = StorageWriter.bucket_entry_count
+
+        issues = Counter()
+        samples = []
+
+        def report(kind, entry_index, count=1):
+            issues[kind] += count
+            if len(samples) < cls.sample_limit:
+                samples.append({"kind": kind, "entry": int(entry_index)})
+
+        first_bucket_timestamp = None
+        last_bucket_timestamp = None
+        for bucket_index in range(start_bucket, end_bucket):
+            bucket_start = bucket_index * bucket_size
+            bucket_end = min(bucket_start + bucket_size, entry_count)
+            batch = reader.get_entries(bucket_start, bucket_end)
+            if len(batch) != bucket_end - bucket_start:
+                report("truncated_bucket", bucket_start + len(batch))
+                if not len(batch):
+                    continue
+
+            info = batch.info
+            timestamp = batch.timestamp
+
+            starts_with_reset = bool(info[0] & 2)
+            if not starts_with_reset:
+                report("bucket_start_not_reset", bucket_start)
+
+            invalid_info = np.count_nonzero(info & ~np.uint8(7))
+            if invalid_info:
+                report("invalid_info_byte", bucket_start, invalid_info)
+
+            values = np.stack([batch.price, batch.volume, timestamp])
+            if not np.all(np.isfinite(values)):
+                report("non_finite_value", bucket_start, np.count_nonzero(~np.isfinite(values)))
+            elif np.any(values < 0):
+                report("negative_value", bucket_start, np.count_nonzero(values < 0))
+
+            # bucket starts with a dump closed by the first flush entry
+            # (the dump includes entries buffered by the writer, so it may contain resets as well)
+            flush_positions = np.flatnonzero(info & 4)
+            if not len(flush_positions):
+                if bucket_end == entry_count:
+                    report("unflushed_tail", bucket_start, len(batch))
+                else:
+                    report("missing_dump_flush", bucket_start)
+                dump_end = len(batch)
+            else:
+                dump_end = int(flush_positions[0]) + 1
+                if bucket_end == entry_count and flush_positions[-1] != len(batch) - 1:
+                    report("unflushed_tail", bucket_start + flush_positions[-1] + 1,
+                           len(batch) - flush_positions[-1] - 1)
+
+            # feed timestamps (resets carry local time)
+            feed_timestamps = timestamp[dump_end:][(info[dump_end:] & 2) == 0]
+            regressions = np.flatnonzero(np.diff(feed_timestamps) < 0)
+            if len(regressions):
+                report("timestamp_regression", bucket_start, len(regressions))
+
+            if last_bucket_timestamp is not None and timestamp[0] < last_bucket_timestamp:
+                report("bucket_start_regression", bucket_start)
+
+            if first_bucket_timestamp is None:
+                first_bucket_timestamp = float(timestamp[0])
+            last_bucket_timestamp = float(timestamp[0])
+
+            if check_books and starts_with_reset:
+                # the pricebook can't be replayed without the initial reset
+                cls._check_books(batch, bucket_start, report)
+
+        return {
+            "pair": pair,
+            "start_bucket": start_bucket,
+            "issues": dict(issues),
+            "samples": samples,
+            "first_bucket_timestamp": first_bucket_timestamp,
+            "last_bucket_timestamp": last_bucket_timestamp,
+            "seconds": time.time() - start,
+        }
+
+    @classmethod
+    def _check_books(cls, batch, bucket_start: int, report):
+        processor = PricebookProcessor(batch.pair)
+        for offset, entry in enumerate(batch):
+            processor.accept(entry)
+            if not entry.is_flush_entry or not processor.is_book_available:
+                continue
+
+            bid, ask = processor.bid_ask
+            if bid > ask:
+                report("crossed_book", bucket_start + offset)
+
+
+def _verify_task(task):
+    root_path, pair, entry_count, start_bucket, end_bucket, check_books = task
+    StorageWriter.root_path = root_path  # workers may be spawned without the parent state
+    return StorageVerifier.verify_buckets(pair, entry_count, start_bucket, end_bucket, check_books)
@@ -1,9 +1,15 @@
 import datetime
 import os
-from typing import Tuple, List
+import time
+from typing import Tuple, List, Optional
 
+from bot_trading.core.data.bucket_index import BucketIndex
+from bot_trading.core.data.bucket_summary import BucketSummary
+from bot_trading.core.data.compressed_segment import CompressedSegment
 from bot_trading.core.data.parsing import get_pair_id
+from bot_trading.core.data.storage_catalog import StorageCatalog
 from bot_trading.core.data.trade_entry import TradeEntry
+from bot_trading.core.data.trade_entry_batch import TradeEntryBatch
 from bot_trading.core.processors.pricebook_processor import PricebookProcessor
 
 
@@ -12,55 +18,241 @@ class StorageWriter(object):
     bucket_entry_count = 1000  # how often full pricebook will be written
     file_entry_count = 1_000_000
 
+    @classmethod
+    def at_root(cls, root_path: Optional[str]) -> type:
+        """
+        Storage layout (paths, catalog) of the given root directory - the global root_path stays unchanged.
+        """
+        if root_path is None:
+            return cls
+
+        return type(cls.__name__, (cls,), {"root_path": root_path})
+
     @classmethod
     def get_storage_path(cls, pair: str, file_number: int):
         pair_id = get_pair_id(pair)
         path = os.path.join(cls.root_path, f"{pair_id}/pair_{pair_id}_{file_number}.book")
         return path
 
+    @classmethod
+    def get_index_path(cls, pair: str, file_number: int):
+        return os.path.splitext(cls.get_storage_path(pair, file_number))[0] + ".idx"
+
+    @classmethod
+    def get_summary_path(cls, pair: str, file_number: int):
+        return os.path.splitext(cls.get_storage_path(pair, file_number))[0] + ".sum"
+
+    @classmethod
+    def get_compressed_storage_path(cls, pair: str, file_number: int):
+        return os.path.splitext(cls.get_storage_path(pair, file_number))[0] + ".cbook"
+
+    @classmethod
+    def storage_file_exists(cls, pair: str, file_number: int):
+        return os.path.exists(cls.get_storage_path(pair, file_number)) or \
+               os.path.exists(cls.get_compressed_storage_path(pair, file_number))
+
+    @classmethod
+    def get_catalog_path(cls, pair: str):
+        return os.path.join(os.path.dirname(cls.get_storage_path(pair, 0)), "catalog.json")
+
     @classmethod
     def get_file_index(cls, entry_index: int) -> Tuple[int, int]:
         return int(entry_index / cls.file_entry_count), entry_index % cls.file_entry_count
 
-    def __init__(self, pair: str):
+    @classmethod
+    def load_catalog(cls, pair: str) -> StorageCatalog:
+        """
+        Loads catalog of the pair storage. Files missing in the catalog are inspected and added
+        (the catalog is not saved here).
+        """
+        catalog = StorageCatalog.load(cls.get_catalog_path(pair)) or StorageCatalog()
+
+        file_count = catalog.file_count
+        while cls.storage_file_exists(pair, file_count):
+            file_count += 1
+
+        if file_count == catalog.file_count:
+            return catalog  # catalog knows all the files
+
+        # the previously open file was probably sealed meanwhile
+        first_stale_index = catalog.file_count
+        if catalog.file_count and not catalog.get_file(catalog.last_file_index)["sealed"]:
+            first_stale_index = catalog.last_file_index
+
+        for file_index in range(first_stale_index, file_count):
+            catalog.set_file(file_index, **cls._inspect_storage_file(pair, file_index))
+
+        return catalog
+
+    @classmethod
+    def _inspect_storage_file(cls, pair: str, file_index: int) -> dict:
+        book_path = cls.get_storage_path(pair, file_index)
+        if os.path.exists(book_path):
+            with open(book_path, "rb") as f:
+                entry_count = int(os.fstat(f.fileno()).st_size / TradeEntry.chunk_size)
+                chunk = f.read(TradeEntry.chunk_size)
+                f.seek(max(0, entry_count - 1) * TradeEntry.chunk_size, os.SEEK_SET)
+                last_chunk = f.read(TradeEntry.chunk_size)
+
+            compressed = False
+        else:
+            segment = CompressedSegment(cls.get_compressed_storage_path(pair, file_index), cls.bucket_entry_count)
+            entry_count = segment.entry_count
+            chunk = segment.read_chunk(0, 1)
+            last_chunk = segment.read_chunk(max(0, entry_count - 1), 1)
+            compressed = True
+
+        first_timestamp = last_timestamp = None
+        if entry_count:
+            first_timestamp = TradeEntry(pair, chunk).timestamp
+            last_timestamp = TradeEntry(pair, last_chunk).timestamp
+
+        return {
+            "entry_count": entry_count,
+            "first_timestamp": first_timestamp,
+            "last_timestamp": last_timestamp,
+            "sealed": entry_count >= cls.file_entry_count,
+            "compressed": compressed,
+        }
+
+    def __init__(self, pair: str, flush_interval: float = 0.0, flush_size: int = 0):
+        """
+        Written entries are packed into a buffer and committed to the file by a single write.
+        Commit happens on every flush by default, flush_interval (seconds) and flush_size (bytes)
+        allow grouping more flushes into one commit.
+        """
         self._pair = pair
         dirpath = os.path.dirname(self.get_storage_path(self._pair, 0))
         os.makedirs(dirpath, exist_ok=True)
 
+        self._catalog = self.load_catalog(self._pair)
         self._next_entry_index = self._load_entry_index()
+        self._last_timestamp: Optional[float] = None
         self._pricebook = PricebookProcessor(self._pair)
         self._current_file = None
+        self._current_index_file = None
 
-        self._buffer: List[TradeEntry] = []
+        self._flush_interval = flush_interval
+        self._flush_size = flush_size
+        self._write_buffer = bytearray(max(flush_size, self.bucket_entry_count * TradeEntry.chunk_size))
+        self._write_length = 0
+        self._last_commit_time = time.time()
 
-    def _load_entry_index(self):
-        i = 0
-        while True:
-            next_file_path = self.get_storage_path(self._pair, i)
-            if not os.path.exists(next_file_path):
-                break
+        # entries of the current bucket - summarized when the bucket is complete
+        self._bucket_chunk = bytearray()
+
+        self._ensure_bucket_index()
+        self._ensure_bucket_summaries()
+        self._save_catalog()
 
-            i += 1
+        self._buffer: List[TradeEntry] = []
 
-        i -= 1  # go to previous storage index which should exist
+    def _load_entry_index(self):
+        i = self._catalog.last_file_index
         if i < 0:
-            # unless no storage exists
+            # no storage exists
             return 0
 
         path = self.get_storage_path(self._pair, i)
+        if not os.path.exists(path):
+            # only sealed (full) files are compressed
+            return (i + 1) * self.file_entry_count
+
         size = os.path.getsize(path)
         if size % TradeEntry.chunk_size != 0:
-            with open(path, "w") as f:
-                f.seek(int(size / TradeEntry.chunk_size) * TradeEntry.chunk_size, os.SEEK_SET)
-                f.truncate()
-                raise AssertionError(f"Invalid alignment detected for {path}")
+            # only the partially written trailing record is dropped
+            aligned_size = int(size / TradeEntry.chunk_size) * TradeEntry.chunk_size
+            with open(path, "r+b") as f:
+                f.truncate(aligned_size)
+                os.fsync(f.fileno())
+
+            print(f"Invalid alignment detected for {path}, truncated from {size} B to {aligned_size} B")
+            size = aligned_size
+
+        entry_count = int(size / TradeEntry.chunk_size)
+        if self._catalog.get_file(i)["entry_count"] != entry_count:
+            self._catalog.set_file(i, **self._inspect_storage_file(self._pair, i))
+
+        return i * self.file_entry_count + entry_count
 
-        return i * self.file_entry_count + int(size / TradeEntry.chunk_size)
+    def _ensure_bucket_index(self):
+        file_number, in_file_index = self.get_file_index(self._next_entry_index)
+        book_path = self.get_storage_path(self._pair, file_number)
+        if not os.path.exists(book_path):
+            return  # nothing is written in the file yet
+
+        index_path = self.get_index_path(self._pair, file_number)
+        bucket_count = int((in_file_index + self.bucket_entry_count - 1) / self.bucket_entry_count)
+        if BucketIndex.get_record_count(index_path) != bucket_count:
+            # index is missing or it was not written completely - appends would not be aligned with buckets
+            BucketIndex.rebuild(book_path, index_path, self.bucket_entry_count)
+
+    def _ensure_bucket_summaries(self):
+        if self._next_entry_index == 0:
+            return  # nothing was written yet
+
+        file_number, last_in_file_index = self.get_file_index(self._next_entry_index - 1)
+        book_path = self.get_storage_path(self._pair, file_number)
+        if not os.path.exists(book_path):
+            return  # compressed files are summarized by the backfill
+
+        # summary of a bucket is written when the next bucket starts
+        last_bucket = int(last_in_file_index / self.bucket_entry_count)
+        summary_path = self.get_summary_path(self._pair, file_number)
+        if BucketSummary.get_record_count(summary_path) != last_bucket:
+            BucketSummary.rebuild(summary_path, self._pair, self._read_book_buckets(book_path, last_bucket))
+
+        bucket_size = self.bucket_entry_count * TradeEntry.chunk_size
+        with open(book_path, "rb") as f:
+            f.seek(last_bucket * bucket_size, os.SEEK_SET)
+            self._bucket_chunk = bytearray(f.read(bucket_size))
+
+    @classmethod
+    def _read_book_buckets(cls, book_path: str, bucket_count: int):
+        bucket_size = cls.bucket_entry_count * TradeEntry.chunk_size
+        with open(book_path, "rb") as f:
+            for _ in range(bucket_count):
+                yield f.read(bucket_size)
+
+    def _finish_bucket_summary(self):
+        if not self._bucket_chunk:
+            return
+
+        file_number = self.get_file_index(self._next_entry_index - 1)[0]
+        summary = BucketSummary.from_batch(TradeEntryBatch(self._pair, bytes(self._bucket_chunk)))
+        with open(os.path.abspath(self.get_summary_path(self._pair, file_number)), "ab") as f:
+            BucketSummary.append(f, summary)
+
+        self._bucket_chunk = bytearray()
+
+    def _save_catalog(self):
+        catalog_path = self.get_catalog_path(self._pair)
+        stored_catalog = StorageCatalog.load(catalog_path)
+        if stored_catalog:
+            self._catalog.merge_compressed(stored_catalog)
+
+        self._catalog.save(catalog_path)
+
+    def _update_catalog(self, sealed: bool):
+        file_number, in_file_index = self.get_file_index(self._next_entry_index)
+        if sealed:
+            file_number -= 1  # the file was filled completely
+            in_file_index = self.file_entry_count
+
+        # the catalog is kept in memory, it is saved on file roll and checkpoint
+        self._catalog.update_file(file_number, entry_count=in_file_index, last_timestamp=self._last_timestamp,
+                                  sealed=sealed)
 
     def _open_next_file(self):
-        file_number = int(self._next_entry_index / self.file_entry_count)
+        file_number, in_file_index = self.get_file_index(self._next_entry_index)
         path = self.get_storage_path(self._pair, file_number)
 
+        if self._catalog.get_file(file_number) is None:
+            self._catalog.set_file(file_number, entry_count=in_file_index, first_timestamp=None, last_timestamp=None,
+                                   sealed=False, compressed=False)
+
+        self._current_index_file = open(os.path.abspath(self.get_index_path(self._pair, file_number)), "ab")
+
         abs_path = os.path.abspath(path)
         return open(abs_path, "ab")
 
@@ -68,9 +260,11 @@ class StorageWriter(object):
         entry = TradeEntry.create_entry(self._pair, is_buy, price, volume, timestamp, False, is_flush=False)
         self._buffer.append(entry)
 
-    def reset(self, is_buy):
-        entry = TradeEntry.create_entry(self._pair, is_buy, 0.0, 0.0, datetime.datetime.utcnow().timestamp(),
-                                        is_reset=True, is_flush=False)
+    def reset(self, is_buy, timestamp: Optional[float] = None):
+        if timestamp is None:
+            timestamp = datetime.datetime.utcnow().timestamp()
+
+        entry = TradeEntry.create_entry(self._pair, is_buy, 0.0, 0.0, timestamp, is_reset=True, is_flush=False)
         self._buffer.append(entry)
 
     def flush(self):
@@ -82,8 +276,51 @@ class StorageWriter(object):
             self._handle_write(entry)
 
         self._buffer = []
+        self.commit_if_due()
 
-        self._current_file.flush()
+    def commit_if_due(self):
+        """
+        Commits the written entries when the flush policy says so.
+        """
+        if not self._write_length:
+            return  # nothing is pending
+
+        is_due = self._flush_interval <= 0 or time.time() - self._last_commit_time >= self._flush_interval
+        if is_due or (self._flush_size and self._write_length >= self._flush_size):
+            self.commit()
+
+    def commit(self):
+        """
+        Hands all written entries to the OS, so readers can see them.
+        """
+        self._write_pending()
+        if self._current_file:
+            self._current_file.flush()
+            self._current_index_file.flush()
+
+        self._last_commit_time = time.time()
+
+    def checkpoint(self):
+        """
+        Commits all written entries and waits until they are stored durably.
+        """
+        self.commit()
+        if self._current_file:
+            os.fsync(self._current_file.fileno())
+            os.fsync(self._current_index_file.fileno())
+
+        self._save_catalog()
+
+    def close(self):
+        """
+        Stores all written entries durably and closes the files. Entries of an unfinished flush are dropped.
+        """
+        self.checkpoint()
+        if self._current_file:
+            self._current_file.close()
+            self._current_index_file.close()
+            self._current_file = None
+            self._current_index_file = None
 
     def _handle_write(self, entry):
         self._pricebook.accept(entry)
@@ -93,25 +330,57 @@ class StorageWriter(object):
 
         if not need_new_bucket and not need_new_file:
             # simple write through
-            chunk = TradeEntry.to_chunk(entry)
-            self._write_chunk(chunk)
+            self._write_entry(entry)
             return  # a usual entry, no special action to handle it
         elif not self._pricebook.is_ready:
             return  # wait until pricebook is initialized (for the first time, when service record is to be created)
 
+        if need_new_bucket:
+            self._finish_bucket_summary()
+
         if need_new_file:
             if self._current_file:
+                self.checkpoint()  # the file is sealed, it won't change anymore
                 self._current_file.close()
+                self._current_index_file.close()
+                self._update_catalog(sealed=True)
             self._current_file = None
+            self._current_index_file = None
 
         if need_new_bucket:
             service_entries = self._pricebook.dump_to_entries()
             for entry in service_entries:
-                chunk = TradeEntry.to_chunk(entry)
-                self._write_chunk(chunk)
+                self._write_entry(entry)
 
-    def _write_chunk(self, chunk):
+            # the first service entry starts the bucket
+            BucketIndex.append(self._current_index_file, service_entries[0].timestamp)
+
+            file_info = self._catalog.get_file(self.get_file_index(self._next_entry_index - 1)[0])
+            if file_info["first_timestamp"] is None:
+                file_info["first_timestamp"] = service_entries[0].timestamp
+            self._update_catalog(sealed=False)
+
+            if need_new_file:
+                self._save_catalog()  # readers learn about the sealed file and the new one
+
+    def _write_entry(self, entry: TradeEntry):
         if self._current_file is None:
             self._current_file = self._open_next_file()
-        self._current_file.write(bytes(chunk))
+
+        if self._write_length + TradeEntry.chunk_size > len(self._write_buffer):
+            self._write_pending()
+
+        TradeEntry.pack_into(self._write_buffer, self._write_length, entry)
+        self._bucket_chunk += self._write_buffer[self._write_length:self._write_length + TradeEntry.chunk_size]
+        self._write_length += TradeEntry.chunk_size
         self._next_entry_index += 1
+        self._last_timestamp = entry.timestamp
+
+    def _write_pending(self):
+        if not self._write_length:
+            return
+
+        with memoryview(self._write_buffer) as buffer_view:
+            self._current_file.write(buffer_view[:self._write_length])
+
+        self._write_length = 0
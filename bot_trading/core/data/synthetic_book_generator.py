@@ -0,0 +1,143 @@
+import math
+import random
+from typing import Dict, Optional
+
+from bot_trading.core.configuration import BOOK_DEPTH, DUST_LEVEL
+from bot_trading.core.data.storage_writer import StorageWriter
+
+
+class SyntheticBookGenerator(object):
+    """
+    Writes a synthetic book feed of a pair through StorageWriter (so buckets, indexes and summaries are real).
+    Mid price follows a random walk, feed messages update levels around the top of the book,
+    some updates remove levels and the book is occasionally reset by a snapshot.
+    Levels crossed by the moving mid price are moved behind the top, so the book never gets crossed.
+    """
+
+    # average time between feed messages (in seconds)
+    message_interval = 0.5
+
+    # how much the mid price moves per message (standard deviation of the log return)
+    volatility = 0.0002
+
+    # probabilities of the message kinds
+    snapshot_probability = 0.001
+    removal_probability = 0.3
+
+    max_updates_per_message = 3
+
+    def __init__(self, pair: str, seed: int = 0, start_timestamp: float = 1571234567.0, mid_price: float = 100.0,
+                 tick_size: float = 0.01, root_path: Optional[str] = None):
+        self._pair = pair
+        self._storage = StorageWriter.at_root(root_path)
+        self._random = random.Random(seed)
+        self._timestamp = start_timestamp
+        self._mid_price = mid_price
+        self._tick_size = tick_size
+
+        # written book as the pricebook processor sees it (price -> volume of each side)
+        self._levels: Dict[bool, Dict[float, float]] = {True: {}, False: {}}
+
+    @property
+    def current_timestamp(self) -> float:
+        return self._timestamp
+
+    def generate(self, entry_count: int):
+        """
+        Writes at least entry_count feed entries (service entries of the buckets are not counted).
+        """
+        writer = self._storage(self._pair, flush_interval=3600.0, flush_size=1024 * 1024)
+
+        written_count = self._write_snapshot(writer)
+        while written_count < entry_count:
+            self._timestamp = round(self._timestamp + self._random.expovariate(1.0 / self.message_interval), 6)
+            self._mid_price *= math.exp(self._random.gauss(0.0, self.volatility))
+
+            if self._random.random() < self.snapshot_probability:
+                written_count += self._write_snapshot(writer)
+            else:
+                written_count += self._write_update(writer)
+
+        writer.close()
+
+    def _write_snapshot(self, writer: StorageWriter) -> int:
+        # a reset clears both sides of the book
+        writer.reset(True, self._timestamp)
+        self._levels = {True: {}, False: {}}
+        for is_buy in [True, False]:
+            for level in range(1, BOOK_DEPTH + 1):
+                self._write_level(writer, is_buy, self._get_level_price(is_buy, level), self._get_volume())
+
+        writer.flush()
+        return 2 * BOOK_DEPTH + 1
+
+    def _write_update(self, writer: StorageWriter) -> int:
+        written_count = self._move_crossed_levels(writer)
+
+        update_count = self._random.randint(1, self.max_updates_per_message)
+        for _ in range(update_count):
+            is_buy = self._random.random() < 0.5
+            levels = self._levels[is_buy]
+            if self._random.random() < self.removal_probability and len(levels) > 1:
+                # an existing level is removed (the last level of a side stays)
+                price = self._random.choice(sorted(levels))
+                self._write_level(writer, is_buy, price, 0.0)
+            else:
+                # levels near the top of the book change the most
+                level = min(BOOK_DEPTH, 1 + int(self._random.expovariate(0.5)))
+                self._write_level(writer, is_buy, self._get_level_price(is_buy, level), self._get_volume())
+
+        writer.flush()
+        return written_count + update_count
+
+    def _move_crossed_levels(self, writer: StorageWriter) -> int:
+        """
+        Moves levels that got on the other side of the moved mid price behind the top of their side,
+        so bid stays below ask and the book keeps its depth.
+        """
+        written_count = 0
+        for is_buy in [True, False]:
+            levels = self._levels[is_buy]
+            crossed_prices = [price for price in sorted(levels)
+                              if (price >= self._mid_price if is_buy else price <= self._mid_price)]
+            for price in crossed_prices:
+                if len(levels) > 1:
+                    self._write_level(writer, is_buy, price, 0.0)
+                    self._write_level(writer, is_buy, self._get_free_level_price(is_buy), self._get_volume())
+                else:
+                    # the last level of a side is removed only after its replacement is written
+                    self._write_level(writer, is_buy, self._get_free_level_price(is_buy), self._get_volume())
+                    self._write_level(writer, is_buy, price, 0.0)
+
+            written_count += 2 * len(crossed_prices)
+
+        return written_count
+
+    def _write_level(self, writer: StorageWriter, is_buy: bool, price: float, volume: float):
+        writer.write(is_buy, price, volume, self._timestamp)
+
+        levels = self._levels[is_buy]
+        if volume > DUST_LEVEL:
+            levels[price] = volume
+        else:
+            levels.pop(price, None)
+
+        if len(levels) > BOOK_DEPTH:
+            # the worst level is dropped by the pricebook processor
+            del levels[min(levels) if is_buy else max(levels)]
+
+    def _get_free_level_price(self, is_buy: bool) -> float:
+        for level in range(1, BOOK_DEPTH + 1):
+            price = self._get_level_price(is_buy, level)
+            if price not in self._levels[is_buy]:
+                return price
+
+        raise AssertionError(f"No free level of {self._pair} found")
+
+    def _get_level_price(self, is_buy: bool, level: int) -> float:
+        top_distance = self._tick_size * level
+        price = self._mid_price - top_distance if is_buy else self._mid_price + top_distance
+        return round(round(price / self._tick_size) * self._tick_size, 8)
+
+    def _get_volume(self) -> float:
+        return round(self._random.lognormvariate(0.0, 1.0), 8)
@@ -1,27 +1,46 @@
 import struct
 
-from typing import List
+from typing import List, Optional
 
 
 class TradeEntry(object):
     chunk_size = 1 + 3 * 8
 
+    # buy_byte + 8b price + 8b volume + 8b timestamp
+    _struct = struct.Struct("<Bddd")
+
+    # entries are kept in large amounts - avoid per instance dictionaries
+    __slots__ = ["pair", "price", "volume", "timestamp", "_info"]
+
     def __init__(self, pair: str, chunk):
         self.pair = pair
-        self.price: float = None
-        self.volume: float = None
-        self.timestamp: float = None
-        self.real_utc_timestamp: float = None
+        self._info, self.price, self.volume, self.timestamp = self._struct.unpack(chunk)
+
+    @property
+    def is_buy(self) -> bool:
+        return bool(self._info & 1)
+
+    @property
+    def is_reset(self) -> bool:
+        return bool(self._info & 2)
 
-        # buy_byte + 8b price + 8b volume + 8b timestamp
-        info_byte, self.price, self.volume, self.timestamp = struct.unpack("<Bddd", chunk)
+    @property
+    def is_flush_entry(self) -> bool:
+        return bool(self._info & 4)
 
-        self.is_buy = bool(info_byte & 1)
-        self.is_reset = bool(info_byte & 2)
-        self.is_flush_entry = bool(info_byte & 4)
+    @is_flush_entry.setter
+    def is_flush_entry(self, value: bool):
+        if value:
+            self._info |= 4
+        else:
+            self._info &= ~4
 
+    @property
+    def real_utc_timestamp(self) -> Optional[float]:
         if self.is_reset and not self.is_flush_entry:
-            self.real_utc_timestamp = self.timestamp
+            return self.timestamp
+
+        return None
 
     @classmethod
     def create_chunk(cls, is_buy, price, volume, timestamp, is_reset, is_flush):
@@ -31,13 +50,19 @@ class TradeEntry(object):
         if is_flush:
             info_byte |= 4
 
-        chunk = [info_byte] + cls.float_to_8b(price) + cls.float_to_8b(volume) + cls.float_to_8b(timestamp)
-        return bytes(chunk)
+        for value in [price, volume, timestamp]:
+            if not isinstance(value, float):
+                raise AssertionError(f"Float is expected")
+
+        return cls._struct.pack(info_byte, price, volume, timestamp)
 
     @classmethod
     def to_chunk(cls, entry: 'TradeEntry'):
-        return cls.create_chunk(entry.is_buy, entry.price, entry.volume, entry.timestamp,
-                                entry.is_reset, entry.is_flush_entry)
+        return cls._struct.pack(entry._info, entry.price, entry.volume, entry.timestamp)
+
+    @classmethod
+    def pack_into(cls, buffer, offset: int, entry: 'TradeEntry'):
+        cls._struct.pack_into(buffer, offset, entry._info, entry.price, entry.volume, entry.timestamp)
 
     @classmethod
     def create_entry(cls, pair, is_buy, price, volume, timestamp, is_reset, is_flush):
@@ -0,0 +1,110 @@
+from typing import List, Iterable
+
+import numpy as np
+
+from bot_trading.core.data.trade_entry import TradeEntry
+
+
+class TradeEntryBatch(object):
+    """
+    Columnar view over a contiguous chunk of serialized trade entries.
+    Columns are exposed as numpy arrays sharing memory with the chunk,
+    TradeEntry objects are materialized only when requested.
+    """
+
+    # info_byte + 8b price + 8b volume + 8b timestamp (packed, same layout as TradeEntry.chunk_size)
+    dtype = np.dtype([("info", "u1"), ("price", "<f8"), ("volume", "<f8"), ("timestamp", "<f8")])
+
+    def __init__(self, pair: str, chunk):
+        chunk = memoryview(chunk).cast("B")
+        if len(chunk) % TradeEntry.chunk_size:
+            raise AssertionError(f"Incorrect chunk length {len(chunk)}")
+
+        self.pair = pair
+        self._chunk = chunk
+        self._records = np.frombuffer(chunk, dtype=self.dtype)
+
+    @classmethod
+    def from_entries(cls, pair: str, entries: Iterable[TradeEntry]) -> 'TradeEntryBatch':
+        chunk = bytearray()
+        for entry in entries:
+            chunk.extend(TradeEntry.to_chunk(entry))
+
+        return TradeEntryBatch(pair, bytes(chunk))
+
+    @classmethod
+    def empty(cls, pair: str) -> 'TradeEntryBatch':
+        return TradeEntryBatch(pair, b"")
+
+    @classmethod
+    def concatenate(cls, pair: str, batches: List['TradeEntryBatch']) -> 'TradeEntryBatch':
+        if len(batches) == 1:
+            return batches[0]  # no copy is needed
+
+        return TradeEntryBatch(pair, b"".join(batch.chunk for batch in batches))
+
+    @property
+    def chunk(self) -> memoryview:
+        return self._chunk
+
+    @property
+    def info(self) -> np.ndarray:
+        return self._records["info"]
+
+    @property
+    def price(self) -> np.ndarray:
+        return self._records["price"]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._records["volume"]
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self._records["timestamp"]
+
+    @property
+    def is_buy(self) -> np.ndarray:
+        return (self.info & 1).astype(bool)
+
+    @property
+    def is_reset(self) -> np.ndarray:
+        return (self.info & 2).astype(bool)
+
+    @property
+    def is_flush(self) -> np.ndarray:
+        return (self.info & 4).astype(bool)
+
+    def get_entry(self, index: int) -> TradeEntry:
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError(f"Entry {index} is out of the batch range")
+
+        start = index * TradeEntry.chunk_size
+        return TradeEntry(self.pair, self._chunk[start:start + TradeEntry.chunk_size])
+
+    def to_entries(self) -> List[TradeEntry]:
+        return TradeEntry.from_chunk(self.pair, self._chunk)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                raise ValueError("Only contiguous slices of a batch are supported")
+
+            stop = max(start, stop)
+            return TradeEntryBatch(self.pair, self._chunk[start * TradeEntry.chunk_size:stop * TradeEntry.chunk_size])
+
+        return self.get_entry(item)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.get_entry(i)
+
+    def __repr__(self):
+        return f"TradeEntryBatch {self.pair}: {len(self)} entries"
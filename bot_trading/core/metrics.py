@@ -0,0 +1,242 @@
+import json
+import math
+import os
+import time
+from threading import Lock, Thread
+from typing import Dict, Optional
+
+from bot_trading.core.configuration import METRICS_ENABLED, METRICS_PATH, METRICS_DUMP_INTERVAL
+
+"""
+Lightweight metrics of the client hot paths (counters, timers and histograms).
+Collection is switched by METRICS_ENABLED of the core configuration (METRICS env var),
+disabled metrics cost a single check.
+"""
+
+
+class Counter(object):
+    __slots__ = ["_L_value", "value"]
+
+    def __init__(self):
+        self._L_value = Lock()
+        self.value = 0
+
+    def inc(self, value=1):
+        with self._L_value:
+            self.value += value
+
+    def to_dict(self):
+        return self.value
+
+
+class Histogram(object):
+    """
+    Log-linear (HDR-style) histogram of positive values. Every power of two is split into sub_bucket_count
+    buckets, so percentiles are reported with a relative error below 1 / sub_bucket_count.
+    """
+    sub_bucket_count = 16
+
+    def __init__(self):
+        self._L_values = Lock()
+        self._buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value: float):
+        if value > 0:
+            mantissa, exponent = math.frexp(value)  # value = mantissa * 2**exponent, 0.5 <= mantissa < 1
+            bucket = exponent * self.sub_bucket_count + int((mantissa - 0.5) * 2 * self.sub_bucket_count)
+        else:
+            bucket = None  # zeros (and negatives) have their own bucket
+
+        with self._L_values:
+            self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+            self.count += 1
+            self.total += value
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+
+    def get_percentile(self, percentile: float) -> float:
+        with self._L_values:
+            buckets = dict(self._buckets)
+            count = self.count
+
+        if not count:
+            return math.nan
+
+        rank = percentile / 100.0 * count
+        seen_count = buckets.get(None, 0)
+        if seen_count >= rank:
+            return 0.0
+
+        for bucket in sorted(b for b in buckets if b is not None):
+            seen_count += buckets[bucket]
+            if seen_count >= rank:
+                # upper bound of the bucket
+                exponent, sub_bucket = divmod(bucket, self.sub_bucket_count)
+                upper_bound = math.ldexp(0.5 + (sub_bucket + 1) / (2.0 * self.sub_bucket_count), exponent)
+                return min(upper_bound, self.max)
+
+        return self.max
+
+    def to_dict(self):
+        if not self.count:
+            return {"count": 0}
+
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count,
+            "min": self.min,
+            "p50": self.get_percentile(50),
+            "p90": self.get_percentile(90),
+            "p99": self.get_percentile(99),
+            "max": self.max,
+        }
+
+
+class Timer(object):
+    """
+    Measures duration of a with block (in seconds).
+    """
+    __slots__ = ["_histogram", "_start"]
+
+    def __init__(self, histogram: Histogram):
+        self._histogram = histogram
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._histogram.record(time.perf_counter() - self._start)
+
+
+class _DisabledTimer(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+class MetricsRegistry(object):
+    def __init__(self):
+        self._L_metrics = Lock()
+        self._counters: Dict[str, Counter] = {}
+        self._timers: Dict[str, Histogram] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._start_time = time.time()
+
+    def counter(self, name: str) -> Counter:
+        return self._get_metric(self._counters, name, Counter)
+
+    def timer(self, name: str) -> Histogram:
+        return self._get_metric(self._timers, name, Histogram)
+
+    def histogram(self, name: str) -> Histogram:
+        return self._get_metric(self._histograms, name, Histogram)
+
+    def to_dict(self) -> dict:
+        with self._L_metrics:
+            counters = dict(self._counters)
+            timers = dict(self._timers)
+            histograms = dict(self._histograms)
+
+        return {
+            "timestamp": time.time(),
+            "uptime": time.time() - self._start_time,
+            "counters": {name: counters[name].to_dict() for name in sorted(counters)},
+            "timers": {name: timers[name].to_dict() for name in sorted(timers)},
+            "histograms": {name: histograms[name].to_dict() for name in sorted(histograms)},
+        }
+
+    def _get_metric(self, metrics: dict, name: str, metric_class):
+        metric = metrics.get(name)
+        if metric is None:
+            with self._L_metrics:
+                metric = metrics.get(name)
+                if metric is None:
+                    metric = metrics[name] = metric_class()
+
+        return metric
+
+
+_registry = MetricsRegistry()
+_disabled_timer = _DisabledTimer()
+_is_enabled = METRICS_ENABLED
+
+
+def is_metrics_enabled() -> bool:
+    return _is_enabled
+
+
+def set_metrics_enabled(is_enabled: bool):
+    global _is_enabled
+
+    _is_enabled = is_enabled
+
+
+def count(name: str, value=1):
+    if _is_enabled:
+        _registry.counter(name).inc(value)
+
+
+def record(name: str, value: float):
+    if _is_enabled:
+        _registry.histogram(name).record(value)
+
+
+def record_duration(name: str, seconds: float):
+    """
+    Records duration measured by the caller (for code that already has its own timing).
+    """
+    if _is_enabled:
+        _registry.timer(name).record(seconds)
+
+
+def measure(name: str):
+    """
+    Times the with block: with measure("name"): ...
+    """
+    if not _is_enabled:
+        return _disabled_timer
+
+    return Timer(_registry.timer(name))
+
+
+def get_metrics() -> dict:
+    return _registry.to_dict()
+
+
+def dump_metrics(path: Optional[str] = None):
+    if not _is_enabled:
+        return
+
+    path = path or METRICS_PATH
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w") as f:
+        json.dump(get_metrics(), f, indent=2)
+
+    # readers of the dump never see a partially written file
+    os.replace(temporary_path, path)
+
+
+def start_periodic_metrics_dump(path: Optional[str] = None, interval: Optional[float] = None):
+    """
+    Dumps the metrics regularly (for live runs that are usually interrupted).
+    """
+    if not _is_enabled:
+        return
+
+    interval = interval or METRICS_DUMP_INTERVAL
+
+    def dump_loop():
+        while True:
+            time.sleep(interval)
+            dump_metrics(path)
+
+    Thread(target=dump_loop, daemon=True).start()
@@ -3,11 +3,17 @@ from typing import List, Any, Optional, Callable
 
 from bot_trading.core.data.storage_writer import StorageWriter
 from bot_trading.core.data.trade_entry import TradeEntry
+from bot_trading.core.data.trade_entry_batch import TradeEntryBatch
+from bot_trading.core.metrics import measure
 
 
 class BucketCache(object):
     _not_requested = "entry_was_not_requested_yet"
 
+    @property
+    def bucket_id(self) -> int:
+        return self._bucket_id
+
     @property
     def is_complete(self):
         return self._write_count >= StorageWriter.bucket_entry_count
@@ -21,10 +27,25 @@ class BucketCache(object):
         self._write_count = 0
         self._L_entries = RLock()
 
-        self._entries: List[Any] = [self._not_requested] * StorageWriter.bucket_entry_count
+        # whole bucket payload - entries are materialized from it on demand
+        self._batch: Optional[TradeEntryBatch] = None
+
+        # slots for single entries and waiting events - allocated only when needed
+        self._entries: Optional[List[Any]] = None
+
+    def mark_requested(self) -> bool:
+        """
+        Marks the bucket as requested by a read-ahead. Returns False when the bucket needs no request.
+        """
+        with self._L_entries:
+            if self._is_requested or self._batch is not None or self.is_complete:
+                return False
+
+            self._is_requested = True
+            return True
 
     def close(self):
-        if self.is_complete:
+        if self.is_complete or self._entries is None:
             return  # no one can be blocked here
 
         for entry in self._entries:
@@ -33,6 +54,10 @@ class BucketCache(object):
 
     def write(self, bucket_offset: int, entry: TradeEntry):
         with self._L_entries:
+            if self._batch is not None and bucket_offset < len(self._batch):
+                return  # the entry is served from the batch (its waiters were woken up by write_batch)
+
+            self._ensure_entries()
             old_entry = self._entries[bucket_offset]
             if not isinstance(old_entry, TradeEntry):
                 self._write_count += 1
@@ -42,13 +67,43 @@ class BucketCache(object):
         if isinstance(old_entry, Event):
             old_entry.set()  # wake up whoever was waiting there
 
+    def write_batch(self, batch: TradeEntryBatch):
+        with self._L_entries:
+            self._batch = batch
+
+            waiting_events = []
+            write_count = len(batch)
+            for i, old_entry in enumerate(self._entries or []):
+                if i < len(batch):
+                    if isinstance(old_entry, Event):
+                        waiting_events.append(old_entry)
+                        self._entries[i] = self._not_requested  # the entry will be materialized from the batch
+                elif isinstance(old_entry, TradeEntry):
+                    write_count += 1
+
+            self._write_count = write_count
+            if len(batch) >= StorageWriter.bucket_entry_count:
+                self._entries = None  # everything is served from the batch now
+
+        for event in waiting_events:
+            event.set()  # wake up whoever was waiting there
+
     def read(self, bucket_offset: int, requesting_is_allowed: bool) -> Optional[TradeEntry]:
-        entry = self._entries[bucket_offset]
-        if isinstance(entry, TradeEntry):
-            return entry  # optimistic reading
+        batch = self._batch
+        if batch is not None and bucket_offset < len(batch):
+            return batch.get_entry(bucket_offset)  # optimistic reading
+
+        entries = self._entries
+        if entries is not None and isinstance(entries[bucket_offset], TradeEntry):
+            return entries[bucket_offset]
 
         with self._L_entries:
             # read again because entry may be changed meanwhile
+            batch = self._batch
+            if batch is not None and bucket_offset < len(batch):
+                return batch.get_entry(bucket_offset)
+
+            self._ensure_entries()
             entry = self._entries[bucket_offset]
             if isinstance(entry, TradeEntry):
                 return entry
@@ -67,14 +122,47 @@ class BucketCache(object):
                     self._async_bucket_requester(self._pair, self._bucket_id)
                     self._is_requested = True  # this avoid multiple requests
 
-            elif entry is Event:
-                event = entry
+            elif isinstance(entry, Event):
+                event = entry  # the entry was requested by another reader
 
         if event is not None:
-            event.wait()  # wait until the entry comes
+            with measure("bucket_cache.wait"):
+                event.wait()  # wait until the entry comes
+
+        batch = self._batch
+        if batch is not None and bucket_offset < len(batch):
+            return batch.get_entry(bucket_offset)
 
         entry = self._entries[bucket_offset]
-        if isinstance(entry, Event):
-            return None  # interruption may cause that entry is not received
+        if isinstance(entry, TradeEntry):
+            return entry
+
+        return None  # interruption may cause that entry is not received
+
+    def read_range(self, start_offset: int, end_offset: int, requestable_end_offset: int) -> TradeEntryBatch:
+        """
+        Reads entries of the bucket between the offsets. Only entries before requestable_end_offset can be
+        requested (and waited for). The batch ends early when an entry is not available.
+        """
+        batch = self._batch
+        if batch is not None and end_offset <= len(batch):
+            return batch[start_offset:end_offset]  # whole range is available in the bucket payload
+
+        entries = []
+        for bucket_offset in range(start_offset, end_offset):
+            entry = self.read(bucket_offset, bucket_offset < requestable_end_offset)
+            if entry is None:
+                break
+
+            batch = self._batch
+            if batch is not None and end_offset <= len(batch):
+                # the bucket payload arrived meanwhile
+                return batch[start_offset:end_offset]
+
+            entries.append(entry)
+
+        return TradeEntryBatch.from_entries(self._pair, entries)
 
-        return entry
+    def _ensure_entries(self):
+        if self._entries is None:
+            self._entries = [self._not_requested] * StorageWriter.bucket_entry_count
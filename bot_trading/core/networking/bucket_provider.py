@@ -1,12 +1,18 @@
+from collections import OrderedDict
 from threading import RLock
-from typing import List, Callable, Dict
+from typing import List, Callable, Dict, Optional
 
+from bot_trading.core.configuration import READ_AHEAD_BUCKET_COUNT
 from bot_trading.core.data.storage_writer import StorageWriter
 from bot_trading.core.data.trade_entry import TradeEntry
+from bot_trading.core.data.trade_entry_batch import TradeEntryBatch
 from bot_trading.core.networking.bucket_cache import BucketCache
 
 
 class BucketProvider(object):
+    # how many sequential read streams (e.g. connector and pricebook views) are followed at once
+    max_read_stream_count = 8
+
     @classmethod
     def get_bucket_id(cls, entry_index: int):
         return int(entry_index / StorageWriter.bucket_entry_count), int(entry_index % StorageWriter.bucket_entry_count)
@@ -15,8 +21,15 @@ class BucketProvider(object):
     def peek_entry_count(self):
         return self._current_peek_entry_index
 
-    def __init__(self, pair: str, entry_count: int, async_bucket_requester: Callable[[str, int], None]):
+    def __init__(self, pair: str, entry_count: int, async_bucket_requester: Callable[[str, int], None],
+                 async_bucket_range_requester: Optional[Callable[[str, int, int], None]] = None,
+                 read_ahead_bucket_count: int = READ_AHEAD_BUCKET_COUNT):
+        """
+        Buckets following a sequentially read bucket are requested ahead (by a single range request when possible).
+        Count of the buckets read ahead doubles with every next sequentially read bucket up to read_ahead_bucket_count.
+        """
         self._requester = async_bucket_requester
+        self._range_requester = async_bucket_range_requester
         self._pair = pair
 
         self._L_entry_index = RLock()
@@ -24,22 +37,68 @@ class BucketProvider(object):
         self._buckets: Dict[int, BucketCache] = {}
         self._current_peek_entry_index = entry_count
 
+        self._L_read_ahead = RLock()
+        self._read_ahead_bucket_count = read_ahead_bucket_count
+        self._last_read_bucket_id = None
+        # next expected bucket id -> (read ahead, end of the requested buckets) of the stream
+        self._read_streams = OrderedDict()
+
     def read(self, entry_index):
         bucket, bucket_offset = self._get_bucket(entry_index)
+        if bucket.bucket_id != self._last_read_bucket_id:
+            self._read_ahead(bucket.bucket_id)
 
         can_request_bucket = entry_index < self._current_peek_entry_index
         return bucket.read(bucket_offset, can_request_bucket)
 
+    def read_range(self, start_index: int, end_index: int) -> TradeEntryBatch:
+        batches = []
+        current_index = start_index
+        while current_index < end_index:
+            bucket, bucket_offset = self._get_bucket(current_index)
+            if bucket.bucket_id != self._last_read_bucket_id:
+                self._read_ahead(bucket.bucket_id)
+
+            entry_count = min(end_index - current_index, StorageWriter.bucket_entry_count - bucket_offset)
+
+            requestable_end_offset = bucket_offset + self._current_peek_entry_index - current_index
+            batch = bucket.read_range(bucket_offset, bucket_offset + entry_count, requestable_end_offset)
+            batches.append(batch)
+            current_index += len(batch)
+
+            if len(batch) < entry_count:
+                break  # following entries are not available
+
+        return TradeEntryBatch.concatenate(self._pair, batches)
+
     def write(self, first_entry_index, entries: List[TradeEntry]):
         current_index = first_entry_index
         for entry in entries:
             self._write(current_index, entry)
             current_index += 1
 
+    def write_bucket(self, bucket_id: int, batch: TradeEntryBatch):
+        if not len(batch):
+            return  # nothing to write
+
+        last_entry_index = bucket_id * StorageWriter.bucket_entry_count + len(batch) - 1
+        with self._L_entry_index:
+            self._current_peek_entry_index = max(self._current_peek_entry_index, last_entry_index)
+
+        bucket, _ = self._get_bucket(last_entry_index)
+        bucket.write_batch(batch)
+
     def close(self):
         for bucket in self._buckets.values():
             bucket.close()
 
+    def release_bucket(self, bucket_id: int):
+        """
+        Forgets the bucket payload (for readers that read every bucket just once).
+        """
+        with self._L_buckets:
+            self._buckets.pop(bucket_id, None)
+
     def _write(self, entry_index, entry: TradeEntry):
         with self._L_entry_index:
             self._current_peek_entry_index = max(self._current_peek_entry_index, entry_index)
@@ -47,8 +106,62 @@ class BucketProvider(object):
         bucket, offset = self._get_bucket(entry_index)
         bucket.write(offset, entry)
 
+    def _read_ahead(self, bucket_id: int):
+        if self._read_ahead_bucket_count <= 0:
+            return
+
+        with self._L_read_ahead:
+            self._last_read_bucket_id = bucket_id
+            if bucket_id in self._read_streams:
+                # the stream continues sequentially
+                read_ahead, requested_end_id = self._read_streams.pop(bucket_id)
+                read_ahead = min(max(1, 2 * read_ahead), self._read_ahead_bucket_count)
+            elif bucket_id + 1 in self._read_streams:
+                return  # the stream is still in the same bucket
+            else:
+                # a random access - wait whether the reading continues
+                read_ahead, requested_end_id = 0, bucket_id + 1
+                if len(self._read_streams) >= self.max_read_stream_count:
+                    self._read_streams.popitem(last=False)
+
+            # buckets are requested only until the last available entry
+            end_bucket_id = min(bucket_id + 1 + read_ahead,
+                                int((self._current_peek_entry_index + StorageWriter.bucket_entry_count - 1) /
+                                    StorageWriter.bucket_entry_count))
+
+            # requests are sent in batches, when at least half of the read ahead was consumed
+            in_flight_count = requested_end_id - bucket_id - 1
+            if in_flight_count * 2 > read_ahead:
+                end_bucket_id = requested_end_id
+
+            start_bucket_id = max(requested_end_id, bucket_id + 1)  # the read bucket is requested by the reader
+            self._read_streams[bucket_id + 1] = (read_ahead, max(requested_end_id, end_bucket_id))
+
+        requested_bucket_ids = []
+        for requested_bucket_id in range(start_bucket_id, end_bucket_id):
+            if self._get_bucket_by_id(requested_bucket_id).mark_requested():
+                requested_bucket_ids.append(requested_bucket_id)
+
+        self._request_buckets(requested_bucket_ids)
+
+    def _request_buckets(self, bucket_ids: List[int]):
+        if self._range_requester is None:
+            for bucket_id in bucket_ids:
+                self._requester(self._pair, bucket_id)
+            return
+
+        # contiguous buckets are requested together
+        range_start = 0
+        for i in range(1, len(bucket_ids) + 1):
+            if i == len(bucket_ids) or bucket_ids[i] != bucket_ids[i - 1] + 1:
+                self._range_requester(self._pair, bucket_ids[range_start], bucket_ids[i - 1] + 1)
+                range_start = i
+
     def _get_bucket(self, entry_index):
         bucket_id, bucket_offset = BucketProvider.get_bucket_id(entry_index)
+        return self._get_bucket_by_id(bucket_id), bucket_offset
+
+    def _get_bucket_by_id(self, bucket_id: int) -> BucketCache:
         bucket = self._buckets.get(bucket_id, None)
         if bucket is None:
             with self._L_buckets:
@@ -57,4 +170,4 @@ class BucketProvider(object):
                     bucket = BucketCache(self._pair, bucket_id, self._requester)
                     self._buckets[bucket_id] = bucket
 
-        return bucket, bucket_offset
+        return bucket
@@ -0,0 +1,166 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from typing import List, Optional
+
+from bot_trading.core.configuration import MAX_READ_CONNECTIONS, READ_MODE
+from bot_trading.core.data.bucket_index import BucketIndex
+from bot_trading.core.data.bucket_summary import BucketSummary
+from bot_trading.core.data.dataset_manifest import DatasetManifest
+from bot_trading.core.data.storage_writer import StorageWriter
+from bot_trading.core.data.trade_entry import TradeEntry
+from bot_trading.core.networking.remote_observer import RemoteObserver
+
+
+class DatasetExporter(object):
+    """
+    Downloads history of the server into storage files of a local directory (a dataset).
+    Buckets are requested over several read connections in parallel.
+    Entries of the exported range are renumbered from zero, so the dataset is readable by StorageReader.
+    """
+
+    # how many buckets per connection are downloaded ahead of the written one (bounds memory of the export)
+    in_flight_buckets_per_connection = 4
+
+    def __init__(self, remote_endpoint: str, username: str, output_path: str, pairs: Optional[List[str]] = None,
+                 start_timestamp: Optional[float] = None, end_timestamp: Optional[float] = None,
+                 connection_count: int = MAX_READ_CONNECTIONS):
+        if connection_count > MAX_READ_CONNECTIONS:
+            # server closes the oldest read connections of the user
+            raise ValueError(f"At most {MAX_READ_CONNECTIONS} read connections can be used, got {connection_count}")
+
+        self._remote_endpoint = remote_endpoint
+        self._username = username
+        self._output_path = output_path
+        self._storage = StorageWriter.at_root(output_path)
+        self._pairs = pairs
+        self._start_timestamp = start_timestamp
+        self._end_timestamp = end_timestamp
+        self._connection_count = max(1, connection_count)
+
+        self._observers: Queue = Queue()
+
+    def run(self) -> dict:
+        """
+        Exports the dataset and returns its manifest.
+        """
+        if DatasetManifest.load(self._output_path) is not None:
+            raise ValueError(f"Dataset {self._output_path} already exists")
+
+        observers = []
+        for _ in range(self._connection_count):
+            # every bucket is requested explicitly just once - nothing is read ahead
+            observer = RemoteObserver(self._remote_endpoint, self._username, "no_password_yet", use_disk_cache=False,
+                                      read_ahead_bucket_count=0)
+            observer.connect(READ_MODE)
+            observer.get_readers()
+            observers.append(observer)
+            self._observers.put(observer)
+
+        pairs = self._pairs or observers[0].get_pairs()
+        for pair in pairs:
+            if observers[0].get_reader(pair) is None:
+                raise ValueError(f"Pair {pair} is not available on {self._remote_endpoint}")
+
+        manifest = {
+            "source_endpoint": self._remote_endpoint,
+            "start_timestamp": self._start_timestamp,
+            "end_timestamp": self._end_timestamp,
+            "pairs": {},
+        }
+        with ThreadPoolExecutor(self._connection_count) as pool:
+            for pair in pairs:
+                start = time.time()
+                first_bucket, entry_count = self._export_pair(pool, observers[0], pair)
+                manifest["pairs"][pair] = {
+                    "source_first_entry_index": first_bucket * StorageWriter.bucket_entry_count,
+                    "entry_count": entry_count,
+                }
+                print(f"\t {pair}: {entry_count} entries in {time.time() - start:.1f}s")
+
+        # the manifest is written last - its presence marks a complete dataset
+        DatasetManifest.save(self._output_path, manifest)
+
+        return manifest
+
+    def _export_pair(self, pool: ThreadPoolExecutor, observer: RemoteObserver, pair: str):
+        if self._storage.storage_file_exists(pair, 0):
+            raise ValueError(f"Storage of {pair} already exists in {self._output_path}")
+
+        bucket_entry_count = StorageWriter.bucket_entry_count
+        reader = observer.get_reader(pair)
+        bucket_count = int((reader.get_entry_count() + bucket_entry_count - 1) / bucket_entry_count)
+
+        first_bucket = 0
+        if self._start_timestamp is not None:
+            first_bucket = int(reader.find_pricebook_start(self._start_timestamp) / bucket_entry_count)
+
+        end_bucket = bucket_count
+        if self._end_timestamp is not None:
+            # bucket after the one containing the end timestamp - entries are not strictly ordered
+            end_bucket = min(bucket_count,
+                             int(reader.find_pricebook_start(self._end_timestamp) / bucket_entry_count) + 2)
+
+        buckets_per_file = int(StorageWriter.file_entry_count / bucket_entry_count)
+        bucket_size = bucket_entry_count * TradeEntry.chunk_size
+        os.makedirs(os.path.dirname(self._storage.get_storage_path(pair, 0)), exist_ok=True)
+
+        in_flight_count = self.in_flight_buckets_per_connection * self._connection_count
+        bucket_futures = deque()
+        next_bucket = first_bucket
+
+        entry_count = 0
+        file = None
+        for bucket in range(first_bucket, end_bucket):
+            while next_bucket < end_bucket and len(bucket_futures) < in_flight_count:
+                bucket_futures.append(pool.submit(self._download_bucket, pair, next_bucket))
+                next_bucket += 1
+
+            chunk = bucket_futures.popleft().result()
+            if len(chunk) != bucket_size and bucket + 1 < end_bucket:
+                raise AssertionError(f"Incomplete bucket {bucket} of {pair} received")
+
+            exported_bucket = bucket - first_bucket  # buckets are renumbered from zero
+            if exported_bucket % buckets_per_file == 0:
+                if file:
+                    file.close()
+                file = open(self._storage.get_storage_path(pair, int(exported_bucket / buckets_per_file)), "wb")
+
+            file.write(chunk)
+            entry_count += int(len(chunk) / TradeEntry.chunk_size)
+
+        if file:
+            file.close()
+
+        self._finish_storage(pair)
+        return first_bucket, entry_count
+
+    def _download_bucket(self, pair: str, bucket: int) -> bytes:
+        observer = self._observers.get()  # every connection serves a single request at a time
+        try:
+            start_index = bucket * StorageWriter.bucket_entry_count
+            reader = observer.get_reader(pair)
+            batch = reader.get_entries(start_index, start_index + StorageWriter.bucket_entry_count)
+            chunk = bytes(batch.chunk)
+            reader.release_bucket(bucket)  # the bucket is not read again
+            return chunk
+        finally:
+            self._observers.put(observer)
+
+    def _finish_storage(self, pair: str):
+        """
+        Writes index, summaries and catalog of the written book files.
+        """
+        storage = self._storage
+        file_number = 0
+        while storage.storage_file_exists(pair, file_number):
+            book_path = storage.get_storage_path(pair, file_number)
+            bucket_count = BucketIndex.rebuild(book_path, storage.get_index_path(pair, file_number),
+                                               StorageWriter.bucket_entry_count)
+            BucketSummary.rebuild(storage.get_summary_path(pair, file_number), pair,
+                                  storage._read_book_buckets(book_path, bucket_count))
+            file_number += 1
+
+        storage.load_catalog(pair).save(storage.get_catalog_path(pair))
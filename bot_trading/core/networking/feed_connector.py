@@ -43,7 +43,8 @@ class FeedWriter(object):
                 logging.warning("Connection closed exception")
             except WebSocketBadStatusException:
                 logging.warning("Websocket bad status exception")
-            except:
+            except Exception:
+                # interrupts are not swallowed - storages have to be closed on shutdown
                 logging.exception("_run raised an exception")
 
             sleep(1)
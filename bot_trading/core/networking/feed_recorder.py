@@ -0,0 +1,47 @@
+import json
+import time
+from threading import Lock
+from typing import Iterator, Tuple
+
+
+class FeedRecorder(object):
+    """
+    Writes messages received by RemoteObserver (welcome, feed and buckets) together with their arrival times.
+    Every message is stored as a single JSON line {"t": arrival time, "m": message}.
+    """
+
+    def __init__(self, recording_path: str):
+        self._recording_path = recording_path
+        self._file = open(recording_path, "w")
+        self._L_file = Lock()
+        self.message_count = 0
+
+    @property
+    def recording_path(self) -> str:
+        return self._recording_path
+
+    def record(self, message: dict):
+        arrival_time = time.time()
+        line = json.dumps({"t": arrival_time, "m": message}) + "\n"
+        with self._L_file:
+            if self._file is None:
+                return  # recording is over
+
+            self._file.write(line)
+            self.message_count += 1
+
+    def close(self):
+        with self._L_file:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    @classmethod
+    def read(cls, recording_path: str) -> Iterator[Tuple[float, dict]]:
+        with open(recording_path) as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # partially written trailing record is ignored
+
+                record = json.loads(line)
+                yield record["t"], record["m"]
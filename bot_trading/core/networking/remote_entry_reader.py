@@ -1,28 +1,42 @@
 from typing import Callable, List
 
+from bot_trading.core.configuration import READ_AHEAD_BUCKET_COUNT
+
+from bot_trading.core.data.bucket_summary import BucketSummary
 from bot_trading.core.data.entry_reader_base import EntryReaderBase
-from bot_trading.core.data.storage_writer import StorageWriter
 from bot_trading.core.data.trade_entry import TradeEntry
+from bot_trading.core.data.trade_entry_batch import TradeEntryBatch
 from bot_trading.core.networking.bucket_provider import BucketProvider
 
 
 class RemoteEntryReader(EntryReaderBase):
-    def __init__(self, pair: str, entry_count: int, observer: 'RemoteObserver'):
+    def __init__(self, pair: str, entry_count: int, observer: 'RemoteObserver',
+                 read_ahead_bucket_count: int = READ_AHEAD_BUCKET_COUNT):
         super().__init__(pair)
 
         self._observer = observer
         self._subscribers = []
-        self._bucket_provider = BucketProvider(pair, entry_count, observer.async_get_bucket)
+        self._bucket_provider = BucketProvider(pair, entry_count, observer.async_get_bucket,
+                                               observer.async_get_bucket_range, read_ahead_bucket_count)
 
     def get_entry(self, entry_index: int):
         return self._bucket_provider.read(entry_index)
 
+    def get_entries(self, start_index: int, end_index: int) -> TradeEntryBatch:
+        return self._bucket_provider.read_range(start_index, end_index)
+
+    def release_bucket(self, bucket_index: int):
+        self._bucket_provider.release_bucket(bucket_index)
+
     def get_entry_count(self):
         return self._bucket_provider.peek_entry_count
 
     def find_pricebook_start(self, start_time: float):
         return self._observer.find_pricebook_start(self.pair, start_time)
 
+    def get_bucket_summaries(self, start_bucket: int, end_bucket: int) -> List[BucketSummary]:
+        return self._observer.get_bucket_summaries(self.pair, start_bucket, end_bucket)
+
     def subscribe(self, feed_handler: Callable[[int, List[TradeEntry]], None]):
         self._subscribers.append(feed_handler)
 
@@ -37,5 +51,5 @@ class RemoteEntryReader(EntryReaderBase):
         for subscriber in self._subscribers:
             subscriber(first_entry_index, entries)
 
-    def _receive_bucket(self, bucket_index, bucket: List[TradeEntry]):
-        self._bucket_provider.write(bucket_index * StorageWriter.bucket_entry_count, bucket)
+    def _receive_bucket(self, bucket_index, bucket: TradeEntryBatch):
+        self._bucket_provider.write_bucket(bucket_index, bucket)
@@ -7,26 +7,39 @@ from typing import List, Dict, Any
 import jsonpickle
 
 from bot_trading.configuration import LOCAL_DISK_CACHE_SIZE
+from bot_trading.core.configuration import MAX_BUCKET_RANGE, READ_AHEAD_BUCKET_COUNT
+from bot_trading.core.data.bucket_codec import BucketCodec
+from bot_trading.core.data.bucket_summary import BucketSummary
 from bot_trading.core.data.disk_cache import DiskCache
 from bot_trading.core.data.storage_writer import StorageWriter
 from bot_trading.core.data.trade_entry import TradeEntry
+from bot_trading.core.data.trade_entry_batch import TradeEntryBatch
 from bot_trading.core.messages import log_cache
+from bot_trading.core.metrics import count, measure
+from bot_trading.core.networking.feed_recorder import FeedRecorder
 from bot_trading.core.networking.remote_entry_reader import RemoteEntryReader
 from bot_trading.core.networking.socket_client import SocketClient
 
 
 class RemoteObserver(object):
-    def __init__(self, remote_endpoint: str, username: str, password: str):
+    def __init__(self, remote_endpoint: str, username: str, password: str, use_disk_cache: bool = True,
+                 recorder: FeedRecorder = None, read_ahead_bucket_count: int = READ_AHEAD_BUCKET_COUNT):
+        """
+        recorder: records welcome, feed and bucket messages (buckets can't be served by the disk cache then)
+        read_ahead_bucket_count: how many buckets the readers request ahead (see BucketProvider)
+        """
         self._remote_endpoint = remote_endpoint
         self._username = username
         self._password = password
+        self._recorder = recorder
+        self._read_ahead_bucket_count = read_ahead_bucket_count
 
         self._pairs: List[str] = None
         self._readers: Dict[str, RemoteEntryReader] = None
 
         self._client: SocketClient = None
         self._disk_cache: DiskCache = None
-        if LOCAL_DISK_CACHE_SIZE > 0:
+        if use_disk_cache and LOCAL_DISK_CACHE_SIZE > 0 and recorder is None:
             self._disk_cache = DiskCache(LOCAL_DISK_CACHE_SIZE)
 
         self._L_commands = RLock()
@@ -46,11 +59,14 @@ class RemoteObserver(object):
     def _raw_connect(self, mode):
         self._client = self._create_client(mode)
         welcome_message = self._client.read_json()
+        if self._recorder:
+            self._recorder.record(welcome_message)
+
         pairs_info = welcome_message["pairs_info"]
         self._pairs = list(pairs_info.keys())
         readers = {}
         for pair, info in pairs_info.items():
-            readers[pair] = RemoteEntryReader(pair, info["entry_count"], self)
+            readers[pair] = RemoteEntryReader(pair, info["entry_count"], self, self._read_ahead_bucket_count)
         self._readers = readers
 
     def get_readers(self):
@@ -78,21 +94,63 @@ class RemoteObserver(object):
 
         return index * StorageWriter.bucket_entry_count
 
+    def get_bucket_summaries(self, pair, start_bucket: int, end_bucket: int):
+        response = self._send_command({
+            "name": "get_bucket_summaries",
+            "pair": pair,
+            "start_bucket": start_bucket,
+            "end_bucket": end_bucket
+        })
+
+        return BucketSummary.from_chunks(base64.b64decode(response["summaries"]))
+
     def async_get_bucket(self, pair, bucket_index):
-        if self._disk_cache:
-            bucket_bytes = self._disk_cache.get_bucket(pair, bucket_index)
-            if bucket_bytes:
-                entries = TradeEntry.from_chunk(pair, bucket_bytes)
-                self._readers[pair]._receive_bucket(bucket_index, entries)
-                return
+        if self._receive_cached_bucket(pair, bucket_index):
+            return
 
         log_cache(f"Requesting remote bucket {pair} {bucket_index}")
         self._client.send_json({
             "name": "async_get_bucket",
             "pair": pair,
             "bucket_index": bucket_index,
+            "accept_compressed": True,
         })
 
+    def async_get_bucket_range(self, pair, start_bucket: int, end_bucket: int):
+        """
+        Requests buckets between the indexes, contiguous buckets missing in the disk cache come in a single response.
+        """
+        missing_buckets = [bucket_index for bucket_index in range(start_bucket, end_bucket)
+                           if not self._receive_cached_bucket(pair, bucket_index)]
+
+        range_start = 0
+        for i in range(1, len(missing_buckets) + 1):
+            is_range_end = i == len(missing_buckets) or missing_buckets[i] != missing_buckets[i - 1] + 1
+            if not is_range_end and i - range_start < MAX_BUCKET_RANGE:
+                continue
+
+            log_cache(f"Requesting remote buckets {pair} {missing_buckets[range_start]}-{missing_buckets[i - 1]}")
+            self._client.send_json({
+                "name": "async_get_bucket_range",
+                "pair": pair,
+                "start_bucket": missing_buckets[range_start],
+                "end_bucket": missing_buckets[i - 1] + 1,
+                "accept_compressed": True,
+            })
+            range_start = i
+
+    def _receive_cached_bucket(self, pair, bucket_index) -> bool:
+        if not self._disk_cache:
+            return False
+
+        bucket_bytes = self._disk_cache.get_bucket(pair, bucket_index)
+        if not bucket_bytes:
+            return False
+
+        reader = self._readers[pair]
+        reader._receive_bucket(bucket_index, TradeEntryBatch(reader.pair, bucket_bytes))
+        return True
+
     def send_portfolio_command_request(self, command):
         return self._send_command({
             "name": "update_portfolio_state",
@@ -113,9 +171,10 @@ class RemoteObserver(object):
         self._command_events[id] = event
 
         command["id"] = id
-        self._client.send_json(command)
+        with measure(f"observer.command.{command['name']}"):
+            self._client.send_json(command)
 
-        event.wait()  # wait until response comes from server
+            event.wait()  # wait until response comes from server
         del self._command_events[id]
         result = self._command_results.pop(id)
         return result
@@ -126,23 +185,25 @@ class RemoteObserver(object):
             if message is None:
                 break
 
+            if self._recorder and ("f" in message or "bucket_index" in message or "bucket_range" in message):
+                self._recorder.record(message)
+
             if "f" in message:
                 # we got feed
-                pair = message["f"]
+                pair = self._readers[message["f"]].pair  # use the interned pair of the reader
                 start_entry_index = message["i"]
                 base64_chunk = message["c"]
 
                 entries = self._decode_chunk(pair, base64_chunk)
                 self._readers[pair]._receive_peek_entries(start_entry_index, entries)
-            elif "bucket" in message:
-                pair = message["pair"]
-                bucket_index = message["bucket_index"]
-                base64_chunk = message["bucket"]
-                if self._disk_cache:
-                    payload = base64.b64decode(base64_chunk)
-                    self._disk_cache.set_bucket(pair, bucket_index, payload)
+            elif "bucket" in message or "compressed_bucket" in message:
+                pair = self._readers[message["pair"]].pair
+                self._receive_remote_bucket(pair, message["bucket_index"], message)
 
-                self._readers[pair]._receive_bucket(bucket_index, self._decode_chunk(pair, base64_chunk))
+            elif "bucket_range" in message:
+                pair = self._readers[message["pair"]].pair
+                for offset, bucket_message in enumerate(message["bucket_range"]):
+                    self._receive_remote_bucket(pair, message["start_bucket"] + offset, bucket_message)
 
             elif "id" in message:
                 # response for a command came
@@ -177,6 +238,18 @@ class RemoteObserver(object):
         print("\t interrupt main")
         _thread.interrupt_main()
 
+    def _receive_remote_bucket(self, pair, bucket_index, message):
+        if "compressed_bucket" in message:
+            payload = BucketCodec.decode(base64.b64decode(message["compressed_bucket"]))
+        else:
+            payload = base64.b64decode(message["bucket"])
+        if self._disk_cache:
+            self._disk_cache.set_bucket(pair, bucket_index, payload)
+
+        count("observer.received_buckets")
+        count("observer.received_bucket_bytes", len(payload))
+        self._readers[pair]._receive_bucket(bucket_index, TradeEntryBatch(pair, payload))
+
     def _create_client(self, access_mode):
         client = SocketClient()
         host, port = self._remote_endpoint.split(":")
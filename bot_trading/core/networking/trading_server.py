@@ -5,13 +5,15 @@ import time
 import traceback
 from collections import defaultdict
 from copy import deepcopy
+from math import ceil
 from threading import Thread, RLock
 from typing import List, Dict
 
 import jsonpickle
 from pymongo import MongoClient
 
-from bot_trading.core.configuration import TARGET_CURRENCY, INITIAL_AMOUNT, COMMAND_BURST_LIMIT, COMMAND_RATE_LIMIT
+from bot_trading.core.configuration import TARGET_CURRENCY, INITIAL_AMOUNT, COMMAND_BURST_LIMIT, COMMAND_RATE_LIMIT, \
+    MAX_BUCKET_RANGE
 from bot_trading.core.data.parsing import parse_pair
 from bot_trading.core.data.storage_reader import StorageReader
 from bot_trading.core.data.storage_writer import StorageWriter
@@ -243,10 +245,26 @@ class TradingServer(object):
                     bucket_index = int(command["bucket_index"])
 
                     storage = self._storages[pair]
-                    chunk = storage.get_bucket_chunk(bucket_index)
                     response["pair"] = pair
                     response["bucket_index"] = bucket_index
-                    response["bucket"] = self._encode_chunk(chunk)
+                    response.update(self._get_bucket_payload(storage, bucket_index,
+                                                             command.get("accept_compressed", False)))
+
+                elif c == "async_get_bucket_range":
+                    pair = command["pair"]
+                    start_bucket = int(command["start_bucket"])
+                    end_bucket = int(command["end_bucket"])
+
+                    storage = self._storages[pair]
+                    bucket_count = int(ceil(storage.get_entry_count() / StorageWriter.bucket_entry_count))
+                    end_bucket = min(end_bucket, start_bucket + MAX_BUCKET_RANGE, bucket_count)
+
+                    response["pair"] = pair
+                    response["start_bucket"] = start_bucket
+                    response["bucket_range"] = [
+                        self._get_bucket_payload(storage, bucket_index, command.get("accept_compressed", False))
+                        for bucket_index in range(start_bucket, end_bucket)
+                    ]
 
                 elif c == "find_pricebook_start":
                     pair = command["pair"]
@@ -259,6 +277,15 @@ class TradingServer(object):
                     # response["bucket"] = self._encode_chunk(chunk)
                     response["bucket_index"] = bucket_index
 
+                elif c == "get_bucket_summaries":
+                    pair = command["pair"]
+                    start_bucket = int(command["start_bucket"])
+                    end_bucket = int(command["end_bucket"])
+
+                    storage = self._storages[pair]
+                    summaries = storage.get_bucket_summaries(start_bucket, end_bucket)
+                    response["summaries"] = self._encode_chunk(b"".join(s.to_chunk() for s in summaries))
+
                 elif c == "receive_portfolio_state":
                     user_data = self._get_user_data(username)
                     response["portfolio_state"] = user_data["portfolio_state"]
@@ -340,6 +367,17 @@ class TradingServer(object):
         base64_chunk = base64.b64encode(bytearray(chunk)).decode("ascii")
         return base64_chunk
 
+    def _get_bucket_payload(self, storage: StorageReader, bucket_index: int, accept_compressed: bool) -> dict:
+        compressed_chunk = None
+        if accept_compressed:
+            # compressed buckets are shipped as they are stored
+            compressed_chunk = storage.get_compressed_bucket(bucket_index)
+
+        if compressed_chunk is not None:
+            return {"compressed_bucket": self._encode_chunk(compressed_chunk)}
+
+        return {"bucket": self._encode_chunk(storage.get_bucket_chunk(bucket_index))}
+
     def _get_user_data(self, username):
         with self._L_collection:
             return self._collection.users.find_one({"_id": username})
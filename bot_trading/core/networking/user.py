@@ -1,5 +1,6 @@
 from typing import List
 
+from bot_trading.core.configuration import MAX_READ_CONNECTIONS
 from bot_trading.core.networking.socket_client import SocketClient
 
 
@@ -16,7 +17,7 @@ class User(object):
     def accept(self, new_client):
         if new_client.is_readonly:
             self._readonly_clients.append(new_client)
-            while len(self._readonly_clients) > 3:
+            while len(self._readonly_clients) > MAX_READ_CONNECTIONS:
                 client = self._readonly_clients.pop(0)
                 self._shutdown_client(client)
         else:
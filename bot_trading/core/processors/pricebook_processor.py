@@ -1,3 +1,4 @@
+from bisect import bisect_left, insort
 from typing import List
 
 from bot_trading.core.configuration import BOOK_DEPTH, DUST_LEVEL
@@ -10,6 +11,20 @@ class PricebookProcessor(ProcessorBase):
         self._pair = pair
         self._sell_container = None
         self._buy_container = None
+
+        # prices of the containers kept sorted (ascending)
+        self._sell_prices: List[float] = None
+        self._buy_prices: List[float] = None
+
+        # levels are computed once per container change
+        self._sell_levels = None
+        self._buy_levels = None
+
+        # shared structures are copied before their first change (see share_dump)
+        self._sell_shared = False
+        self._buy_shared = False
+        self._buffer_shared = False
+
         self._current_time = 0.0
         self._is_ready = False
 
@@ -29,11 +44,24 @@ class PricebookProcessor(ProcessorBase):
 
     @property
     def buy_levels(self):
-        return self._get_levels(self._buy_container, True)
+        """
+        Levels (price, cumulative amount, amount) from the best bid down. The list is shared, don't modify it.
+        """
+        if self._buy_levels is None:
+            self._buy_levels = self._get_levels(self._buy_container, reversed(self._buy_prices or []))
+
+        return self._buy_levels
 
     @property
     def sell_levels(self):
-        return list(reversed(self._get_levels(self._sell_container, False)))
+        """
+        Levels (price, cumulative amount, amount) from the worst ask up to the best ask (the last one).
+        The list is shared, don't modify it.
+        """
+        if self._sell_levels is None:
+            self._sell_levels = list(reversed(self._get_levels(self._sell_container, self._sell_prices or [])))
+
+        return self._sell_levels
 
     @property
     def spread(self):
@@ -42,44 +70,65 @@ class PricebookProcessor(ProcessorBase):
 
     @property
     def bid_ask(self):
-        max_b = max(self._buy_container)
-        min_b = min(self._sell_container)
+        if not self._buy_prices or not self._sell_prices:
+            raise ValueError(f"Pricebook {self._pair} has no bid or ask")
 
-        return [max_b, min_b]
+        return [self._buy_prices[-1], self._sell_prices[0]]
 
     @property
     def current_depth(self):
         return min(len(self._buy_container), len(self._sell_container))
 
     def accept(self, entry):
+        if self._buffer_shared:
+            self._buffer = list(self._buffer)
+            self._buffer_shared = False
+
         self._buffer.append(entry)
 
         if entry.is_flush_entry:
             self.flush()
 
     def reset(self, is_buy):
-        self._buy_container = {}
-        self._sell_container = {}
+        self._set_containers({}, {}, None, None, is_shared=False)
         # buffer doesn't need resets because all stuff enqueued earlier will be forgotten via container resets
 
     def write(self, is_buy, price, amount, timestamp):
         self._current_time = max(self._current_time, timestamp)
         if is_buy:
+            if self._buy_shared:
+                self._buy_container = dict(self._buy_container)
+                self._buy_prices = list(self._buy_prices)
+                self._buy_shared = False
+
             container = self._buy_container
+            prices = self._buy_prices
+            self._buy_levels = None
         else:
+            if self._sell_shared:
+                self._sell_container = dict(self._sell_container)
+                self._sell_prices = list(self._sell_prices)
+                self._sell_shared = False
+
             container = self._sell_container
+            prices = self._sell_prices
+            self._sell_levels = None
 
         if amount <= DUST_LEVEL:
             if price in container:
                 del container[price]
+                del prices[bisect_left(prices, price)]
         else:
+            if price not in container:
+                insort(prices, price)
             container[price] = (amount, timestamp)
 
         if len(container) > BOOK_DEPTH:
+            # the worst level is dropped
             if is_buy:
-                last_key = min(container.keys())
+                last_key = prices.pop(0)
             else:
-                last_key = max(container.keys())
+                last_key = prices.pop()
 
             del container[last_key]
 
@@ -88,27 +137,52 @@ class PricebookProcessor(ProcessorBase):
             super().accept(entry)
 
         self._buffer = []
-
-    def inject(self, buy_container, sell_container, buffer):
-        self._buy_container = buy_container
-        self._sell_container = sell_container
+        self._buffer_shared = False
+
+    def share_dump(self):
+        """
+        Returns the processor data without copying. The processor copies each structure before its next change,
+        so the returned data stays unchanged (and must not be changed by the caller).
+        """
+        self._buy_shared = self._buy_container is not None
+        self._sell_shared = self._sell_container is not None
+        self._buffer_shared = True
+
+        return self._buy_container, self._sell_container, self._buffer, self._buy_prices, self._sell_prices
+
+    def inject_shared(self, buy_container, sell_container, buffer, buy_prices, sell_prices):
+        """
+        Counterpart of share_dump - the data is used without copying until the first change.
+        """
+        self._set_containers(buy_container, sell_container, buy_prices, sell_prices, is_shared=True)
         self._buffer = buffer
+        self._buffer_shared = True
 
-    def get_dump(self):
-        return self._buy_container, self._sell_container, self._buffer
+    def _set_containers(self, buy_container, sell_container, buy_prices, sell_prices, is_shared):
+        if buy_prices is None and buy_container is not None:
+            buy_prices = sorted(buy_container)
 
-    def _get_levels(self, container, increasing_accumulation):
-        borders = sorted(container.items(), key=lambda i: i[0], reverse=increasing_accumulation)
+        if sell_prices is None and sell_container is not None:
+            sell_prices = sorted(sell_container)
 
+        self._buy_container = buy_container
+        self._sell_container = sell_container
+        self._buy_prices = buy_prices
+        self._sell_prices = sell_prices
+        self._buy_levels = None
+        self._sell_levels = None
+        self._buy_shared = is_shared and buy_container is not None
+        self._sell_shared = is_shared and sell_container is not None
+
+    def _get_levels(self, container, prices):
+        levels = []
         acc = 0.0
-        for i in range(len(borders)):
-            border_value = borders[i][1][0]
-            acc += border_value
-            new_border = list(borders[i])
-            new_border[1] = acc
-            borders[i] = tuple(new_border + [border_value])
-
-        return borders
+        for price in prices:
+            amount = container[price][0]
+            acc += amount
+            levels.append((price, acc, amount))
+
+        return levels
 
     def dump_to_entries(self) -> List[TradeEntry]:
         result = []
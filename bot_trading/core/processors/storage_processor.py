@@ -1,5 +1,6 @@
 from typing import Dict
 
+from bot_trading.core.configuration import STORAGE_FLUSH_INTERVAL, STORAGE_FLUSH_SIZE
 from bot_trading.core.data.storage_writer import StorageWriter
 from bot_trading.core.processors.processor_base import ProcessorBase
 
@@ -9,7 +10,7 @@ ACTIVE_STORAGES: Dict[str, StorageWriter] = {}
 class StorageProcessor(ProcessorBase):
     def __init__(self, pair: str):
         if pair not in ACTIVE_STORAGES:
-            ACTIVE_STORAGES[pair] = StorageWriter(pair)
+            ACTIVE_STORAGES[pair] = StorageWriter(pair, STORAGE_FLUSH_INTERVAL, STORAGE_FLUSH_SIZE)
 
         self._storage = ACTIVE_STORAGES[pair]
         self._pair = pair
@@ -24,3 +25,14 @@ class StorageProcessor(ProcessorBase):
 
     def flush(self):
         self._storage.flush()
+
+        # quiet pairs would keep their entries pending until their next message otherwise
+        for storage in ACTIVE_STORAGES.values():
+            storage.commit_if_due()
+
+
+def close_active_storages():
+    for storage in ACTIVE_STORAGES.values():
+        storage.close()
+
+    ACTIVE_STORAGES.clear()
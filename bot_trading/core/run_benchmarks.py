@@ -0,0 +1,48 @@
+import json
+import tempfile
+
+from bot_trading.core.benchmark_suite import BenchmarkSuite, format_comparison
+from bot_trading.core.command_line import get_arguments, get_option
+
+"""
+Runs offline benchmarks of the data path on synthetic storage and writes the results as JSON.
+Usage: python -m bot_trading.core.run_benchmarks [--pairs N] [--entries N] [--repeat N] [--storage DIR]
+                                                 [--output PATH] [--compare PATH] [BENCHMARK ...]
+       Synthetic storage in --storage is generated once and reused by later runs (a temporary one is used otherwise).
+       --compare prints speedups against results of a previous run (e.g. of another commit).
+"""
+
+
+if __name__ == "__main__":
+    benchmark_names = get_arguments(["--pairs", "--entries", "--repeat", "--storage", "--output", "--compare"])
+
+    pair_count = int(get_option("--pairs", 4))
+    entries_per_pair = int(get_option("--entries", 200_000))
+    repeat = int(get_option("--repeat", 3))
+    output_path = get_option("--output", "benchmarks.json")
+    compare_path = get_option("--compare", None)
+
+    storage_path = get_option("--storage", None)
+    temporary_directory = None
+    if storage_path is None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        storage_path = temporary_directory.name
+
+    print("BENCHMARKS")
+    suite = BenchmarkSuite(storage_path, pair_count, entries_per_pair, repeat)
+    results = suite.run(benchmark_names or None)
+
+    with open(output_path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\t results written to {output_path}")
+
+    if compare_path is not None:
+        with open(compare_path) as f:
+            baseline = json.load(f)
+
+        print(f"COMPARISON WITH {baseline.get('commit')}")
+        print(format_comparison(results, baseline))
+
+    if temporary_directory is not None:
+        temporary_directory.cleanup()
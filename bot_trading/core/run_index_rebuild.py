@@ -0,0 +1,46 @@
+import os
+import sys
+
+from bot_trading.core.configuration import TRACKED_PAIRS
+from bot_trading.core.data.bucket_index import BucketIndex
+from bot_trading.core.data.compressed_segment import CompressedSegment
+from bot_trading.core.data.storage_writer import StorageWriter
+from bot_trading.core.data.trade_entry import TradeEntry
+
+"""
+Rebuilds missing or incomplete bucket index files (.idx) from the book files (or compressed segments).
+Usage: python -m bot_trading.core.run_index_rebuild [--force] [PAIR ...]
+"""
+
+force = "--force" in sys.argv
+pairs = [arg for arg in sys.argv[1:] if not arg.startswith("--")] or TRACKED_PAIRS
+
+print("BUCKET INDEX REBUILD")
+for pair in pairs:
+    print(f"\t {pair}")
+
+    catalog = StorageWriter.load_catalog(pair)
+    for file_info in catalog.files:
+        file_index = file_info["index"]
+        index_path = StorageWriter.get_index_path(pair, file_index)
+
+        if file_info["compressed"]:
+            # the book file was removed by the compaction
+            segment = CompressedSegment(StorageWriter.get_compressed_storage_path(pair, file_index),
+                                        StorageWriter.bucket_entry_count)
+            if force or BucketIndex.get_record_count(index_path) != segment.bucket_count:
+                bucket_chunks = (segment.read_bucket(i) for i in range(segment.bucket_count))
+                indexed_count = BucketIndex.rebuild_from_buckets(index_path, bucket_chunks)
+                print(f"\t\t {index_path} rebuilt with {indexed_count} buckets")
+
+            continue
+
+        book_path = StorageWriter.get_storage_path(pair, file_index)
+        file_entry_count = int(os.path.getsize(book_path) / TradeEntry.chunk_size)
+        bucket_count = int((file_entry_count + StorageWriter.bucket_entry_count - 1) / StorageWriter.bucket_entry_count)
+
+        if force or BucketIndex.get_record_count(index_path) != bucket_count:
+            indexed_count = BucketIndex.rebuild(book_path, index_path, StorageWriter.bucket_entry_count)
+            print(f"\t\t {index_path} rebuilt with {indexed_count} buckets")
+
+print("REBUILD COMPLETE")
@@ -1,7 +1,18 @@
+import atexit
+import signal
+import sys
+
 from bot_trading.core.configuration import TRACKED_PAIRS, WS_URL
 from bot_trading.core.networking.feed_connector import FeedWriter
-from bot_trading.core.processors.storage_processor import StorageProcessor
+from bot_trading.core.processors.storage_processor import StorageProcessor, close_active_storages
+
+# entries batched by the storage writers are stored on shutdown
+atexit.register(close_active_storages)
+signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
 
 tracked_pairs = TRACKED_PAIRS
 writer = FeedWriter(WS_URL, tracked_pairs, StorageProcessor)
-writer.run()
+try:
+    writer.run()
+except KeyboardInterrupt:
+    print("scraper interrupted")
@@ -0,0 +1,65 @@
+import os
+import sys
+
+from bot_trading.core.configuration import TRACKED_PAIRS
+from bot_trading.core.data.bucket_codec import BucketCodec
+from bot_trading.core.data.compressed_segment import CompressedSegment
+from bot_trading.core.data.storage_writer import StorageWriter
+from bot_trading.core.data.trade_entry import TradeEntry
+
+"""
+Rewrites sealed (full) book files into compressed segments and removes the original book files.
+Usage: python -m bot_trading.core.run_storage_compaction [--lzma] [--keep-books] [PAIR ...]
+"""
+
+method = BucketCodec.LZMA if "--lzma" in sys.argv else BucketCodec.ZLIB
+keep_books = "--keep-books" in sys.argv
+pairs = [arg for arg in sys.argv[1:] if not arg.startswith("--")] or TRACKED_PAIRS
+
+sealed_file_size = StorageWriter.file_entry_count * TradeEntry.chunk_size
+bucket_size = StorageWriter.bucket_entry_count * TradeEntry.chunk_size
+
+
+def read_bucket_chunks(path):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(bucket_size)
+            if not chunk:
+                break
+
+            yield chunk
+
+
+print("STORAGE COMPACTION")
+for pair in pairs:
+    print(f"\t {pair}")
+
+    catalog = StorageWriter.load_catalog(pair)
+    for file_info in catalog.files:
+        file_index = file_info["index"]
+        book_path = StorageWriter.get_storage_path(pair, file_index)
+        compressed_path = StorageWriter.get_compressed_storage_path(pair, file_index)
+
+        if not os.path.exists(book_path) or os.path.getsize(book_path) != sealed_file_size:
+            continue  # file is compressed already or it is not sealed yet
+
+        if not os.path.exists(compressed_path):
+            CompressedSegment.write(compressed_path, read_bucket_chunks(book_path), method)
+
+        # verify the segment before the book is removed
+        segment = CompressedSegment(compressed_path, StorageWriter.bucket_entry_count)
+        for bucket_index, chunk in enumerate(read_bucket_chunks(book_path)):
+            if segment.read_bucket(bucket_index) != chunk:
+                raise AssertionError(f"Compressed bucket {bucket_index} of {compressed_path} does not match")
+
+        compressed_size = os.path.getsize(compressed_path)
+        ratio = compressed_size / sealed_file_size
+        print(f"\t\t {book_path} {sealed_file_size} B -> {compressed_size} B ({ratio:.1%})")
+
+        if not keep_books:
+            # readers open the segment directly from now on
+            catalog.update_file(file_index, compressed=True)
+            catalog.save(StorageWriter.get_catalog_path(pair))
+            os.remove(book_path)
+
+print("COMPACTION COMPLETE")
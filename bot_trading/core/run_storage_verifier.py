@@ -0,0 +1,36 @@
+import json
+import sys
+
+from bot_trading.core.command_line import get_arguments, get_option
+from bot_trading.core.configuration import TRACKED_PAIRS
+from bot_trading.core.data.storage_verifier import StorageVerifier
+
+"""
+Verifies integrity of the whole storage in parallel and writes a JSON report.
+Usage: python -m bot_trading.core.run_storage_verifier [--workers N] [--report PATH] [--skip-books] [PAIR ...]
+"""
+
+
+if __name__ == "__main__":
+    worker_count = int(get_option("--workers", 0)) or None
+    report_path = get_option("--report", "storage_verification.json")
+    check_books = "--skip-books" not in sys.argv
+
+    pairs = get_arguments(["--workers", "--report"]) or TRACKED_PAIRS
+
+    print("STORAGE VERIFICATION")
+    report = StorageVerifier(pairs, worker_count, check_books).run()
+
+    for pair, pair_report in report["pairs"].items():
+        print(f"\t {pair}: {pair_report['entry_count']} entries, {pair_report['error_count']} errors, "
+              f"{pair_report['warning_count']} warnings")
+        for kind, count in sorted(pair_report["issues"].items()):
+            print(f"\t\t {kind}: {count}")
+
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\t {report['total_entries']} entries in {report['walltime']:.1f}s "
+          f"({report['entries_per_second'] or 0:.0f} entries/s), report: {report_path}")
+    print("VERIFICATION " + ("OK" if report["ok"] else "FAILED"))
+    sys.exit(0 if report["ok"] else 1)
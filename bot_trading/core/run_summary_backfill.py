@@ -0,0 +1,43 @@
+import sys
+
+from bot_trading.core.configuration import TRACKED_PAIRS
+from bot_trading.core.data.bucket_summary import BucketSummary
+from bot_trading.core.data.storage_reader import StorageReader
+from bot_trading.core.data.storage_writer import StorageWriter
+
+"""
+Creates missing or incomplete bucket summary files (.sum) for the storage files.
+Usage: python -m bot_trading.core.run_summary_backfill [--force] [PAIR ...]
+"""
+
+force = "--force" in sys.argv
+pairs = [arg for arg in sys.argv[1:] if not arg.startswith("--")] or TRACKED_PAIRS
+
+buckets_per_file = int(StorageWriter.file_entry_count / StorageWriter.bucket_entry_count)
+
+print("BUCKET SUMMARY BACKFILL")
+for pair in pairs:
+    print(f"\t {pair}")
+
+    reader = StorageReader(pair)
+    catalog = StorageWriter.load_catalog(pair)
+    for file_info in catalog.files:
+        file_index = file_info["index"]
+        summary_path = StorageWriter.get_summary_path(pair, file_index)
+
+        if file_info["sealed"]:
+            bucket_count = buckets_per_file
+        else:
+            # the last bucket of the open file is summarized by the writer when it is complete
+            file_entry_count = reader.get_entry_count() - file_index * StorageWriter.file_entry_count
+            bucket_count = max(0, int((file_entry_count - 1) / StorageWriter.bucket_entry_count))
+
+        if not force and BucketSummary.get_record_count(summary_path) == bucket_count:
+            continue
+
+        first_bucket = file_index * buckets_per_file
+        bucket_chunks = (reader.get_bucket_chunk(first_bucket + i) for i in range(bucket_count))
+        summarized_count = BucketSummary.rebuild(summary_path, pair, bucket_chunks)
+        print(f"\t\t {summary_path} rebuilt with {summarized_count} buckets")
+
+print("BACKFILL COMPLETE")
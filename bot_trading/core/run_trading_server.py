@@ -13,7 +13,7 @@ from bot_trading.core.data.parsing import make_pair
 os.environ["BOT_USERNAME"] = "system@email.cz"
 
 from bot_trading.configuration import TRADING_ENDPOINT
-from bot_trading.core.data.storage_reader import StorageReader
+from bot_trading.core.data.mapped_storage_reader import MappedStorageReader
 from bot_trading.core.networking.trading_server import TradingServer
 from bot_trading.core.web.history_cache import HistoryCache
 from bot_trading.core.web.score_record import ScoreRecord
@@ -26,7 +26,7 @@ readers = []
 print("Preparing readers")
 for pair in SERVER_SUPPORTED_PAIRS:
     print(f"\t {pair}")
-    storage = StorageReader(pair)
+    storage = MappedStorageReader(pair)
     readers.append(storage)
     history_cache[pair] = HistoryCache(storage, 10.0, 5 * 3600)
     history_cache[pair].get_data()
@@ -0,0 +1,72 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from threading import RLock
+from typing import Optional, List
+
+from bot_trading.core.data.pricebook_processor_state import PricebookProcessorState
+
+
+class CheckpointStore(object):
+    """
+    Pricebook states of a single pair sorted by time.
+    Least recently used states are evicted when the estimated memory budget is exceeded.
+    """
+
+    def __init__(self, memory_budget: int):
+        self._memory_budget = memory_budget
+        self._L_states = RLock()
+
+        self._times: List[float] = []
+        self._states: List[PricebookProcessorState] = []
+
+        # id(state) -> (state, estimated size) ordered from the least recently used
+        self._usage = OrderedDict()
+        self._memory_usage = 0
+
+    @property
+    def memory_usage(self) -> int:
+        return self._memory_usage
+
+    def __len__(self):
+        return len(self._states)
+
+    def find(self, timestamp: float) -> Optional[PricebookProcessorState]:
+        """
+        Finds the latest state which is not newer than the timestamp.
+        """
+        with self._L_states:
+            position = bisect_right(self._times, timestamp) - 1
+            if position < 0:
+                return None
+
+            state = self._states[position]
+            self._usage.move_to_end(id(state))
+            return state
+
+    def put(self, state: PricebookProcessorState):
+        with self._L_states:
+            if id(state) in self._usage:
+                return  # the state is stored already
+
+            position = bisect_right(self._times, state.current_time)
+            self._times.insert(position, state.current_time)
+            self._states.insert(position, state)
+
+            size = state.get_size_estimate()
+            self._usage[id(state)] = (state, size)
+            self._memory_usage += size
+
+            while self._memory_usage > self._memory_budget and len(self._states) > 1:
+                self._evict_least_recently_used()
+
+    def _evict_least_recently_used(self):
+        _, (state, size) = self._usage.popitem(last=False)
+        self._memory_usage -= size
+
+        # states with the same time are next to each other
+        position = bisect_right(self._times, state.current_time) - 1
+        while self._states[position] is not state:
+            position -= 1
+
+        del self._times[position]
+        del self._states[position]
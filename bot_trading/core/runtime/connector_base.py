@@ -1,8 +1,11 @@
-from typing import List
+from threading import RLock
+from typing import List, Dict, Optional
 
 from bot_trading.core.data.entry_reader_base import EntryReaderBase
 from bot_trading.core.data.parsing import reverse_pair, make_pair
+from bot_trading.core.data.pricebook_processor_state import PricebookProcessorState
 from bot_trading.core.data.trade_entry import TradeEntry
+from bot_trading.core.processors.pricebook_processor import PricebookProcessor
 from bot_trading.trading.pricebook_view import PricebookView
 from bot_trading.core.runtime.pricebook_view_provider import PricebookViewProvider
 
@@ -15,17 +18,33 @@ class ConnectorBase(object):
     def current_time(self):
         return self._current_time
 
+    @property
+    def processed_entry_count(self):
+        return self._processed_entry_count
+
     def __init__(self, entry_readers: List[EntryReaderBase]):
         self._readers: List[EntryReaderBase] = list(entry_readers)
         self._subscribers = []
         self._current_time = 0.0
+        self._processed_entry_count = 0
+
+        # index (within its reader) of the last entry returned by blocking_get_next_entry - set by subclasses
+        self._last_entry_index: Optional[int] = None
+
+        # books of the present kept up to date by run
+        self._L_live = RLock()
+        self._live_processors: Dict[str, PricebookProcessor] = {}
+        self._live_next_indexes: Dict[str, int] = {}
 
         self._view_providers = {}
+        self._pair_readers = {}
         for reader in self._readers:
             provider = PricebookViewProvider(reader)
 
             self._view_providers[reader.pair] = provider
             self._view_providers[reverse_pair(reader.pair)] = provider
+            self._pair_readers[reader.pair] = reader
+            self._pair_readers[reverse_pair(reader.pair)] = reader
 
     def get_pricebook(self, source_currency, target_currency, timestamp) -> PricebookView:
         pair = make_pair(source_currency, target_currency)
@@ -34,8 +53,19 @@ class ConnectorBase(object):
         if pricebook_provider is None:
             raise ValueError(f"Pair {pair} was not found.")
 
+        if timestamp == self._current_time:
+            view = self._get_live_pricebook_view(self._pair_readers[pair])
+            if view is not None:
+                return view
+
         return pricebook_provider.get_pricebook_view(timestamp)
 
+    def close(self):
+        """
+        Releases resources of the connector (there is nothing to release by default).
+        """
+        pass
+
     def subscribe(self, subscriber):
         self._subscribers.append(subscriber)
 
@@ -49,7 +79,68 @@ class ConnectorBase(object):
 
     def run(self):
         for entry in self._read_entries():
-            self._current_time = max(self._current_time, entry.timestamp)
+            self._process_entry(entry)
 
             for subscriber in self._subscribers:
                 subscriber.receive(entry)
+
+    def run_until(self, timestamp: float) -> bool:
+        """
+        Processes entries without notifying subscribers until an entry moves current time to the timestamp
+        (at least one entry is processed). Returns False when no more entries are available.
+        """
+        for entry in self._read_entries():
+            self._process_entry(entry)
+
+            if self._current_time >= timestamp:
+                return True
+
+        return False
+
+    def _process_entry(self, entry: TradeEntry):
+        self._current_time = max(self._current_time, entry.timestamp)
+        self._update_live_pricebook(entry)
+        self._processed_entry_count += 1
+
+    def _is_live_pricebook_complete(self, reader: EntryReaderBase) -> bool:
+        """
+        Determine whether the live book contains all entries of the reader up to the current time.
+        """
+        return True
+
+    def _get_live_pricebook_view(self, reader: EntryReaderBase) -> Optional[PricebookView]:
+        with self._L_live:
+            processor = self._live_processors.get(reader.pair)
+            if processor is None or not processor.is_ready:
+                return None  # the live book is not synchronized yet
+
+            if not self._is_live_pricebook_complete(reader):
+                return None
+
+            # the view shares the book with the live processor (copy on write)
+            state = PricebookProcessorState(self._live_next_indexes[reader.pair], self._current_time)
+            state.load_from(processor)
+
+        return PricebookView(state, reader)
+
+    def _update_live_pricebook(self, entry: TradeEntry):
+        entry_index = self._last_entry_index
+        if entry_index is None:
+            return  # entry positions are not known - live books can't be kept
+
+        with self._L_live:
+            processor = self._live_processors.get(entry.pair)
+            if processor is not None and self._live_next_indexes[entry.pair] != entry_index:
+                # some entries were skipped, the book has to be synchronized again
+                processor = None
+                del self._live_processors[entry.pair]
+
+            if processor is None:
+                if not entry.is_reset:
+                    return  # the book can be replayed from a reset entry only
+
+                processor = PricebookProcessor(entry.pair)
+                self._live_processors[entry.pair] = processor
+
+            processor.accept(entry)
+            self._live_next_indexes[entry.pair] = entry_index + 1
@@ -1,5 +1,7 @@
 from typing import Any, List, Dict
 
+from bot_trading.trading.fund import Fund
+
 
 class CurrencyPosition(object):
     def __init__(self, currency: str, position_data: List[Dict[str, Any]]):
@@ -10,22 +12,22 @@ class CurrencyPosition(object):
     def total_amount(self):
         return sum(bucket["amount"] for bucket in self._buckets)
 
-    def get_amount_with(self, market, gain):
+    def get_amount_with(self, present, gain):
         accumulator = 0.0
         for bucket in self._buckets:
             amount = bucket["amount"]
-            current_value = market.get_value(amount, self.currency)
+            current_value = present.get_value(Fund(amount, self.currency))
 
             if current_value.amount >= bucket["initial_value"] * gain:
                 accumulator += amount
 
         return accumulator
 
-    def get_bucket_amounts_with(self, market, gain):
+    def get_bucket_amounts_with(self, present, gain):
         result = []
         for bucket in self._buckets:
             amount = bucket["amount"]
-            current_value = market.get_value(amount, self.currency)
+            current_value = present.get_value(Fund(amount, self.currency))
 
             if current_value.amount >= bucket["initial_value"] * gain:
                 result.append(amount)
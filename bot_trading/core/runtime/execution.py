@@ -2,9 +2,16 @@ import os
 import time
 
 from bot_trading.bots.bot_base import BotBase
-from bot_trading.core.configuration import INITIAL_AMOUNT, TARGET_CURRENCY
+from bot_trading.core.configuration import INITIAL_AMOUNT, TARGET_CURRENCY, FULLPASS_PREFETCH_THREAD_COUNT, \
+    WRITE_MODE, READ_MODE, METRICS_PATH
+from bot_trading.core.data.storage_writer import StorageWriter
+from bot_trading.core.metrics import dump_metrics, start_periodic_metrics_dump, is_metrics_enabled
+from bot_trading.core.networking.feed_recorder import FeedRecorder
 from bot_trading.core.networking.remote_observer import RemoteObserver
+from bot_trading.core.runtime.local_history_connector import LocalHistoryConnector
+from bot_trading.core.runtime.parameter_sweep import ParameterSweep, format_results_table
 from bot_trading.core.runtime.remote_portfolio import RemotePortfolio
+from bot_trading.core.runtime.replay_connector import ReplayConnector
 from bot_trading.core.runtime.sandbox_portfolio import SandboxPortfolio
 from bot_trading.core.runtime.validation import validate_email
 from bot_trading.trading.bot_executor import BotExecutor
@@ -14,10 +21,14 @@ from bot_trading.core.runtime.peek_connector import PeekConnector
 from bot_trading.trading.portfolio_controller import PortfolioController
 
 HISTORY_MODE = "history"
+LOCAL_HISTORY_MODE = "local_history"
 PEEK_MODE = "peek"
 
-WRITE_MODE = "write"
-READ_MODE = "read"
+
+def get_dataset_path():
+    from bot_trading.configuration import LOCAL_DATASET_PATH
+
+    return LOCAL_DATASET_PATH
 
 
 def get_username():
@@ -29,51 +40,194 @@ def get_username():
 def run_sandbox_trades(bot: BotBase):
     market, _ = create_trading_env(PEEK_MODE, READ_MODE)
     portfolio = SandboxPortfolio(market, get_initial_portfolio_state())
+    start_periodic_metrics_dump()
     run_on_market(market, bot, portfolio)
 
 
 def run_sandbox_backtest(bot: BotBase, start_hours_ago=None, run_length_in_hours=None,
-                         start_timestamp=None, end_timestamp=None):
-    market, _ = create_trading_env(HISTORY_MODE, READ_MODE)
+                         start_timestamp=None, end_timestamp=None, clock_stepped=True, dataset_path=None):
+    """
+    clock_stepped: market clock jumps straight to bot consultations (same results as handling every entry)
+    dataset_path: local storage directory to backtest on (LOCAL_DATASET_PATH of the configuration by default)
+    """
+    dataset_path = dataset_path or get_dataset_path()
+    if dataset_path:
+        market, _ = create_trading_env(LOCAL_HISTORY_MODE, READ_MODE, dataset_path)
+    else:
+        market, _ = create_trading_env(HISTORY_MODE, READ_MODE)
+
+    start_timestamp, end_timestamp = _resolve_time_window(start_hours_ago, run_length_in_hours, start_timestamp,
+                                                          end_timestamp, market._connector.get_start_timestamp)
+    if start_timestamp:
+        market._connector.set_run_start(start_timestamp)
+
+    if end_timestamp:
+        market._connector.set_run_end(end_timestamp)
+
+    portfolio = SandboxPortfolio(market, get_initial_portfolio_state())
+    run_on_market(market, bot, portfolio, clock_stepped)
 
+
+def _resolve_time_window(start_hours_ago, run_length_in_hours, start_timestamp, end_timestamp, get_first_timestamp):
+    """
+    Returns (start_timestamp, end_timestamp) of a backtest, None means the beginning/end of the history.
+    get_first_timestamp: gives the beginning of the history (the run length is counted from it when no start is given)
+    """
     if start_timestamp and start_hours_ago:
         raise ValueError("Only one of start_timestamp and start_hours_ago can be specified")
 
     if end_timestamp and run_length_in_hours:
-        raise ValueError("Only one of end_timestamp and run_duration_hours can be specified")
+        raise ValueError("Only one of end_timestamp and run_length_in_hours can be specified")
 
-    if start_hours_ago != None:
+    if start_hours_ago is not None:
         start_timestamp = time.time() - start_hours_ago * 3600
 
-    if start_timestamp:
-        market._connector.set_run_start(start_timestamp)
-
     if run_length_in_hours:
-        start = market._connector.get_start_timestamp()
+        start = start_timestamp or get_first_timestamp()
         end_timestamp = start + run_length_in_hours * 3600
 
-    if end_timestamp:
-        market._connector.set_run_end(end_timestamp)
+    return start_timestamp, end_timestamp
+
+
+def run_sandbox_sweep(bot_factory, parameter_grid, start_hours_ago=None, run_length_in_hours=None,
+                      start_timestamp=None, end_timestamp=None, worker_count=None, dataset_path=None):
+    """
+    Backtests bots created by bot_factory(**parameters) for all the parameter combinations of the grid.
+    """
+    dataset_path = dataset_path or get_dataset_path()
+    if dataset_path:
+        # the local connector serves the readers as the observer does
+        observer = LocalHistoryConnector(dataset_path)
+    else:
+        _, observer = create_trading_env(HISTORY_MODE, READ_MODE)
+    readers = observer.get_readers()
+
+    start_timestamp, end_timestamp = _resolve_time_window(
+        start_hours_ago, run_length_in_hours, start_timestamp, end_timestamp,
+        lambda: min(reader.get_entry(0).timestamp for reader in readers))
+
+    sweep = ParameterSweep(bot_factory, parameter_grid, readers, observer.get_pairs(), TARGET_CURRENCY,
+                           get_initial_portfolio_state(), start_timestamp, end_timestamp, worker_count)
+
+    print(f"PARAMETER SWEEP: {len(sweep.get_configurations())} configurations")
+    start = time.time()
+    results = sweep.run()
+    print()
+    print(format_results_table(results))
+    print(f"SWEEP WALLTIME: {time.time() - start} seconds")
+
+    if dataset_path:
+        observer.close()  # the connector only served the readers
 
+    return results
+
+
+def run_feed_recording(recording_path, duration_seconds, history_bucket_count=10):
+    """
+    Records the live feed for replays. Last history_bucket_count buckets of every pair are recorded as well,
+    so bots can look to the past during the replay.
+    """
+    from bot_trading.configuration import TRADING_ENDPOINT
+
+    username = get_username()
+    validate_email(username)
+
+    print(f"RECORDING FEED OF {TRADING_ENDPOINT} TO {recording_path}")
+    recorder = FeedRecorder(recording_path)
+    observer = RemoteObserver(TRADING_ENDPOINT, username, "no_password_yet", recorder=recorder)
+    observer.connect(READ_MODE)
+
+    for reader in observer.get_readers():
+        entry_count = reader.get_entry_count()
+        end_bucket = int((entry_count + StorageWriter.bucket_entry_count - 1) / StorageWriter.bucket_entry_count)
+        observer.async_get_bucket_range(reader.pair, max(0, end_bucket - history_bucket_count), end_bucket)
+
+    try:
+        time.sleep(duration_seconds)
+    except KeyboardInterrupt:
+        print()
+        print("RECORDING IS STOPPING")
+
+    recorder.close()
+    print(f"RECORDED MESSAGES: {recorder.message_count}")
+
+
+def run_feed_replay(bot: BotBase, recording_path, speed=1.0):
+    """
+    Runs the bot on a recorded feed in the live mode and reports whether it keeps up with the feed.
+    speed: multiplier of the recorded pace (None replays as fast as possible)
+    """
+    connector = ReplayConnector(recording_path, speed)
+    market = Market(TARGET_CURRENCY, connector.get_pairs(), connector)
     portfolio = SandboxPortfolio(market, get_initial_portfolio_state())
-    run_on_market(market, bot, portfolio)
+
+    print(f"REPLAYING {connector.feed_message_count} FEED MESSAGES AT {'max' if speed is None else speed}x")
+    executor = BotExecutor(bot, market, portfolio, time_scale=speed or 1.0)
+    executor.run()
+
+    report = get_replay_report(executor, connector)
+    print()
+    print(format_replay_report(report))
+    dump_run_metrics()
+    return report
+
+
+def get_replay_report(executor: BotExecutor, connector: ReplayConnector) -> dict:
+    latencies = executor.consultation_latencies
+    report = {
+        "consultation_count": latencies.count,
+        "mean_latency": latencies.total / latencies.count if latencies.count else 0.0,
+        "p95_latency": latencies.get_percentile(95) if latencies.count else 0.0,
+        "max_latency": max(0.0, latencies.max),
+        "max_bot_slack": executor.max_bot_slack,
+        "dropped_consultation_count": executor.dropped_consultation_count,
+    }
+    report.update(connector.get_lag_statistics())
+    return report
+
+
+def format_replay_report(report: dict) -> str:
+    return "\n".join([
+        f"CONSULTATIONS: {report['consultation_count']} "
+        f"(dropped because of slack: {report['dropped_consultation_count']})",
+        f"BOT LATENCY: mean {report['mean_latency'] * 1000:.1f} ms, p95 {report['p95_latency'] * 1000:.1f} ms, "
+        f"max {report['max_latency'] * 1000:.1f} ms",
+        f"MAX BOT SLACK: {report['max_bot_slack']:.3f} s",
+        f"FEED LAG ({report['entry_count']} entries): mean {report['mean_lag'] * 1000:.1f} ms, "
+        f"p95 {report['p95_lag'] * 1000:.1f} ms, max {report['max_lag'] * 1000:.1f} ms",
+        f"REPLAY WALLTIME: {report['replay_walltime']} seconds",
+    ])
 
 
 def run_real_trades(bot: BotBase):
     market, observer = create_trading_env(PEEK_MODE, WRITE_MODE)
     portfolio = RemotePortfolio(observer)
+    start_periodic_metrics_dump()
     run_on_market(market, bot, portfolio)
 
 
-def run_on_market(market, bot, portfolio):
+def run_on_market(market, bot, portfolio, clock_stepped=False):
     executor = BotExecutor(bot, market, portfolio)
     start = time.time()
-    executor.run()
+    try:
+        if clock_stepped:
+            executor.run_clock_stepped()
+        else:
+            executor.run()
+    finally:
+        market._connector.close()
     end = time.time()
     print()
     portfolio = PortfolioController(market, portfolio.get_state_copy())
     print(f"FINAL PORTFOLIO: {portfolio}")
     print(f"EXECUTION WALLTIME: {end - start} seconds")
+    dump_run_metrics()
+
+
+def dump_run_metrics():
+    if is_metrics_enabled():
+        dump_metrics(METRICS_PATH)
+        print(f"METRICS: {os.path.abspath(METRICS_PATH)}")
 
 
 def get_initial_portfolio_state():
@@ -89,18 +243,32 @@ def get_initial_portfolio_state():
     }
 
 
-def create_trading_env(connector_mode, access_mode):
+def create_trading_env(connector_mode, access_mode, dataset_path=None):
+    """
+    dataset_path: storage directory read by LOCAL_HISTORY_MODE (no observer is created for the mode)
+    """
     from bot_trading.configuration import TRADING_ENDPOINT
 
-    username = get_username()
-    validate_email(username)
-
-    if connector_mode not in [HISTORY_MODE, PEEK_MODE]:
+    if connector_mode not in [HISTORY_MODE, LOCAL_HISTORY_MODE, PEEK_MODE]:
         raise ValueError(f"Invalid connector mode {connector_mode}")
 
     if access_mode not in [READ_MODE, WRITE_MODE]:
         raise ValueError(f"Invalid access mode {access_mode}")
 
+    if connector_mode == LOCAL_HISTORY_MODE:
+        if access_mode != READ_MODE:
+            raise ValueError("Local history can be used in read mode only")
+
+        if not dataset_path:
+            raise ValueError("Local history mode needs dataset_path")
+
+        print(f"READING LOCAL HISTORY FROM {dataset_path}")
+        connector = LocalHistoryConnector(dataset_path, prefetch_thread_count=FULLPASS_PREFETCH_THREAD_COUNT)
+        return Market(TARGET_CURRENCY, connector.get_pairs(), connector), None
+
+    username = get_username()
+    validate_email(username)
+
     print(f"CONNECTING TO {TRADING_ENDPOINT}")
     observer = RemoteObserver(TRADING_ENDPOINT, username, "no_password_yet")
     observer.connect(access_mode)
@@ -111,7 +279,7 @@ def create_trading_env(connector_mode, access_mode):
     if connector_mode == PEEK_MODE:
         connector = PeekConnector(readers)
     elif connector_mode == HISTORY_MODE:
-        connector = FullpassConnector(readers)
+        connector = FullpassConnector(readers, prefetch_thread_count=FULLPASS_PREFETCH_THREAD_COUNT)
     else:
         raise ValueError(f"Unknown connector mode {connector_mode}. Can be peek or full")
 
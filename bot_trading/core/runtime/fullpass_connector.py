@@ -1,29 +1,45 @@
+import heapq
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from bot_trading.core.data.entry_reader_base import EntryReaderBase
 from bot_trading.core.data.parsing import parse_pair
+from bot_trading.core.data.storage_writer import StorageWriter
 from bot_trading.core.data.trade_entry import TradeEntry
+from bot_trading.core.metrics import measure
 from bot_trading.core.runtime.connector_base import ConnectorBase
 
 
 class FullpassConnector(ConnectorBase):
-    def __init__(self, entry_readers: List[EntryReaderBase]):
+    def __init__(self, entry_readers: List[EntryReaderBase], prefetch_thread_count: int = 0):
         super().__init__(entry_readers)
 
         self._reader_peeks = defaultdict(int)
         self._reader_limits = {}
+        self._reader_buffers = {}  # reader -> (first entry index, batch read ahead)
+        self._reader_heads = {}  # reader -> (entry index, materialized entry)
         for reader in entry_readers:
             self._reader_limits[reader] = reader.get_entry_count()
 
+        # (timestamp, reader position, entry) of the next entry of every reader that is not exhausted
+        # the reader position breaks timestamp ties in order of the readers
+        self._merge_heap = None
+
+        # next buckets can be read by background threads while the current ones are merged
+        self._prefetch_pool = ThreadPoolExecutor(prefetch_thread_count) if prefetch_thread_count > 0 else None
+        self._reader_prefetches = {}  # reader -> (first entry index, future of the batch)
+
     def set_run_start(self, timestamp):
         for reader in self._readers:
             self._reader_peeks[reader] = reader.find_pricebook_start(timestamp)
 
+        self._merge_heap = None
+
     def get_start_timestamp(self):
         timestamp = float("inf")
         for reader in self._readers:
-            timestamp = min(timestamp, reader.get_entry(self._reader_peeks[reader]).timestamp)
+            timestamp = min(timestamp, self._get_peek_entry(reader).timestamp)
 
         return timestamp
 
@@ -32,23 +48,90 @@ class FullpassConnector(ConnectorBase):
             pricebook = self.get_pricebook(*parse_pair(reader.pair), end_timestamp)
             self._reader_limits[reader] = pricebook._current_index
 
-    def blocking_get_next_entry(self) -> TradeEntry:
-        best_reader = None
-        best_timestamp = None
-        for reader in self._readers:
-            if self._reader_peeks[reader] >= self._reader_limits[reader]:
-                continue
-
-            entry = reader.get_entry(self._reader_peeks[reader])
+        self._merge_heap = None
 
-            if best_timestamp is None or best_timestamp > entry.timestamp:
-                best_timestamp = entry.timestamp
-                best_reader = reader
+    def blocking_get_next_entry(self) -> TradeEntry:
+        if self._merge_heap is None:
+            self._merge_heap = []
+            for position, reader in enumerate(self._readers):
+                self._push_next_entry(position, reader)
 
-        if best_reader is None:
+        if not self._merge_heap:
+            self.close()  # prefetch threads are not needed anymore
             raise StopIteration()
 
-        entry = best_reader.get_entry(self._reader_peeks[best_reader])
+        _, position, best_entry = self._merge_heap[0]
+        best_reader = self._readers[position]
+
+        self._last_entry_index = self._reader_peeks[best_reader]
         self._reader_peeks[best_reader] += 1
 
+        entry = self._get_merge_entry(best_reader)
+        if entry is None:
+            heapq.heappop(self._merge_heap)  # the reader is exhausted
+        else:
+            heapq.heapreplace(self._merge_heap, (entry.timestamp, position, entry))
+
+        return best_entry
+
+    def close(self):
+        if self._prefetch_pool is None:
+            return
+
+        for _, future in self._reader_prefetches.values():
+            future.cancel()
+
+        self._reader_prefetches = {}
+        self._prefetch_pool.shutdown(wait=False)
+        self._prefetch_pool = None
+
+    def _push_next_entry(self, position: int, reader: EntryReaderBase):
+        entry = self._get_merge_entry(reader)
+        if entry is not None:
+            heapq.heappush(self._merge_heap, (entry.timestamp, position, entry))
+
+    def _get_merge_entry(self, reader: EntryReaderBase):
+        if self._reader_peeks[reader] >= self._reader_limits[reader]:
+            return None
+
+        return self._get_peek_entry(reader)
+
+    def _is_live_pricebook_complete(self, reader: EntryReaderBase) -> bool:
+        # entries with the current timestamp may still wait for their turn
+        entry = self._get_peek_entry(reader)
+        return entry is None or entry.timestamp > self._current_time
+
+    def _get_peek_entry(self, reader: EntryReaderBase):
+        entry_index = self._reader_peeks[reader]
+        head_index, head_entry = self._reader_heads.get(reader, (None, None))
+        if head_index == entry_index:
+            return head_entry
+
+        buffer_start, buffer = self._reader_buffers.get(reader, (0, None))
+
+        if buffer is None or not buffer_start <= entry_index < buffer_start + len(buffer):
+            # read ahead until the end of the bucket
+            bucket_end = (int(entry_index / StorageWriter.bucket_entry_count) + 1) * StorageWriter.bucket_entry_count
+            buffer_start, buffer = entry_index, self._read_bucket(reader, entry_index, bucket_end)
+            self._reader_buffers[reader] = buffer_start, buffer
+
+            if not len(buffer):
+                return None
+
+            if self._prefetch_pool is not None and bucket_end < self._reader_limits[reader]:
+                next_bucket_end = bucket_end + StorageWriter.bucket_entry_count
+                future = self._prefetch_pool.submit(reader.get_entries, bucket_end, next_bucket_end)
+                self._reader_prefetches[reader] = bucket_end, future
+
+        entry = buffer.get_entry(entry_index - buffer_start)
+        self._reader_heads[reader] = entry_index, entry
         return entry
+
+    def _read_bucket(self, reader: EntryReaderBase, start_index: int, end_index: int):
+        prefetch_start, future = self._reader_prefetches.pop(reader, (None, None))
+        # waits of the merge for entries of the readers
+        with measure("fullpass_connector.read_bucket"):
+            if prefetch_start == start_index:
+                return future.result()
+
+            return reader.get_entries(start_index, end_index)
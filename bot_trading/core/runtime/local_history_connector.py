@@ -0,0 +1,40 @@
+import os
+from typing import List, Optional
+
+from bot_trading.core.configuration import TRACKED_PAIRS
+from bot_trading.core.data.dataset_manifest import DatasetManifest
+from bot_trading.core.data.storage_reader import StorageReader
+from bot_trading.core.data.storage_writer import StorageWriter
+from bot_trading.core.runtime.fullpass_connector import FullpassConnector
+
+
+class LocalHistoryConnector(FullpassConnector):
+    """
+    Replays storage files of a local directory (scraper storage or an exported dataset) without any network.
+    """
+
+    def __init__(self, root_path: str, pairs: Optional[List[str]] = None, prefetch_thread_count: int = 0):
+        if not os.path.isdir(root_path):
+            raise ValueError(f"Storage directory {root_path} does not exist")
+
+        self._pairs = list(pairs or self.get_available_pairs(root_path))
+        if not self._pairs:
+            raise ValueError(f"No pair storage found in {root_path}")
+
+        super().__init__([StorageReader(pair, root_path) for pair in self._pairs], prefetch_thread_count)
+
+    @classmethod
+    def get_available_pairs(cls, root_path: str) -> List[str]:
+        manifest = DatasetManifest.load(root_path)
+        if manifest is not None:
+            return list(manifest["pairs"])
+
+        # plain scraper storage
+        storage = StorageWriter.at_root(root_path)
+        return [pair for pair in TRACKED_PAIRS if storage.storage_file_exists(pair, 0)]
+
+    def get_pairs(self) -> List[str]:
+        return self._pairs
+
+    def get_readers(self) -> List[StorageReader]:
+        return self._readers
@@ -1,6 +1,6 @@
 import time
 from threading import Thread
-from typing import List
+from typing import List, Dict, Tuple
 
 from bot_trading.core.data.parsing import parse_pair, make_pair
 from bot_trading.core.runtime.connector_base import ConnectorBase
@@ -16,19 +16,35 @@ class Market(object):
         self._currency_pairs = set()
         self._connector = connector
 
+        # (processed entry count, current time, snapshot) - present is shared until the connector moves
+        self._present = None
+
         for pair in currency_pairs:
             self._currency_pairs.add(pair)
             self._currencies.update(parse_pair(pair))
 
+        # currency lists are shared by all the callers (tuples, so they can't be modified)
+        self._currency_list = tuple(self._currencies)
+        self._non_target_currency_list = tuple(c for c in self._currency_list if c != self._target_currency)
+        self._currency_indexes = {currency: index for index, currency in enumerate(self._currency_list)}
+
+        # (source currency, target currency) -> transfer path
+        self._transfer_paths = self._compile_transfer_paths()
+
     @property
-    def currencies(self):
-        return list(self._currencies)
+    def currencies(self) -> Tuple[str, ...]:
+        return self._currency_list
 
     @property
-    def non_target_currencies(self):
-        result = self.currencies
-        result.remove(self.target_currency)
-        return result
+    def non_target_currencies(self) -> Tuple[str, ...]:
+        return self._non_target_currency_list
+
+    @property
+    def currency_indexes(self) -> Dict[str, int]:
+        """
+        Positions of the currencies in currencies list (rows/columns of the snapshot rate matrices).
+        """
+        return self._currency_indexes
 
     @property
     def direct_currency_pairs(self):
@@ -43,9 +59,16 @@ class Market(object):
         return self._connector.current_time
 
     @property
-    def present(self):
-        # todo this should be optimized
-        return self.get_history(0)
+    def present(self) -> PriceSnapshot:
+        # pricebooks of the present are served from the live books of the connector
+        processed_entry_count = self._connector.processed_entry_count
+        current_time = self.current_time
+
+        present = self._present
+        if present is None or present[0] != processed_entry_count or present[1] != current_time:
+            present = self._present = (processed_entry_count, current_time, self.get_history(0))
+
+        return present[2]
 
     def has_currency(self, currency):
         return currency in self._currencies
@@ -65,25 +88,47 @@ class Market(object):
             if not self.has_currency(currency):
                 raise ValueError(f"Currency {currency} is not a tradable currency.")
 
-    def get_transfer_path(self, source_currency, target_currency) -> List[str]:
+    def get_transfer_path(self, source_currency, target_currency) -> Tuple[str, ...]:
         """
         Gets path of all currencies that has to be traded to issue transfer between source and target currencies
         NOTE: Not all currency pairs can be traded directly.
         """
-        self.validate_currencies(source_currency, target_currency)
-        if source_currency == target_currency:
-            return [source_currency]
-
-        pair = make_pair(source_currency, target_currency)
-        pair_reversed = make_pair(target_currency, source_currency)
+        path = self._transfer_paths.get((source_currency, target_currency))
+        if path is None:
+            self.validate_currencies(source_currency, target_currency)
+
+        return path
+
+    def _compile_transfer_paths(self) -> Dict[Tuple[str, str], Tuple[str, ...]]:
+        def is_direct(currency1, currency2):
+            return make_pair(currency1, currency2) in self._currency_pairs or \
+                   make_pair(currency2, currency1) in self._currency_pairs
+
+        result = {}
+        for source_currency in self._currency_list:
+            for target_currency in self._currency_list:
+                if source_currency == target_currency:
+                    path = (source_currency,)
+                elif is_direct(source_currency, target_currency):
+                    path = (source_currency, target_currency)
+                else:
+                    # one hop through the target currency (books against the target currency are the deepest)
+                    path = (source_currency, self.target_currency, target_currency)
+                    if not is_direct(source_currency, self.target_currency) or \
+                            not is_direct(self.target_currency, target_currency):
+                        # target currency can't be used - try any other intermediate currency
+                        for intermediate_currency in self._currency_list:
+                            if is_direct(source_currency, intermediate_currency) and \
+                                    is_direct(intermediate_currency, target_currency):
+                                path = (source_currency, intermediate_currency, target_currency)
+                                break
+
+                result[(source_currency, target_currency)] = path
 
-        if pair in self.direct_currency_pairs or pair_reversed in self.direct_currency_pairs:
-            return [source_currency, target_currency]
-
-        return [source_currency, self.target_currency, target_currency]
+        return result
 
     def get_value(self, amount, currency):
-        return self.get_history(0).get_value(Fund(amount, currency))
+        return self.present.get_value(Fund(amount, currency))
 
     def subscribe(self, subscriber):
         self._connector.subscribe(subscriber)
@@ -91,6 +136,9 @@ class Market(object):
     def run(self):
         self._connector.run()
 
+    def run_until(self, timestamp: float) -> bool:
+        return self._connector.run_until(timestamp)
+
     def run_async(self):
         Thread(target=self.run, daemon=True).start()
         print("Market synchronization")
@@ -0,0 +1,153 @@
+import itertools
+import os
+import time
+from multiprocessing import Pool
+from typing import Callable, Dict, List, Any, Optional
+
+from bot_trading.core.data.entry_reader_base import EntryReaderBase
+from bot_trading.core.data.memory_entry_reader import MemoryEntryReader
+from bot_trading.core.runtime.fullpass_connector import FullpassConnector
+from bot_trading.core.runtime.market import Market
+from bot_trading.core.runtime.sandbox_portfolio import SandboxPortfolio
+from bot_trading.trading.bot_executor import BotExecutor
+from bot_trading.trading.portfolio_controller import PortfolioController
+
+
+class ParameterSweep(object):
+    """
+    Backtests a bot for every configuration of a parameter grid.
+    Market data of the backtest range are loaded once and shared by worker processes.
+    """
+
+    # how much data around the range is loaded for bots looking to the past/future
+    margin_seconds = 600.0
+
+    def __init__(self, bot_factory: Callable, parameter_grid: Dict[str, List[Any]], readers: List[EntryReaderBase],
+                 market_pairs: List[str], target_currency: str, initial_portfolio_state: Dict,
+                 start_timestamp: Optional[float] = None, end_timestamp: Optional[float] = None,
+                 worker_count: int = None):
+        self._bot_factory = bot_factory
+        self._parameter_grid = parameter_grid
+        self._readers = readers
+        self._market_pairs = list(market_pairs)
+        self._target_currency = target_currency
+        self._initial_portfolio_state = initial_portfolio_state
+        self._start_timestamp = start_timestamp
+        self._end_timestamp = end_timestamp
+        self._worker_count = worker_count or os.cpu_count()
+
+    def get_configurations(self) -> List[Dict[str, Any]]:
+        names = list(self._parameter_grid.keys())
+        return [dict(zip(names, values)) for values in itertools.product(*self._parameter_grid.values())]
+
+    def run(self) -> List[dict]:
+        """
+        Returns result rows sorted from the best final value.
+        """
+        configurations = self.get_configurations()
+
+        start = time.time()
+        load_start = None if self._start_timestamp is None else self._start_timestamp - self.margin_seconds
+        load_end = None if self._end_timestamp is None else self._end_timestamp + self.margin_seconds
+        memory_readers = [MemoryEntryReader.load(reader, load_start, load_end) for reader in self._readers]
+        print(f"\t loaded {sum(r.get_entry_count() - r.first_entry_index for r in memory_readers)} entries "
+              f"in {time.time() - start:.1f}s")
+
+        environment = {
+            "chunks": [(r.pair, r.first_entry_index, bytes(r.chunk)) for r in memory_readers],
+            "market_pairs": self._market_pairs,
+            "target_currency": self._target_currency,
+            "initial_portfolio_state": self._initial_portfolio_state,
+            "start_timestamp": self._start_timestamp,
+            "end_timestamp": self._end_timestamp,
+            "bot_factory": self._bot_factory,
+        }
+
+        results = []
+        worker_count = min(self._worker_count, len(configurations))
+        with Pool(worker_count, initializer=_initialize_sweep_worker, initargs=(environment,)) as pool:
+            for result in pool.imap_unordered(_run_sweep_task, configurations):
+                print(f"\t {format_parameters(result['parameters'])}: {format_final_value(result)} "
+                      f"({result['walltime']:.1f}s) {result['error'] or ''}")
+                results.append(result)
+
+        # failed configurations go last
+        results.sort(key=lambda r: float("-inf") if r["final_value"] is None else r["final_value"], reverse=True)
+        return results
+
+    @classmethod
+    def run_configuration(cls, environment: dict, readers: List[EntryReaderBase], parameters: Dict[str, Any]) -> dict:
+        start = time.time()
+        connector = FullpassConnector(readers)
+        if environment["start_timestamp"] is not None:
+            connector.set_run_start(environment["start_timestamp"])
+
+        if environment["end_timestamp"] is not None:
+            connector.set_run_end(environment["end_timestamp"])
+
+        market = Market(environment["target_currency"], environment["market_pairs"], connector)
+        portfolio = SandboxPortfolio(market, environment["initial_portfolio_state"])
+
+        error = None
+        try:
+            bot = environment["bot_factory"](**parameters)
+            executor = BotExecutor(bot, market, portfolio)
+            executor.run_clock_stepped()
+
+            final_value = PortfolioController(market, portfolio.get_state_copy()).total_value.amount
+        except Exception as e:
+            # a failing configuration must not stop the whole sweep
+            final_value = None
+            error = repr(e)
+        finally:
+            connector.close()
+
+        return {
+            "parameters": parameters,
+            "final_value": final_value,
+            "executed_commands": portfolio.executed_command_count,
+            "declined_commands": portfolio.declined_command_count,
+            "walltime": time.time() - start,
+            "error": error,
+        }
+
+
+def format_parameters(parameters: Dict[str, Any]) -> str:
+    return ", ".join(f"{name}={value}" for name, value in parameters.items())
+
+
+def format_final_value(result: dict) -> str:
+    if result["final_value"] is None:
+        return "failed"
+
+    return f"{result['final_value']:.4f}"
+
+
+def format_results_table(results: List[dict]) -> str:
+    header = ["final_value", "executed", "declined", "walltime", "parameters", "error"]
+    rows = [[format_final_value(r), str(r["executed_commands"]), str(r["declined_commands"]),
+             f"{r['walltime']:.1f}s", format_parameters(r["parameters"]), r["error"] or ""] for r in results]
+
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    lines = []
+    for row in [header] + rows:
+        lines.append("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+
+    return "\n".join(lines)
+
+
+# environment of the sweep worker process (market data are decoded once per worker)
+_worker_environment = None
+_worker_readers = None
+
+
+def _initialize_sweep_worker(environment):
+    global _worker_environment, _worker_readers
+
+    _worker_environment = environment
+    _worker_readers = [MemoryEntryReader(pair, first_entry_index, chunk)
+                       for pair, first_entry_index, chunk in environment["chunks"]]
+
+
+def _run_sweep_task(parameters):
+    return ParameterSweep.run_configuration(_worker_environment, _worker_readers, parameters)
@@ -26,4 +26,5 @@ class PeekConnector(ConnectorBase):
         if entry is None:
             raise StopIteration()
 
+        self._last_entry_index = entry_index
         return entry
@@ -1,23 +1,44 @@
-from typing import Optional
+from threading import Lock
 
 from bot_trading.core.data.pricebook_processor_state import PricebookProcessorState
+from bot_trading.core.data.storage_writer import StorageWriter
 from bot_trading.core.messages import log_cache
+from bot_trading.core.metrics import count, record, measure, is_metrics_enabled
+from bot_trading.core.runtime.checkpoint_store import CheckpointStore
 from bot_trading.trading.pricebook_view import PricebookView
 
 
 class PricebookViewProvider(object):
-    # how many view states will be kept for this provider in cache
-    cached_pricebook_view_state_count_limit = 20
+    # how many bytes can be used by the cached states of a single provider
+    checkpoint_memory_budget = 8 * 1024 * 1024
 
-    # how long fast forwarding update for a cache entry can be issued
+    # new checkpoint is stored when a view had to replay at least this many entries
+    checkpoint_entry_distance = 100
+
+    # how many entries can be replayed from a checkpoint before starting from a bucket is preferred
+    max_replay_entry_count = 2 * StorageWriter.bucket_entry_count
+
+    # forwarding limit used until the entry rate of the pair is known
     fast_forward_cache_seconds_limit = 200.0
 
     def __init__(self, reader):
         self._reader = reader
 
-        self._state_cache = []
+        self._checkpoints = CheckpointStore(self.checkpoint_memory_budget)
+
+        # replay statistics used for estimating cost of forwarding
+        self._L_statistics = Lock()
+        self._replayed_entry_count = 0
+        self._replayed_seconds = 0.0
 
     def get_pricebook_view(self, timestamp: float):
+        if not is_metrics_enabled():
+            return self._get_pricebook_view(timestamp)  # the hot path skips creation of the timer
+
+        with measure("pricebook_provider.get_view"):
+            return self._get_pricebook_view(timestamp)
+
+    def _get_pricebook_view(self, timestamp: float):
         reader = self._reader
 
         cached_state = self._get_fastforwardable_cache_entry(timestamp)
@@ -32,40 +53,45 @@ class PricebookViewProvider(object):
 
         view = PricebookView(cached_state, reader)
         was_full_sync = view.fast_forward_to(timestamp)
-        if is_cache_miss:
-            new_state = view._dump_state()
-            new_state.current_time = timestamp
-            self._put_to_cache(new_state)
 
-        if view._current_time - cached_state.current_time > self.fast_forward_cache_seconds_limit / self.cached_pricebook_view_state_count_limit:
+        replayed_entry_count = view._current_index - cached_state.current_index
+        count("pricebook_provider.misses" if is_cache_miss else "pricebook_provider.hits")
+        record("pricebook_provider.replayed_entries", replayed_entry_count)
+        if not is_cache_miss:
+            self._add_replay_statistics(replayed_entry_count, timestamp - cached_state.current_time)
+
+        if is_cache_miss or replayed_entry_count >= self.checkpoint_entry_distance:
+            # replaying was expensive - next requests around the timestamp can start here
             new_state = view._dump_state()
-            self._put_to_cache(new_state)
+            if was_full_sync:
+                new_state.current_time = timestamp  # nothing changes until the timestamp
 
-        return view
+            if new_state.current_time > 0:
+                self._checkpoints.put(new_state)
 
-    def _get_fastforwardable_cache_entry(self, timestamp) -> Optional[PricebookProcessorState]:
+        return view
 
-        best_state = None
-        best_forward_time = float("inf")
-        for state in self._state_cache:
-            forward_time = timestamp - state.current_time
+    def _get_fastforwardable_cache_entry(self, timestamp):
+        state = self._checkpoints.find(timestamp)
+        if state is None:
+            return None
 
-            if forward_time < 0:
-                # we can only go forward
-                continue
+        forward_time = timestamp - state.current_time
+        with self._L_statistics:
+            if self._replayed_seconds <= 0.0:
+                return state if forward_time <= self.fast_forward_cache_seconds_limit else None
 
-            if forward_time > PricebookViewProvider.fast_forward_cache_seconds_limit:
-                # forwarding would be too far
-                continue
+            entry_rate = self._replayed_entry_count / self._replayed_seconds
 
-            if best_forward_time > forward_time:
-                best_state = state
-                best_forward_time = forward_time
+        if forward_time * entry_rate > self.max_replay_entry_count:
+            return None  # starting from a bucket would be cheaper
 
-        return best_state
+        return state
 
-    def _put_to_cache(self, state: PricebookProcessorState):
-        while len(self._state_cache) + 1 >= PricebookViewProvider.cached_pricebook_view_state_count_limit:
-            del self._state_cache[-1]
+    def _add_replay_statistics(self, entry_count: int, seconds: float):
+        if seconds <= 0.0:
+            return
 
-        self._state_cache.insert(0, state)
+        with self._L_statistics:
+            self._replayed_entry_count += entry_count
+            self._replayed_seconds += seconds
@@ -0,0 +1,154 @@
+import base64
+import time
+from array import array
+from threading import Thread
+from typing import List, Optional, Dict, Tuple
+
+import numpy as np
+
+from bot_trading.core.data.bucket_codec import BucketCodec
+from bot_trading.core.data.storage_writer import StorageWriter
+from bot_trading.core.data.trade_entry import TradeEntry
+from bot_trading.core.data.trade_entry_batch import TradeEntryBatch
+from bot_trading.core.networking.feed_recorder import FeedRecorder
+from bot_trading.core.networking.remote_entry_reader import RemoteEntryReader
+from bot_trading.core.runtime.peek_connector import PeekConnector
+
+
+class ReplayConnector(PeekConnector):
+    """
+    Replays a feed recorded by FeedRecorder through the live (peek) path.
+    Feed messages come in their recorded pace multiplied by speed (as fast as possible when speed is None).
+    Readers request buckets from the recording instead of the server.
+    """
+
+    def __init__(self, recording_path: str, speed: Optional[float] = 1.0):
+        if speed is not None and speed <= 0:
+            raise ValueError(f"Replay speed has to be positive, got {speed}")
+
+        self._speed = speed
+        self._bucket_messages: Dict[Tuple[str, int], dict] = {}
+        self._feed_messages: List[Tuple[float, dict]] = []
+        self._recorded_entry_counts: Dict[str, int] = {}
+
+        pairs_info = None
+        for arrival_time, message in FeedRecorder.read(recording_path):
+            if "pairs_info" in message:
+                pairs_info = message["pairs_info"]
+            elif "f" in message:
+                self._feed_messages.append((arrival_time, message))
+            elif "bucket_range" in message:
+                for offset, bucket_message in enumerate(message["bucket_range"]):
+                    self._bucket_messages[(message["pair"], message["start_bucket"] + offset)] = bucket_message
+            elif "bucket_index" in message:
+                self._bucket_messages[(message["pair"], message["bucket_index"])] = message
+
+        if pairs_info is None:
+            raise ValueError(f"Recording {recording_path} does not contain the welcome message")
+
+        self._pair_readers_by_name: Dict[str, RemoteEntryReader] = {}
+        for pair, info in pairs_info.items():
+            self._recorded_entry_counts[pair] = info["entry_count"]
+            self._pair_readers_by_name[pair] = RemoteEntryReader(pair, info["entry_count"], self)
+
+        super().__init__(list(self._pair_readers_by_name.values()))
+
+        # how long entries were waiting in the queue (in seconds)
+        self._entry_lags = array("d")
+        self._replay_walltime = None
+
+    def get_pairs(self) -> List[str]:
+        return list(self._pair_readers_by_name.keys())
+
+    @property
+    def feed_message_count(self) -> int:
+        return len(self._feed_messages)
+
+    def get_lag_statistics(self) -> dict:
+        lags = np.frombuffer(self._entry_lags, dtype=np.float64) if len(self._entry_lags) else np.zeros(1)
+        return {
+            "entry_count": len(self._entry_lags),
+            "mean_lag": float(lags.mean()),
+            "p95_lag": float(np.percentile(lags, 95)),
+            "max_lag": float(lags.max()),
+            "replay_walltime": self._replay_walltime,
+        }
+
+    def run(self):
+        Thread(target=self._replay, daemon=True).start()
+        super().run()
+
+    def async_get_bucket(self, pair, bucket_index):
+        message = self._bucket_messages.get((pair, bucket_index))
+        if message is None and bucket_index * StorageWriter.bucket_entry_count >= self._recorded_entry_counts[pair]:
+            return  # entries of the bucket come with the feed (e.g. for a read ahead)
+
+        if message is None:
+            raise AssertionError(f"Bucket {pair} {bucket_index} is not in the recording")
+
+        if "compressed_bucket" in message:
+            payload = BucketCodec.decode(base64.b64decode(message["compressed_bucket"]))
+        else:
+            payload = base64.b64decode(message["bucket"])
+
+        self._pair_readers_by_name[pair]._receive_bucket(bucket_index, TradeEntryBatch(pair, payload))
+
+    def async_get_bucket_range(self, pair, start_bucket: int, end_bucket: int):
+        for bucket_index in range(start_bucket, end_bucket):
+            self.async_get_bucket(pair, bucket_index)
+
+    def find_pricebook_start(self, pair, start_time: float):
+        # only recorded buckets with entries replayed so far can be read
+        reader = self._pair_readers_by_name[pair]
+        bucket_count = int((reader.get_entry_count() + StorageWriter.bucket_entry_count - 1) /
+                           StorageWriter.bucket_entry_count)
+        recorded_buckets = sorted(bucket_index for bucket_pair, bucket_index in self._bucket_messages
+                                  if bucket_pair == pair and bucket_index < bucket_count)
+        if not recorded_buckets:
+            raise AssertionError(f"No bucket of {pair} is in the recording")
+
+        result = recorded_buckets[0]
+        for bucket_index in recorded_buckets:
+            if reader.get_entry(bucket_index * StorageWriter.bucket_entry_count).timestamp > start_time:
+                break
+            result = bucket_index
+
+        return result * StorageWriter.bucket_entry_count
+
+    def get_bucket_summaries(self, pair, start_bucket: int, end_bucket: int):
+        raise AssertionError("Bucket summaries are not available in recordings")
+
+    def _on_new_entries(self, first_entry_index: int, entries: List[TradeEntry]):
+        arrival_time = time.time()
+        current_entry_index = first_entry_index
+        for entry in entries:
+            self._entry_queue.put((current_entry_index, entry, arrival_time))
+            current_entry_index += 1
+
+    def blocking_get_next_entry(self):
+        entry_index, entry, arrival_time = self._entry_queue.get(block=True)
+        if entry is None:
+            raise StopIteration()
+
+        self._entry_lags.append(time.time() - arrival_time)
+        self._last_entry_index = entry_index
+        return entry
+
+    def _replay(self):
+        start = time.time()
+        first_arrival_time = self._feed_messages[0][0] if self._feed_messages else 0.0
+        for arrival_time, message in self._feed_messages:
+            if self._speed is not None:
+                delay = start + (arrival_time - first_arrival_time) / self._speed - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+
+            reader = self._pair_readers_by_name[message["f"]]
+            entries = TradeEntry.from_chunk(reader.pair, base64.b64decode(message["c"]))
+            reader._receive_peek_entries(message["i"], entries)
+
+        self._replay_walltime = time.time() - start
+
+        # the end of the recording stops the connector
+        for reader in self._pair_readers_by_name.values():
+            reader.close()
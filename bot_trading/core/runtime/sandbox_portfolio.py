@@ -12,12 +12,17 @@ class SandboxPortfolio(PortfolioBase):
         self._market = market
         self._current_state = deepcopy(portfolio_state)
 
+        self.executed_command_count = 0
+        self.declined_command_count = 0
+
     def execute(self, command: TransferCommand):
         try:
             command.apply(self._current_state, self._market)
+            self.executed_command_count += 1
             return True
         except PortfolioUpdateException:
             log_command(f"\t declined: {command}")
+            self.declined_command_count += 1
             return False
 
     def get_state_copy(self):
@@ -20,9 +20,10 @@ class HistoryCache(object):
 
     def _refresh_cache(self):
         end_index = self._storage.get_entry_count()
+        entries = self._storage.get_entries(self._current_index, end_index)
+        end_index = self._current_index + len(entries)
 
-        for i in range(self._current_index, end_index):
-            entry = self._storage.get_entry(i)
+        for entry in entries:
             self._processor.accept(entry)
 
             if not self._processor.is_ready:
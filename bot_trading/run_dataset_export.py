@@ -0,0 +1,48 @@
+import sys
+import time
+
+from bot_trading.configuration import TRADING_ENDPOINT
+from bot_trading.core.command_line import get_arguments, get_option
+from bot_trading.core.configuration import MAX_READ_CONNECTIONS
+from bot_trading.core.networking.dataset_exporter import DatasetExporter
+from bot_trading.core.runtime.execution import get_username
+
+"""
+Downloads history of the server into a local dataset, backtests on the dataset don't need any network.
+Usage: python -m bot_trading.run_dataset_export OUTPUT_DIR [--connections N] [--start-hours-ago H]
+                                               [--length-hours H] [PAIR ...]
+       All the server pairs are exported when no pair is given.
+Backtest on the dataset: DATASET=OUTPUT_DIR python -m bot_trading.run_bot_backtest
+"""
+
+
+if __name__ == "__main__":
+    option_names = ["--connections", "--start-hours-ago", "--length-hours"]
+    arguments = get_arguments(option_names)
+    if not arguments:
+        print("Output directory has to be specified")
+        sys.exit(1)
+
+    connection_count, start_hours_ago, length_hours = [get_option(name, None) for name in option_names]
+
+    start_timestamp = end_timestamp = None
+    if start_hours_ago is not None:
+        start_timestamp = time.time() - float(start_hours_ago) * 3600
+
+    if length_hours is not None:
+        if start_timestamp is None:
+            print("--length-hours needs --start-hours-ago")
+            sys.exit(1)
+
+        end_timestamp = start_timestamp + float(length_hours) * 3600
+
+    exporter = DatasetExporter(
+        TRADING_ENDPOINT, get_username(), arguments[0], pairs=arguments[1:] or None,
+        start_timestamp=start_timestamp, end_timestamp=end_timestamp,
+        connection_count=int(connection_count or MAX_READ_CONNECTIONS)
+    )
+
+    print(f"EXPORTING FROM {TRADING_ENDPOINT} TO {arguments[0]}")
+    start = time.time()
+    exporter.run()
+    print(f"EXPORT WALLTIME: {time.time() - start} seconds")
@@ -0,0 +1,20 @@
+import sys
+
+from bot_trading.core.command_line import get_option
+from bot_trading.core.runtime.execution import run_feed_recording
+
+"""
+Records the live feed of the server for replays (see bot_trading.run_feed_replay).
+Usage: python -m bot_trading.run_feed_recorder RECORDING_PATH [--minutes M] [--history-buckets N]
+"""
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1].startswith("--"):
+        print("Recording path has to be specified")
+        sys.exit(1)
+
+    minutes = float(get_option("--minutes", 10))
+    history_bucket_count = int(get_option("--history-buckets", 10))
+
+    run_feed_recording(sys.argv[1], minutes * 60, history_bucket_count)
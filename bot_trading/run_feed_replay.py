@@ -0,0 +1,33 @@
+import json
+import sys
+
+from bot_trading.bots.bot_factories import BOT_FACTORIES
+from bot_trading.core.command_line import get_option, parse_value
+from bot_trading.core.runtime.execution import run_feed_replay
+
+"""
+Replays a recorded feed to the bot in the live mode and reports bot latency, slack and dropped consultations.
+Usage: python -m bot_trading.run_feed_replay RECORDING_PATH BOT [--speed 1|10|max] [--report PATH] [NAME=VALUE ...]
+       BOT is one of: complex_baseline, linear_predictor
+"""
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[2] not in BOT_FACTORIES:
+        print(f"Usage: RECORDING_PATH BOT, where bot has to be one of: {', '.join(BOT_FACTORIES)}")
+        sys.exit(1)
+
+    speed = get_option("--speed", "1")
+    report_path = get_option("--report", None)
+
+    parameters = {}
+    for argument in sys.argv[3:]:
+        if "=" in argument:
+            name, value = argument.split("=", 1)
+            parameters[name] = parse_value(value)
+
+    bot = BOT_FACTORIES[sys.argv[2]](**parameters)
+    report = run_feed_replay(bot, sys.argv[1], None if speed == "max" else float(speed))
+
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,44 @@
+import json
+import sys
+
+from bot_trading.bots.bot_factories import BOT_FACTORIES
+from bot_trading.core.command_line import get_option, parse_value
+from bot_trading.core.runtime.execution import run_sandbox_sweep
+
+"""
+Backtests a bot for all combinations of the given parameter values.
+Usage: python -m bot_trading.run_parameter_sweep BOT [--workers N] [--start-hours-ago H] [--length-hours H]
+                                                 [--results PATH] NAME=VALUE1,VALUE2,... [NAME=...]
+       BOT is one of: complex_baseline, linear_predictor
+Example: python -m bot_trading.run_parameter_sweep complex_baseline trade_chunk=25,50 delta_history_seconds=30,60
+"""
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in BOT_FACTORIES:
+        print(f"Bot has to be one of: {', '.join(BOT_FACTORIES)}")
+        sys.exit(1)
+
+    worker_count = int(get_option("--workers", 0)) or None
+    start_hours_ago = get_option("--start-hours-ago", None)
+    length_hours = get_option("--length-hours", None)
+    results_path = get_option("--results", None)
+
+    parameter_grid = {}
+    for argument in sys.argv[2:]:
+        if "=" not in argument:
+            continue
+
+        name, values = argument.split("=", 1)
+        parameter_grid[name] = [parse_value(value) for value in values.split(",")]
+
+    results = run_sandbox_sweep(
+        BOT_FACTORIES[sys.argv[1]], parameter_grid,
+        start_hours_ago=float(start_hours_ago) if start_hours_ago is not None else None,
+        run_length_in_hours=float(length_hours) if length_hours is not None else None,
+        worker_count=worker_count
+    )
+
+    if results_path:
+        with open(results_path, "w") as f:
+            json.dump(results, f, indent=2)
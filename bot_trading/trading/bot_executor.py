@@ -4,6 +4,7 @@ import datetime
 from bot_trading.bots.bot_base import BotBase
 from bot_trading.core.data.trade_entry import TradeEntry
 from bot_trading.core.messages import log_executor, log_portfolio, log_command
+from bot_trading.core.metrics import Histogram, count, record, record_duration
 from bot_trading.core.runtime.portfolio_base import PortfolioBase
 from bot_trading.core.runtime.market import Market
 from bot_trading.trading.portfolio_controller import PortfolioController
@@ -13,7 +14,10 @@ from bot_trading.trading.portfolio_controller import PortfolioController
 Runs bot on a given market.
 """
 class BotExecutor(object):
-    def __init__(self, bot: BotBase, market: Market, portfolio: PortfolioBase):
+    def __init__(self, bot: BotBase, market: Market, portfolio: PortfolioBase, time_scale: float = 1.0):
+        """
+        time_scale: how many market seconds pass during a second of bot calculation (replays faster than real time)
+        """
         self._bot = bot
         self._bot.portfolio_connector = portfolio
         self._market = market
@@ -23,6 +27,13 @@ class BotExecutor(object):
         self._bot_slack = 0.0  # compensates for bot calculation time
         self._last_bot_update = 0
         self._is_synchronized = False
+        self._time_scale = time_scale
+
+        # consultation statistics
+        self.consultation_latencies = Histogram()  # calculation time of bot consultations (in seconds)
+        self.dropped_consultation_count = 0  # consultations skipped because of the bot slack
+        self.max_bot_slack = 0.0
+        self._last_dropped_consultation = 0
 
     def run(self):
         """
@@ -35,6 +46,35 @@ class BotExecutor(object):
             print()
             print("EXECUTOR IS STOPPING")
 
+    def run_clock_stepped(self):
+        """
+        Runs bot updates on history without handling every single entry.
+        Market clock is advanced straight to the next time the bot can be consulted (or a consultation is dropped
+        because of the bot slack), so the bot is consulted after the same entries as by run
+        and the same consultations are dropped.
+        """
+        try:
+            while self._market.run_until(self._get_next_consultation_time()):
+                log_executor(f"\r......[MARKET_CLOCK] {datetime.datetime.fromtimestamp(self._current_time)}",
+                             end=" " * 5, flush=True)
+                self._register(self._market.current_time)
+        except KeyboardInterrupt:
+            print()
+            print("EXECUTOR IS STOPPING")
+
+    def _get_next_consultation_time(self):
+        if not self._is_synchronized:
+            # availability of the present has to be checked after every entry
+            return self._current_time
+
+        next_time = max(self._last_bot_update + self._bot.update_interval, self._current_time + self._bot_slack)
+        if self._bot_slack > 0:
+            # the clock stops where run would count a dropped consultation
+            last_consultation = max(self._last_bot_update, self._last_dropped_consultation)
+            next_time = min(next_time, last_consultation + self._bot.update_interval)
+
+        return next_time
+
     def receive(self, entry: TradeEntry):
         """
         Handler of the live updates.
@@ -50,6 +90,7 @@ class BotExecutor(object):
 
         self._update_slack(timestamp)
         if self._bot_slack > 0:
+            self._count_dropped_consultation()
             return  # bot can't trade (its in time slack or not enough info was collected yet)
 
         if not self._is_synchronized and self._market.present.is_available:
@@ -79,11 +120,17 @@ class BotExecutor(object):
         end = time.time()
 
         # compensate for bot calculation time
-        self._bot_slack += end - start
+        self.consultation_latencies.record(end - start)
+        self._bot_slack += (end - start) * self._time_scale
+        self.max_bot_slack = max(self.max_bot_slack, self._bot_slack)
+        record_duration("executor.consultation", end - start)
+        record("executor.bot_slack", self._bot_slack)
 
         if not portfolio._commands:
             return
 
+        count("executor.commands", len(portfolio._commands))
+
         log_command(f"Portfolio before: {portfolio_before}")
         for command in portfolio._commands:
             log_command(f"\t {command}")
@@ -92,6 +139,16 @@ class BotExecutor(object):
         portfolio._load_from_state(self._portfolio.get_state_copy())
         log_command(f"Portfolio after: {portfolio}\n")
 
+    def _count_dropped_consultation(self):
+        if not self._is_synchronized:
+            return  # consultations did not start yet
+
+        last_consultation = max(self._last_bot_update, self._last_dropped_consultation)
+        if self._current_time - last_consultation >= self._bot.update_interval:
+            self.dropped_consultation_count += 1
+            count("executor.dropped_consultations")
+            self._last_dropped_consultation = self._current_time
+
     def _update_slack(self, new_time):
         # sync time with the bot execution delay
 
@@ -1,5 +1,5 @@
 from copy import deepcopy
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from bot_trading.core.configuration import DUST_LEVEL
 from bot_trading.trading.price_snapshot import PriceSnapshot
@@ -34,12 +34,12 @@ class PortfolioController(object):
         return self._market.target_currency
 
     @property
-    def currencies(self) -> List[str]:
+    def currencies(self) -> Tuple[str, ...]:
         """ Currencies that can be traded."""
         return self._market.currencies
 
     @property
-    def non_target_currencies(self) -> List[str]:
+    def non_target_currencies(self) -> Tuple[str, ...]:
         return self._market.non_target_currencies
 
     @property
@@ -118,6 +118,8 @@ class PortfolioController(object):
         self._load_from_state(self._current_portfolio_state)
 
     def get_funds_with(self, gain_greater_than: float, force_include_target: bool = True) -> List[Fund]:
+        present = self.present
+
         result = []
         for position in self._currency_positions.values():
             if position.currency == self.target_currency and force_include_target:
@@ -125,7 +127,7 @@ class PortfolioController(object):
                     result.append(Fund(position.total_amount, position.currency))
                 continue
 
-            for bucket_amount in position.get_bucket_amounts_with(self._market, gain_greater_than):
+            for bucket_amount in position.get_bucket_amounts_with(present, gain_greater_than):
                 if bucket_amount > 0:
                     result.append(Fund(bucket_amount, position.currency))
 
@@ -135,7 +137,7 @@ class PortfolioController(object):
         if currency == self.target_currency and force_include_target:
             return Fund(self._currency_positions[currency].total_amount, currency)
 
-        profitable_amount = self._currency_positions[currency].get_amount_with(self._market, gain_greater_than)
+        profitable_amount = self._currency_positions[currency].get_amount_with(self.present, gain_greater_than)
         if profitable_amount > 0:
             return Fund(profitable_amount, currency)
 
@@ -1,4 +1,6 @@
-from typing import List, Tuple
+from typing import List, Tuple, Sequence
+
+import numpy as np
 
 from bot_trading.core.exceptions import TradeEntryNotAvailableException
 from bot_trading.core.data.parsing import parse_pair
@@ -13,6 +15,12 @@ class PriceSnapshot(object):
         self._connector = connector
         self._current_time = current_time
 
+        # views and unit prices are memoized for the snapshot time
+        self._pricebooks = {}
+        self._unit_values = {}
+        self._unit_costs = {}
+        self._conversion_hops = None
+
     @property
     def currencies(self):
         return self._market.currencies
@@ -38,7 +46,7 @@ class PriceSnapshot(object):
 
         try:
             for pair in self._market.direct_currency_pairs:
-                if not self._connector.get_pricebook(*parse_pair(pair), self._current_time).is_synchronized:
+                if not self._get_pricebook(*parse_pair(pair)).is_synchronized:
                     return False
 
         except TradeEntryNotAvailableException:
@@ -47,16 +55,27 @@ class PriceSnapshot(object):
         return True
 
     def get_pricebook(self, source_currency: str, target_currency: str) -> PricebookView:
+        """
+        Creates a new view which can be forwarded by the caller.
+        """
         return self._connector.get_pricebook(source_currency, target_currency, self._current_time)
 
     def get_snapshot(self, seconds_back):
         return PriceSnapshot(self._market, self._connector, self._current_time - seconds_back)
 
     def get_unit_value(self, currency: str) -> float:
-        return self.get_value(Fund(1.0, currency)).amount
+        value = self._unit_values.get(currency)
+        if value is None:
+            value = self._unit_values[currency] = self.get_value(Fund(1.0, currency)).amount
+
+        return value
 
     def get_unit_cost(self, currency: str) -> float:
-        return self.get_cost(Fund(1.0, currency)).amount
+        cost = self._unit_costs.get(currency)
+        if cost is None:
+            cost = self._unit_costs[currency] = self.get_cost(Fund(1.0, currency)).amount
+
+        return cost
 
     def get_value(self, fund: Fund) -> Fund:
         return self.after_conversion(fund, self._market.target_currency)
@@ -69,7 +88,7 @@ class PriceSnapshot(object):
 
         current_fund = fund
         for intermediate_currency in path[1:]:
-            pricebook = self.get_pricebook(current_fund.currency, intermediate_currency)
+            pricebook = self._get_pricebook(current_fund.currency, intermediate_currency)
             current_fund = pricebook.after_conversion(current_fund)
 
         return current_fund
@@ -79,13 +98,132 @@ class PriceSnapshot(object):
 
         current_fund = fund
         for intermediate_currency in path[1:]:
-            pricebook = self.get_pricebook(current_fund.currency, intermediate_currency)
+            pricebook = self._get_pricebook(current_fund.currency, intermediate_currency)
             current_fund = pricebook.to_convert(current_fund)
 
         return current_fund
 
+    def get_values(self, currency: str, amounts: Sequence[float]) -> np.ndarray:
+        return self.after_conversions(currency, amounts, self._market.target_currency)
+
+    def get_costs(self, currency: str, amounts: Sequence[float]) -> np.ndarray:
+        return self.to_converts(self._market.target_currency, currency, amounts)
+
+    def after_conversions(self, fund_currency: str, amounts: Sequence[float], currency: str) -> np.ndarray:
+        """
+        Vectorized after_conversion which considers depth of the books (NaN when a book is not deep enough).
+        """
+        path = self._market.get_transfer_path(fund_currency, currency)
+
+        current_currency = fund_currency
+        current_amounts = np.asarray(amounts, dtype=np.float64)
+        for intermediate_currency in path[1:]:
+            pricebook = self._get_pricebook(current_currency, intermediate_currency)
+            current_amounts = pricebook.after_conversions(current_amounts, current_currency)
+            current_currency = intermediate_currency
+
+        return current_amounts
+
+    def to_converts(self, currency: str, fund_currency: str, amounts: Sequence[float]) -> np.ndarray:
+        """
+        Vectorized to_convert which considers depth of the books (NaN when a book is not deep enough).
+        """
+        path = self._market.get_transfer_path(fund_currency, currency)
+
+        current_currency = fund_currency
+        current_amounts = np.asarray(amounts, dtype=np.float64)
+        for intermediate_currency in path[1:]:
+            pricebook = self._get_pricebook(current_currency, intermediate_currency)
+            current_amounts = pricebook.to_converts(current_amounts, current_currency)
+            current_currency = intermediate_currency
+
+        return current_amounts
+
+    def get_rate_matrix(self) -> np.ndarray:
+        """
+        Top of book conversion rates between all the currencies (rows/columns follow market.currencies).
+        rates[i, j] is amount of currency j got for a unit of currency i.
+        """
+        currency_count = len(self._market.currencies)
+        hops = self._get_conversion_hops(range(currency_count), range(currency_count))
+
+        rates = np.ones((currency_count, currency_count))
+        for prices, is_reversed in hops:
+            rates = self._convert_hop(rates, prices, is_reversed)
+
+        return rates
+
+    def get_conversions(self, fund: Fund) -> np.ndarray:
+        """
+        Amounts of all the currencies (in market.currencies order) got for the fund - same values as after_conversion.
+        """
+        currency_count = len(self._market.currencies)
+        source_index = self._market.currency_indexes[fund.currency]
+        hops = self._get_conversion_hops([source_index], range(currency_count))
+
+        amounts = np.full(currency_count, fund.amount, dtype=np.float64)
+        for prices, is_reversed in hops:
+            amounts = self._convert_hop(amounts, prices[source_index], is_reversed[source_index])
+
+        return amounts
+
+    def get_currency_values(self, amounts: Sequence[float]) -> np.ndarray:
+        """
+        Values of amounts of all the currencies (in market.currencies order) - same values as get_value.
+        """
+        currency_count = len(self._market.currencies)
+        target_index = self._market.currency_indexes[self._market.target_currency]
+        hops = self._get_conversion_hops(range(currency_count), [target_index])
+
+        values = np.asarray(amounts, dtype=np.float64)
+        for prices, is_reversed in hops:
+            values = self._convert_hop(values, prices[:, target_index], is_reversed[:, target_index])
+
+        return values
+
+    def _convert_hop(self, amounts: np.ndarray, prices: np.ndarray, is_reversed: np.ndarray) -> np.ndarray:
+        # same operations as PricebookView.after_conversion does
+        return np.where(is_reversed, amounts / prices, amounts * prices)
+
+    def _get_conversion_hops(self, source_indexes, target_indexes):
+        """
+        Prices of the first and second hop of transfer paths between the currencies (filled on demand,
+        so only the needed pricebooks are requested). Missing hops are multiplications by 1.0 which don't
+        change the amounts.
+        """
+        currencies = self._market.currencies
+        currency_count = len(currencies)
+        if self._conversion_hops is None:
+            self._conversion_hops = (
+                np.zeros((currency_count, currency_count), dtype=bool),  # which paths are filled already
+                [(np.ones((currency_count, currency_count)), np.zeros((currency_count, currency_count), dtype=bool))
+                 for _ in range(2)]
+            )
+
+        is_filled, hops = self._conversion_hops
+        for source_index in source_indexes:
+            for target_index in target_indexes:
+                if is_filled[source_index, target_index]:
+                    continue
+
+                path = self._market.get_transfer_path(currencies[source_index], currencies[target_index])
+                for hop_index in range(len(path) - 1):
+                    pricebook = self._get_pricebook(path[hop_index], path[hop_index + 1])
+                    bid, ask = pricebook.bid_ask
+
+                    prices, is_reversed = hops[hop_index]
+                    if pricebook.target_currency == path[hop_index]:
+                        prices[source_index, target_index] = ask
+                        is_reversed[source_index, target_index] = True
+                    else:
+                        prices[source_index, target_index] = bid
+
+                is_filled[source_index, target_index] = True
+
+        return hops
+
     def get_spread(self, currency: str) -> float:
-        pricebook = self.get_pricebook(currency, self._market.target_currency)
+        pricebook = self._get_pricebook(currency, self._market.target_currency)
         return pricebook.spread
 
     def get_unit_value_samples(self, currency: str, sampling_period: float, end_timestamp: float = None) -> List[float]:
@@ -116,3 +254,14 @@ class PriceSnapshot(object):
             current_time += sampling_period
 
         return result
+
+    def _get_pricebook(self, source_currency: str, target_currency: str) -> PricebookView:
+        """
+        Gets view shared by all the conversions of the snapshot (it must not be forwarded).
+        """
+        key = (source_currency, target_currency)
+        pricebook = self._pricebooks.get(key)
+        if pricebook is None:
+            pricebook = self._pricebooks[key] = self.get_pricebook(source_currency, target_currency)
+
+        return pricebook
@@ -1,6 +1,11 @@
+from typing import Sequence
+
+import numpy as np
+
 from bot_trading.core.exceptions import TradeEntryNotAvailableException
 from bot_trading.core.data.parsing import parse_pair
 from bot_trading.core.data.pricebook_processor_state import PricebookProcessorState
+from bot_trading.core.data.storage_writer import StorageWriter
 from bot_trading.core.data.trade_entry import TradeEntry
 from bot_trading.core.processors.pricebook_processor import PricebookProcessor
 from bot_trading.trading.fund import Fund
@@ -14,9 +19,16 @@ class PricebookView(object):
         self._current_index = state.current_index
         self._current_time = state.current_time
 
+        # entries read ahead from the reader
+        self._read_ahead_start = 0
+        self._read_ahead_batch = None
+
         self._processor = PricebookProcessor(self._reader.pair)
         state.inject_to(self._processor)
 
+        # side -> (levels the arrays were computed from, prices, cumulative volumes, cumulative notionals)
+        self._depth_cache = {}
+
     @property
     def pair(self):
         return self._reader.pair
@@ -43,7 +55,7 @@ class PricebookView(object):
 
     def fast_forward_to(self, timestamp):
         while True:
-            entry = self._reader.get_entry(self._current_index)
+            entry = self._get_next_entry()
             if entry is None:
                 if self.is_synchronized:
                     self._reader.get_entry(self._current_index)
@@ -59,7 +71,7 @@ class PricebookView(object):
             self._process_entry(entry)
 
     def forward_to_next_change(self):
-        entry = self._reader.get_entry(self._current_index)
+        entry = self._get_next_entry()
         self._process_entry(entry)
 
     def get_entry(self, entry_index: int):
@@ -99,6 +111,109 @@ class PricebookView(object):
             price_per_source_unit = ask
             return Fund(fund.amount * price_per_source_unit, self.target_currency)
 
+    def after_conversions(self, amounts: Sequence[float], currency: str) -> np.ndarray:
+        """
+        Vectorized after_conversion which walks the book levels.
+        Returns amounts of the other currency for the given amounts of currency (NaN when the book is not deep enough).
+        """
+        is_reversed = self._validate_conversion_currency(currency)
+        if is_reversed:
+            # spending target currency on asks
+            return self._walk_depth(self._get_depth(is_buy=False), amounts, by_notional=True)
+        else:
+            # selling source currency to bids
+            return self._walk_depth(self._get_depth(is_buy=True), amounts, by_notional=False)
+
+    def to_converts(self, amounts: Sequence[float], currency: str) -> np.ndarray:
+        """
+        Vectorized to_convert which walks the book levels.
+        Returns amounts of the other currency needed for getting the given amounts of currency
+        (NaN when the book is not deep enough).
+        """
+        is_reversed = self._validate_conversion_currency(currency)
+        if is_reversed:
+            # target currency is got by selling source currency to bids
+            return self._walk_depth(self._get_depth(is_buy=True), amounts, by_notional=True)
+        else:
+            # source currency is bought on asks
+            return self._walk_depth(self._get_depth(is_buy=False), amounts, by_notional=False)
+
+    def _validate_conversion_currency(self, currency: str) -> bool:
+        is_reversed = self.target_currency == currency
+        if not is_reversed and self.source_currency != currency:
+            raise ValueError(f"Can't process conversion of {currency} on pair {self._reader.pair}")
+
+        return is_reversed
+
+    def _get_depth(self, is_buy: bool):
+        if is_buy:
+            levels = self._processor.buy_levels  # best bid first
+        else:
+            levels = self._processor.sell_levels  # best ask last
+
+        cached = self._depth_cache.get(is_buy)
+        if cached is not None and cached[0] is levels:
+            return cached[1:]  # the book side did not change since
+
+        prices = np.array([level[0] for level in levels], dtype=np.float64)
+        volumes = np.array([level[2] for level in levels], dtype=np.float64)
+        if not is_buy:
+            prices = prices[::-1]
+            volumes = volumes[::-1]
+
+        depth = (prices, np.cumsum(volumes), np.cumsum(prices * volumes))
+        self._depth_cache[is_buy] = (levels,) + depth
+        return depth
+
+    def _walk_depth(self, depth, amounts: Sequence[float], by_notional: bool) -> np.ndarray:
+        """
+        Walks levels from the best one until the amount (volume or notional) is filled.
+        Returns the complementary amount (notional or volume).
+        """
+        prices, cumulative_volumes, cumulative_notionals = depth
+        amounts = np.asarray(amounts, dtype=np.float64)
+
+        result = np.full(amounts.shape, np.nan)
+        if not len(prices):
+            return result
+
+        if by_notional:
+            cumulative, complement = cumulative_notionals, cumulative_volumes
+        else:
+            cumulative, complement = cumulative_volumes, cumulative_notionals
+
+        level_indexes = np.searchsorted(cumulative, amounts, side="left")
+        is_fillable = level_indexes < len(prices)
+        level_indexes = level_indexes[is_fillable]
+
+        # fully consumed levels before the partially consumed one
+        consumed = np.where(level_indexes > 0, cumulative[level_indexes - 1], 0.0)
+        consumed_complement = np.where(level_indexes > 0, complement[level_indexes - 1], 0.0)
+
+        remaining = amounts[is_fillable] - consumed
+        level_prices = prices[level_indexes]
+        if by_notional:
+            result[is_fillable] = consumed_complement + remaining / level_prices
+        else:
+            result[is_fillable] = consumed_complement + remaining * level_prices
+
+        return result
+
+    def _get_next_entry(self):
+        entry_index = self._current_index
+        batch = self._read_ahead_batch
+        if batch is None or not self._read_ahead_start <= entry_index < self._read_ahead_start + len(batch):
+            # read ahead until the end of the bucket
+            bucket_end = (int(entry_index / StorageWriter.bucket_entry_count) + 1) * StorageWriter.bucket_entry_count
+            batch = self._reader.get_entries(entry_index, bucket_end)
+            self._read_ahead_start = entry_index
+            self._read_ahead_batch = batch
+
+            if not len(batch):
+                return None
+
+        return batch.get_entry(entry_index - self._read_ahead_start)
+
     def _process_entry(self, entry: TradeEntry):
         self._processor.accept(entry)
         self._current_index += 1
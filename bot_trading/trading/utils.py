@@ -2,7 +2,6 @@ import datetime
 from typing import Dict
 
 from bot_trading.trading.price_snapshot import PriceSnapshot
-from bot_trading.trading.fund import Fund
 from bot_trading.trading.portfolio_controller import PortfolioController
 
 
@@ -28,16 +27,5 @@ def filter_currencies(deltas: Dict[str, float], portfolio: PortfolioController,
     return result
 
 
-def future_value(fund: Fund, target_currency: str, present: PriceSnapshot, future):
-    converted_fund = present.after_conversion(fund, target_currency)
-    #if converted_fund.currency != target_currency:
-    #    converted_fund = Fund(converted_fund.amount * 0.99, converted_fund.currency)
-
-    value = future.get_value(converted_fund)
-    #print(f"{converted_fund} value estimation: {value}")
-
-    return value
-
-
 def timestamp_to_datetime(timestamp):
     return datetime.datetime.fromtimestamp(timestamp)
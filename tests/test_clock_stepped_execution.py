@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# the executor reads the client configuration, which requires a valid username
+os.environ.setdefault("BOT_USERNAME", "test@example.com")
+
+from bot_trading.bots.bot_base import BotBase
+from bot_trading.core.data.synthetic_book_generator import SyntheticBookGenerator
+from bot_trading.core.runtime.local_history_connector import LocalHistoryConnector
+from bot_trading.core.runtime.market import Market
+from bot_trading.core.runtime.sandbox_portfolio import SandboxPortfolio
+from bot_trading.trading.bot_executor import BotExecutor
+
+
+class StubClock(object):
+    """
+    Replaces the time module of the executor, so bot calculation takes exactly the given latency.
+    """
+
+    def __init__(self):
+        self.current_time = 0.0
+
+    def time(self):
+        return self.current_time
+
+
+class RecordingBot(BotBase):
+    def __init__(self, market: Market, clock: StubClock, latency: float):
+        super().__init__()
+        self.consultations = []
+
+        self._market = market
+        self._clock = clock
+        self._latency = latency
+
+    def update_portfolio(self, portfolio):
+        self.consultations.append((self._market.current_time, self._market._connector.processed_entry_count))
+        self._clock.current_time += self._latency
+
+
+class ClockSteppedExecutionTest(unittest.TestCase):
+    pairs = ["S00/EUR", "S01/EUR"]
+
+    @classmethod
+    def setUpClass(cls):
+        cls._root_path = tempfile.mkdtemp()
+        for i, pair in enumerate(cls.pairs):
+            SyntheticBookGenerator(pair, seed=i, root_path=cls._root_path).generate(10_000)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls._root_path)
+
+    def test_modes_consult_the_same_points(self):
+        for latency in [0.0, 3.0, 20.0]:
+            with self.subTest(latency=latency):
+                consultations, dropped_count = self._run(latency, clock_stepped=False)
+                stepped_consultations, stepped_dropped_count = self._run(latency, clock_stepped=True)
+
+                self.assertGreater(len(consultations), 10)
+                self.assertEqual(consultations, stepped_consultations)
+                self.assertEqual(dropped_count, stepped_dropped_count)
+                if latency > 10.0:
+                    self.assertGreater(dropped_count, 0)
+
+    def _run(self, latency: float, clock_stepped: bool):
+        connector = LocalHistoryConnector(self._root_path, self.pairs)
+        market = Market("EUR", self.pairs, connector)
+        portfolio = SandboxPortfolio(market, {"positions": {"EUR": [{"amount": 1000.0, "initial_value": 1000.0}]}})
+
+        clock = StubClock()
+        bot = RecordingBot(market, clock, latency)
+        executor = BotExecutor(bot, market, portfolio)
+        with mock.patch("bot_trading.trading.bot_executor.time", clock):
+            try:
+                if clock_stepped:
+                    executor.run_clock_stepped()
+                else:
+                    executor.run()
+            finally:
+                connector.close()
+
+        return bot.consultations, executor.dropped_consultation_count
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import shutil
+import tempfile
+import unittest
+
+from bot_trading.core.data.storage_reader import StorageReader
+from bot_trading.core.data.storage_verifier import StorageVerifier
+from bot_trading.core.data.storage_writer import StorageWriter
+
+
+class StorageVerifierTest(unittest.TestCase):
+    pair = "T/EUR"
+
+    def setUp(self):
+        self._original_root_path = StorageWriter.root_path
+        self._root_path = tempfile.mkdtemp()
+        StorageWriter.root_path = self._root_path
+
+    def tearDown(self):
+        StorageWriter.root_path = self._original_root_path
+        shutil.rmtree(self._root_path)
+
+    def test_writer_buckets_are_valid(self):
+        writer = StorageWriter(self.pair)
+        timestamp = 1571234567.0
+        for message_index in range(1500):
+            timestamp += 0.5
+            if message_index % 3 == 0:
+                # snapshots come with a reset per level (as the feed connector writes them),
+                # bucket boundaries inside them put resets into the dumps
+                for level in range(1, 6):
+                    writer.reset(True, timestamp)
+                    writer.write(True, 100.0 - level, 1.0, timestamp)
+                    writer.reset(False, timestamp)
+                    writer.write(False, 100.0 + level, 1.0, timestamp)
+            else:
+                writer.write(message_index % 2 == 0, 100.0 - message_index % 3 - 1, 2.0, timestamp)
+                writer.write(message_index % 2 == 1, 100.0 + message_index % 3 + 1, 0.0, timestamp)
+
+            writer.flush()
+
+        writer.checkpoint()
+
+        entry_count = StorageReader(self.pair).get_entry_count()
+        bucket_count = int((entry_count + StorageWriter.bucket_entry_count - 1) / StorageWriter.bucket_entry_count)
+        self.assertGreater(bucket_count, 1)
+
+        result = StorageVerifier.verify_buckets(self.pair, entry_count, 0, bucket_count, check_books=False)
+        errors = {kind: count for kind, count in result["issues"].items() if kind not in StorageVerifier.warning_kinds}
+        self.assertEqual({}, errors)
+
+
+if __name__ == "__main__":
+    unittest.main()